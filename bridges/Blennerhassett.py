@@ -11,7 +11,7 @@ class BlennerhassettBridge(Bridge):
                  hanger_arrangement='Parallel', hanger_params=(1.117,), q_ll_d=22.9, q_ll_c=1063,
                  qc_fatigue=311, cable_loss=True, arch_shape='Parabolic', arch_optimisation=True, curve_fitting='',
                  self_stress_state='Tie-optimisation', self_stress_state_params=(), exact_stiffness=True,
-                 knuckles=True):
+                 knuckles=True, profiler=None):
 
         unit_weight_arch_1 = 2467.05
         unit_weight_arch_2 = 2310.68
@@ -153,5 +153,5 @@ class BlennerhassettBridge(Bridge):
                          arch_shape, arch_optimisation, curve_fitting, self_stress_state, self_stress_state_params,
                          cs_arch_x, cs_arch, cs_tie_x, cs_tie, n_hangers, hanger_arrangement, hanger_params, cs_hangers,
                          knuckle, cable_loss_events, cost_cross_sections,
-                         unit_weight_anchorages, unit_price_anchorages)
+                         unit_weight_anchorages, unit_price_anchorages, profiler=profiler)
         return
@@ -1,6 +1,7 @@
 import numpy as np
 from matplotlib import pyplot
 
+from bridges.build_profiler import profile_phases
 from plotting.supports import plot_supports_new
 from plotting.tables import uls_forces_table, dc_table, cost_table
 from self_equilibrium.embedded_beam import embedded_beam
@@ -23,10 +24,12 @@ from structure_elements.tie import Tie
 
 
 class Bridge:
+    @profile_phases('Bridge')
     def __init__(self, span, rise, n_floor_beams, g_deck, g_utilities, q_ll_d, q_ll_c, qc_fatigue,
                  arch_shape, arch_optimisation, curve_fitting, self_stress_state, self_stress_state_params, cs_arch_x,
                  cs_arch, cs_tie_x, cs_tie, n_hangers, hanger_arrangement, hanger_params, cs_hangers, knuckle,
-                 cable_loss_events, cost_cross_sections, unit_weight_anchorages, unit_price_anchorages):
+                 cable_loss_events, cost_cross_sections, unit_weight_anchorages, unit_price_anchorages,
+                 profiler=None):
 
         self.input = {'span': span, 'rise': rise, 'cross_girder_amount': n_floor_beams, 'weight_deck': g_deck,
                       'weight_surface_utilities': g_utilities, 'distributed_live_load': q_ll_d,
@@ -43,7 +46,9 @@ class Bridge:
         self.cost_cross_sections = cost_cross_sections
         self.unit_weight_anchorages = unit_weight_anchorages
         self.unit_price_anchorages = unit_price_anchorages
+        self.profiler = profiler
 
+        self.next_phase('Geometry')
         # Initialize nodes and create hanger set
         nodes = Nodes(accuracy=0.01)
 
@@ -90,6 +95,7 @@ class Bridge:
         # Define the entire network arch structure
         network_arch = NetworkArch(arch, tie, hangers, nodes)
 
+        self.next_phase('Self-stress state')
         # Determine the self equilibrium stress-state
         if self_stress_state == 'Zero-displacement':
             mz_0 = tie.zero_displacement(nodes, hangers, *self_stress_state_params[0:1])
@@ -105,11 +111,13 @@ class Bridge:
         else:
             raise Exception('Self-stress state "' + self_stress_state + '" is not defined')
 
+        self.next_phase('Knuckles')
         if knuckle:
             knuckles, dn = hangers.define_knuckles(nodes, span, tie, arch, mz_0, *knuckle)
             mz_0 = 0
             n_0 -= dn
 
+        self.next_phase('Arch optimisation')
         # Optimize the arch shape if specified
         if arch_optimisation:
             nodes.pop_nodes(arch.nodes[1:-1])
@@ -120,6 +128,7 @@ class Bridge:
             n_0 = arch.define_n_by_least_squares(nodes, hangers, mz_0)
             network_arch.arch = arch
 
+        self.next_phase('Curve fitting')
         if curve_fitting:
             nodes.pop_nodes(arch.nodes[1:-1])
             if curve_fitting.startswith('Polynomial'):
@@ -135,6 +144,7 @@ class Bridge:
 
 
 
+        self.next_phase('Permanent effects')
         # Assign the permanent effects to the cross sections
         hangers.assign_length_to_cross_section()
         hangers.assign_permanent_effects()
@@ -142,12 +152,17 @@ class Bridge:
         tie.assign_permanent_effects(nodes, hangers, -n_0, mz_0)
 
         # Calculate the load cases
+        self.next_phase('Load cases')
         network_arch.calculate_load_cases(q_ll_d, q_ll_c, qc_fatigue)
+        self.next_phase('Wind effects')
         network_arch.assign_wind_effects()
+        self.next_phase('Strength limit states')
         network_arch.calculate_strength_limit_states()
 
+        self.next_phase('Cable loss')
         network_arch.calculate_cable_loss(cable_loss_events)
 
+        self.next_phase('Tie fracture')
         network_arch.calculate_tie_fracture(q_ll_d, q_ll_c)
 
         self.nodes = nodes
@@ -156,9 +171,16 @@ class Bridge:
         self.cost = 0
         self.costs = 0
         self.cost_anchorages = 0
+        self.next_phase('Cost function')
         self.cost_function()
         return
 
+    def next_phase(self, name):
+        # Phases of the build are recorded by the profiler (see build_profiler)
+        if self.profiler:
+            self.profiler.next_phase(name)
+        return
+
     def plot_elements(self, ax=None):
         if not ax:
             fig, ax = pyplot.subplots(1, 1, figsize=(4, 1.5), dpi=720)
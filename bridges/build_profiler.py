@@ -0,0 +1,195 @@
+"""
+The build profiler records the phases of a bridge as a tree.
+
+Each phase records its wall time, the peak of the traced memory, the amount of
+compiled models, solves and cache hits of structure_analysis, the amount of
+requested effects (Element.get_effects and get_range) and the amount of effect
+expressions which had to be evaluated. The counts are taken at the entry points,
+such that analyses of the cache and memoized effects are counted as well. The
+analyses are further attributed to their call sites outside of structure_analysis.
+The tree is returned as a text table or exported as a Chrome trace
+(chrome://tracing or https://ui.perfetto.dev).
+
+    profiler = BuildProfiler()
+    bridge = BlennerhassettBridge(profiler=profiler)
+    print(profiler.table(call_sites=True))
+    profiler.to_chrome_trace('bridge.json')
+"""
+import json
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+
+from structure_analysis.profiling import profile_stages, stage_profiler
+from structure_elements.element import Element
+
+
+class Phase:
+    def __init__(self, name):
+        self.name = name
+        self.children = []
+        self.start = 0
+        self.duration = 0
+        self.peak_memory = 0
+        self.analyses = 0
+        self.solves = 0
+        self.cache_hits = 0
+        self.effects = 0
+        self.evaluations = 0
+        # Calls of the entry points of structure_analysis by (name, call site)
+        self.call_sites = {}
+        return
+
+
+class BuildProfiler:
+    def __init__(self, memory=True):
+        # Tracing the memory slows down the build, it is optional
+        self.memory = memory
+        self.phases = []
+        self.stack = []
+        # Phases started by next_phase, one exit stack for each profiled method
+        self.sequences = []
+        self.origin = None
+        return
+
+    @contextmanager
+    def phase(self, name):
+        if not self.stack:
+            with self.tracing():
+                with self.phase(name) as phase:
+                    yield phase
+            return
+
+        phase = Phase(name)
+        self.stack[-1].children.append(phase)
+        self.update_peak_memory()
+        self.stack.append(phase)
+        counters_start = get_counters()
+        calls_start = dict(stage_profiler.calls)
+        phase.start = time.perf_counter() - self.origin
+        try:
+            yield phase
+        finally:
+            phase.duration = time.perf_counter() - self.origin - phase.start
+            counters_end = get_counters()
+            (phase.analyses, phase.solves, phase.cache_hits,
+             phase.effects, phase.evaluations) = (end - start for start, end in
+                                                  zip(counters_start, counters_end))
+            for call, calls in stage_profiler.calls.items():
+                if calls > calls_start.get(call, 0):
+                    phase.call_sites[call] = calls - calls_start.get(call, 0)
+            self.update_peak_memory()
+            self.stack.pop()
+
+    @contextmanager
+    def sequence(self):
+        # The phases started by next_phase within the sequence follow each other,
+        # the last one ends with the sequence
+        with ExitStack() as sequence:
+            self.sequences.append(sequence)
+            try:
+                yield
+            finally:
+                self.sequences.pop()
+
+    def next_phase(self, name):
+        # Ends the previous phase of the innermost sequence and starts the next one
+        sequence = self.sequences[-1]
+        sequence.close()
+        sequence.enter_context(self.phase(name))
+        return
+
+    @contextmanager
+    def tracing(self):
+        # The root of the tree switches the stage profiler and the memory tracing on
+        if self.origin is None:
+            self.origin = time.perf_counter()
+        root = Phase('')
+        self.stack.append(root)
+        start_tracing = self.memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+        try:
+            with profile_stages(clear=False):
+                yield
+        finally:
+            if start_tracing:
+                tracemalloc.stop()
+            self.stack.pop()
+            self.phases.extend(root.children)
+
+    def update_peak_memory(self):
+        # The peak since the last update belongs to all open phases
+        if not self.memory or not tracemalloc.is_tracing():
+            return
+        peak = tracemalloc.get_traced_memory()[1]
+        for phase in self.stack:
+            phase.peak_memory = max(phase.peak_memory, peak)
+        tracemalloc.reset_peak()
+        return
+
+    def walk(self):
+        # All phases with their depth in the order of the tree
+        stack = [(phase, 0) for phase in reversed(self.phases)]
+        while stack:
+            phase, depth = stack.pop()
+            yield phase, depth
+            stack.extend((child, depth + 1) for child in reversed(phase.children))
+
+    def table(self, call_sites=False):
+        # The call sites are listed below the phases without child phases
+        total = sum(phase.duration for phase in self.phases) or 1
+        lines = ['{:<40}{:>10}{:>8}{:>11}{:>10}{:>8}{:>8}{:>9}{:>11}'.format(
+            'Phase', 'Time [s]', '[%]', 'Peak [MB]', 'Analyses', 'Solves', 'Cached', 'Effects',
+            'Evaluated')]
+        for phase, depth in self.walk():
+            lines.append('{:<40}{:>10.3f}{:>8.1f}{:>11.1f}{:>10}{:>8}{:>8}{:>9}{:>11}'.format(
+                '  ' * depth + phase.name, phase.duration, 100 * phase.duration / total,
+                phase.peak_memory / 2 ** 20, phase.analyses, phase.solves, phase.cache_hits,
+                phase.effects, phase.evaluations))
+            if call_sites and not phase.children:
+                for (name, call_site), calls in sorted(phase.call_sites.items(), key=lambda item: item[0][1]):
+                    lines.append('{:<40}{:>10}'.format('  ' * (depth + 1) + '- ' + name + ' ' + call_site,
+                                                       calls))
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self, path=None):
+        events = []
+        for phase, depth in self.walk():
+            events.append({'name': phase.name, 'ph': 'X', 'pid': 0, 'tid': 0,
+                           'ts': 10 ** 6 * phase.start, 'dur': 10 ** 6 * phase.duration,
+                           'args': {'Peak memory [MB]': phase.peak_memory / 2 ** 20,
+                                    'Analyses': phase.analyses, 'Solves': phase.solves,
+                                    'Cache hits': phase.cache_hits, 'Effects': phase.effects,
+                                    'Evaluated': phase.evaluations,
+                                    'Call sites': {name + ' ' + call_site: calls for (name, call_site), calls
+                                                   in phase.call_sites.items()}}})
+        trace = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+        if path:
+            with open(path, 'w') as file:
+                json.dump(trace, file, indent=1)
+        return trace
+
+
+def get_counters():
+    # Compiled models, solves and cache hits are counted at the entry points of structure_analysis
+    analyses = stage_profiler.count_calls('Compilation')
+    solves = stage_profiler.count_calls('Solve')
+    cache_hits = stage_profiler.count_calls('Cache Hit')
+    return analyses, solves, cache_hits, Element.effects_requests, Element.effects_evaluations
+
+
+def profile_phases(name):
+    # Records a method given a profiler keyword as a phase, the phases started by
+    # next_phase within the method are its children
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            profiler = kwargs.get('profiler')
+            if not profiler:
+                return method(self, *args, **kwargs)
+            with profiler.phase(name), profiler.sequence():
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from bridges.Blennerhassett import BlennerhassettBridge
+
+
+@pytest.fixture(scope='module')
+def bridge():
+    return BlennerhassettBridge()
+
+
+def test_cost(bridge):
+    # The cost of the default bridge, the self-stress state is the optimum of
+    # a degenerate linear program and sensitive to the analyses
+    assert bridge.cost == pytest.approx(10635854.30, rel=1e-8)
+
+
+def test_permanent_tie_moment(bridge):
+    moment = bridge.network_arch.tie.get_effects('Permanent', 'Moment')
+    assert np.max(moment) == pytest.approx(603.7484, rel=1e-6)
+    assert np.min(moment) == pytest.approx(-603.7362, rel=1e-6)
+
+
+def test_prestressing_forces(bridge):
+    forces = [hanger.prestressing_force for hanger in bridge.network_arch.hangers][:6]
+    np.testing.assert_allclose(forces, [1881.2981, 1881.4234, 1881.3816, 1881.3816, 1881.3816, 1881.3815],
+                               rtol=1e-6)
@@ -0,0 +1,100 @@
+import json
+import tracemalloc
+
+import pytest
+
+from bridges.Blennerhassett import BlennerhassettBridge
+from bridges.build_profiler import BuildProfiler
+from structure_analysis import structure_analysis
+from structure_analysis.profiling import profile_stages, stage_profiler
+
+PHASES = ['Geometry', 'Self-stress state', 'Knuckles', 'Arch optimisation', 'Curve fitting', 'Permanent effects',
+          'Load cases', 'Wind effects', 'Strength limit states', 'Cable loss', 'Tie fracture', 'Cost function']
+
+
+@pytest.fixture(scope='module')
+def profiler():
+    profiler = BuildProfiler()
+    BlennerhassettBridge(profiler=profiler)
+    return profiler
+
+
+def get_model():
+    nodes = {'Location': [[0, 0], [10, 0]]}
+    beams = {'Nodes': [[0, 1]], 'Stiffness': [[1e6, 1e4]]}
+    loads = [{'Distributed': [[0, 0, 0, 0, -1, 0, 0, -1, 0]]}]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': [[0, 1, 1, 0], [1, 0, 1, 0]]}}
+
+
+def test_bridge_phases(profiler):
+    assert [phase.name for phase in profiler.phases] == ['Bridge']
+    bridge = profiler.phases[0]
+    assert [phase.name for phase in bridge.children] == PHASES
+    # The phases follow each other within the bridge
+    for phase, next_phase in zip(bridge.children[:-1], bridge.children[1:]):
+        assert phase.start + phase.duration <= next_phase.start
+    assert bridge.start <= bridge.children[0].start
+    assert bridge.children[-1].start + bridge.children[-1].duration <= bridge.start + bridge.duration
+    assert bridge.analyses == sum(phase.analyses for phase in bridge.children) > 0
+    assert bridge.peak_memory > 0
+    assert not profiler.stack and not profiler.sequences
+    assert not tracemalloc.is_tracing()
+
+
+def test_chrome_trace(profiler, tmp_path):
+    path = tmp_path / 'bridge.json'
+    profiler.to_chrome_trace(path)
+    with open(path) as file:
+        trace = json.load(file)
+    events = trace['traceEvents']
+    assert [event['name'] for event in events] == ['Bridge'] + PHASES
+    for event in events:
+        assert event['ph'] == 'X' and event['dur'] >= 0
+        assert set(event['args']) >= {'Peak memory [MB]', 'Analyses', 'Solves', 'Effects', 'Call sites'}
+    assert trace == json.loads(json.dumps(profiler.to_chrome_trace()))
+
+
+def test_nested_phases():
+    profiler = BuildProfiler(memory=False)
+    with profiler.phase('Outer'):
+        with profiler.phase('Analysis'):
+            structure_analysis(get_model())
+        with profiler.sequence():
+            profiler.next_phase('First')
+            profiler.next_phase('Second')
+            structure_analysis(get_model())
+    outer = profiler.phases[0]
+    assert [(phase.name, depth) for phase, depth in profiler.walk()] == \
+           [('Outer', 0), ('Analysis', 1), ('First', 1), ('Second', 1)]
+    assert [phase.analyses for phase, depth in profiler.walk()] == [2, 1, 0, 1]
+    assert outer.peak_memory == 0
+
+
+def test_phase_exception():
+    # An exception within a sequence ends all phases and the tracing
+    profiler = BuildProfiler()
+    with pytest.raises(ValueError):
+        with profiler.phase('Outer'), profiler.sequence():
+            profiler.next_phase('First')
+            raise ValueError
+    assert [phase.name for phase, depth in profiler.walk()] == ['Outer', 'First']
+    assert not profiler.stack and not profiler.sequences
+    assert not tracemalloc.is_tracing()
+
+
+def test_tracing_restored():
+    # Memory tracing and stage profiling started outside of the profiler are kept on
+    profiler = BuildProfiler()
+    tracemalloc.start()
+    try:
+        with profile_stages():
+            with profiler.phase('Outer'):
+                structure_analysis(get_model())
+            assert tracemalloc.is_tracing()
+            assert stage_profiler.enabled
+        assert not stage_profiler.enabled
+    finally:
+        tracemalloc.stop()
+    assert profiler.phases[0].analyses == 1
+    assert profiler.phases[0].peak_memory > 0
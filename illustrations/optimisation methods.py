@@ -19,12 +19,13 @@ hangers.hanger_sets = []
 
 for node in nodes.nodes:
     if node.y > 0:
-        node.y += 30
+        nodes.move_node(node, node.x, node.y + 30)
 nodes.add_node(0, 30)
 nodes.add_node(267.8, 30)
 
 arch.nodes[0] = nodes.nodes[-2]
 arch.nodes[-1] = nodes.nodes[-1]
+arch.invalidate_geometry()
 
 
 model = bridge.network_arch.create_model()
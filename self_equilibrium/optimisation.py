@@ -119,17 +119,37 @@ def optimize_self_stresses_tie(tie, nodes, hangers, hanger_range=(0.25/0.65, 0.4
 
 
 def get_self_stress_matrix(nodes, hangers, arch=None, tie=None, factors=(1, 1)):
+    # All columns are obtained from a single analysis per element, using one
+    # load group for each unit self-stress parameter
     n = 2 + len(hangers.get_hanger_forces(i=0))
-    x = [0 for i in range(n)]
-    b = moment_distribution(nodes, hangers, x, arch=arch, tie=tie, factors=factors)
+    forces = hangers.get_hanger_forces(i=0)
+    a, b = [], []
+    if arch:
+        a_arch, b_arch = self_stress_matrix_element(n, nodes, hangers, arch, 1, factor=factors[0])
+        a.append(a_arch)
+        b.append(b_arch)
+    if tie:
+        a_tie, b_tie = self_stress_matrix_element(n, nodes, hangers, tie, -1, factor=factors[1])
+        a.append(a_tie)
+        b.append(b_tie)
+    hangers.set_prestressing_forces(forces)
+    a = np.vstack(a)
+    b = np.concatenate(b)
+    return a, b
 
-    a = []
+
+def self_stress_matrix_element(n, nodes, hangers, element, sign, factor=1):
+    # The first load group is the permanent load, the others the unit cases
+    x = [0 for i in range(n)]
+    loads = [element.permanent_loads()]
     for i in range(n):
         x[i] = 1
-        moment_i = moment_distribution(nodes, hangers, x, arch=arch, tie=tie, factors=factors)
-        a.append(list(moment_i - b))
+        hangers.set_prestressing_forces(x[2:])
+        loads.append(element.self_stress_loads(hangers, sign * x[0], -sign * x[1]))
         x[i] = 0
-    a = np.array(a).transpose()
+    moments = element.permanent_moments(nodes, loads)
+    b = moments[0] * factor
+    a = np.array(moments[1:]).transpose() * factor
     return a, b
 
 
@@ -149,14 +169,12 @@ def moment_distribution(nodes, hangers, x, arch=None, tie=None, factors=(1, 1)):
 def moment_distribution_arch(x, nodes, hangers, arch, factor=1):
     hangers.set_prestressing_forces(x[2:])
     arch.assign_permanent_effects(nodes, hangers, x[0], -x[1])
-    moment_arch = arch.effects['Permanent']['Moment']
-    moment_arch *= factor
+    moment_arch = factor * arch.get_effects('Permanent', 'Moment')
     return moment_arch
 
 
 def moment_distribution_tie(x, nodes, hangers, tie, factor=1):
     hangers.set_prestressing_forces(x[2:])
     tie.assign_permanent_effects(nodes, hangers, -x[0], x[1])
-    moment_tie = tie.effects['Permanent']['Moment']
-    moment_tie *= factor
+    moment_tie = factor * tie.get_effects('Permanent', 'Moment')
     return moment_tie
@@ -5,21 +5,35 @@ Created on Mon May 13 20:21:44 2019
 @author: umorf
 
 This module contains the structure_analysis function, which uses all other 
-functions of the package.
+functions of the package. Repeated analyses of the same structure with
+different loads can use prepare_model instead (see compiled_model). Variants
+with changed stiffnesses of a few beams reuse its factorization (see variants).
+Mirror symmetric structures can be solved as two half-size systems (see
+symmetry). If the analysis cache is enabled, the results of repeated analyses
+of the same model are taken from it (see analysis_cache). The stages of the
+analysis can be profiled by profile_stages (see profiling).
 """
 
+from .analysis_cache import analysis_cache
 from .apply_boundary_conditions import apply_boundary_conditions
 from .assembly import assemble
 from .back_calculation import get_internal_forces
+from .compiled_model import CompiledModel, prepare_model
 from .discretization import discretize
+from .factorization import factorization_cache
 from .make_lists import get_dictionaries
 from .points_of_interest import calculate_state_poi
+from .profiling import count_call, profile_stages, stage, stage_profiler
+from .results import BeamResults, LoadgroupResults
 from .solve import solve
+from .variants import StiffnessVariant
 from .verification import verify_input
 
 
 def structure_analysis(model_original, *points_of_interest,
-                       discType='Lengthwise', discElements=100, discLength=1):
+                       discType='Lengthwise', discElements=100, discLength=1,
+                       solver='Sparse', condensation=False, stations=None,
+                       quadrature='Adaptive', mirror=None):
     """Calculates the support reactions, the deformations and internal forces of the model.
     
     -----
@@ -30,42 +44,73 @@ def structure_analysis(model_original, *points_of_interest,
     deformation and the internal forces of the model for each loadgroup.
     
     If points of interest are specified, only the state (displacements and 
-    internal forces) of these points is returned. If not, the states of all
-    nodes generated by the discretization of the system is returned. As a third
+    internal forces) of these points is returned. If stations are specified,
+    the state at these distances along each beam is returned, independently of
+    the discretization. If neither is specified, the states of all nodes
+    generated by the discretization of the system is returned. As a third
     output the support reactions are always returned.
     -----
     
     Structure:
     
+    If the analysis cache is enabled and the same model was analysed before
+    with the same points of interest and keyword arguments, the results are
+    taken from the cache. It keeps the results in memory and optionally on
+    disk. It is disabled by default. (see analysis_cache)
+    
     First the model is verified. For bigger mistakes a Warning (Error) is raised.
     Some smaller issues are fixed by the function itsself. (see verification)
     
+    The verification of the structure, the discretization, the assembly of the
+    stiffness matrix and the application of the boundary conditions are carried
+    out by prepare_model. The loads are analysed by the returned compiled
+    model. (see compiled_model)
+    
     The method of the discretization of the system is controlled by the keyword
     arguments. It subdivides each beam into smaller Elements. (see discretization)
     
     The stiffness matrix and the force matrix (one column for each loadgroup)
     are assembled. The force matrix is assembled using the shape function,
     whereas the stiffness matrix is assembled in sparse format using the 
-    hardcoded local stiffness matrices. (see subpackage assembly)
+    hardcoded local stiffness matrices. (see subpackage assembly) Functional
+    loads are integrated adaptively or with the vectorized Gauss-Legendre 
+    quadrature. (see quadrature)
+    
+    Optionally the interior nodes of the beams are condensed, such that only
+    the system of the original nodes is solved. (see condensation)
     
     The stiffness matrix and the force matrix are split according to the
     restricted degrees. (see apply_boundary_conditions)
     
-    The system is solved using scipy.sparse.linalg.spsolve, which provides very
-    fast and for normal sized systems sufficiently accurate displacements as
-    solution. Further the support reactions are calculated. (see solve)
+    The system is solved using the sparse LU factorization of
+    scipy.sparse.linalg.splu or, if the solver is 'Banded', using the banded
+    Cholesky factorization of the renumbered system. The factorizations are kept in a cache, such that
+    repeated analyses of the same system with different loads only carry out
+    the back-substitution. Further the support reactions are calculated. 
+    (see solve and factorization)
+    
+    If a mirror plane is specified and the structure is symmetric, the
+    stiffness matrix is split into a symmetric and an antisymmetric half-size
+    system, which are factorized and solved separately. (see symmetry)
     
     From these displacements the internal forces are backcalculated for each 
     element and combined with the internal forces resulting from assembling the 
     loads of the system (see back_calculation)
     
     If no points of interest are specified, the internal forces and displacements
-    are returned beamwise for all generated nodes of each beam. They are returned
-    in two dictionaries per loadgroup (see make_lists)
+    are returned beamwise for all generated nodes of each beam. They are stored
+    in a single array for all loadgroups, each loadgroup can be used as the
+    dictionary of the beams values (see make_lists and results)
     
     If points of interest are specified, the displacement and the internal
     forces are calculated and returned in two lists with dictionaries for each
     loadgroup (see points_of_interest)
+    
+    If stations are specified, the internal forces are calculated exactly by
+    equilibrium and the displacements from the shape functions and the exact
+    solution of the member loads. They are returned beamwise in the same 
+    format as for the generated nodes. A coarse discretization therefore gives
+    the same results at the stations as a fine one. (see stations)
     -----
     
     Limitations:
@@ -74,7 +119,8 @@ def structure_analysis(model_original, *points_of_interest,
         internal forces
         Initial displacements can only be applied to restricted degrees of freedom
         For finite shear stiffness, a low amount of discretization elements 
-        leads to inaccurate results.
+        leads to inaccurate results. This also applies to the displacements
+        at stations.
     -----
     
     Arguments:
@@ -93,57 +139,57 @@ def structure_analysis(model_original, *points_of_interest,
         disclength   -- the length of the beams elements the maximal length of 
                         the elements each beam is subdivided into if discType 
                         is 'Lengthwise'
+        solver       -- the method of factorizing the stiffness matrix, either
+                        'Sparse' (default) or 'Banded' (see factorization)
+        condensation -- if True, the interior nodes of the beams are condensed
+                        statically, such that the system is only solved at
+                        the original nodes (see condensation)
+        stations     -- a list containing for each beam an array of the 
+                        distances from the beams start, at which the state is
+                        to be calculated (see stations)
+        quadrature   -- the quadrature of the functional loads, either
+                        'Adaptive' (default, scipy.integrate.quad) or 
+                        'Gauss-Legendre' (see quadrature)
+        mirror       -- the x coordinate of a vertical mirror plane of the
+                        structure, 'Auto' for the middle of the structure if
+                        it is symmetric, or None (default) (see symmetry)
         
     Return values:
-        deformations      -- a list containing a dictionary of the deformations
-                             for each loadgroup, either of all created nodes or
-                             the points of interest
-        internal_forces   -- a list containing a dictionary of the internal
-                             forces for each loadgroup, either of all created
-                             nodes or the points of interest
+        deformations      -- the beamwise deformations of all loadgroups (see
+                             results) or a list containing a dictionary of the
+                             deformations of the points of interest for each
+                             loadgroup
+        internal_forces   -- the beamwise internal forces of all loadgroups
+                             (see results) or a list containing a dictionary of
+                             the internal forces of the points of interest for
+                             each loadgroup
         support_reactions -- a list of the restricted nodes and their support 
                              reactions
     """
-    # Abbreviations:
-    # d    = displacements
-    # if   = internal forces
-    # mat  = matrix
-    # disc = discretization
-
-    # Verify the input.
-    model = verify_input(model_original)
-
-    nodes = model['Nodes']
-    beams = model['Beams']
-    loads = model['Loads']
-    boundary_conditions = model['Boundary Conditions']
-
-    # Discretize the structure.
-    disc_information = discretize(nodes, beams, discType, discElements, discLength)
-
-    # Get the global stiffness and force matrix and the internal forces from assembling.
-    stiffness_mat, force_mat, if_mat_assembly = assemble(model, disc_information)
-
-    # Apply the boundary conditions to the stiffness and the force matrix
-    modified_matrices = apply_boundary_conditions(boundary_conditions, stiffness_mat, force_mat)
-
-    # Solve the system and create the support reactions list.
-    d_mat, support_reactions, springs_reactions = solve(modified_matrices, loads, boundary_conditions)
-
-    # Get the elementwise displacements and calculate the internal forces.
-    id_matrix, if_matrices = get_internal_forces(beams, d_mat, if_mat_assembly, disc_information)
-
-    # Create the dictionaries to return, depending on whether points of interest are specified or not.
-    if not points_of_interest:
-        # Create Lists of dictionaries containing the data of all nodes.
-        d_dict, if_dict = get_dictionaries(disc_information, id_matrix, if_matrices)
-    else:
-        # Create Lists of dictionaries containing the data of the points of interest.
-        d_dict, if_dict = calculate_state_poi(loads, points_of_interest,
-                                              disc_information, id_matrix,
-                                              if_matrices)
+    count_call('Analysis')
 
-    deformations = d_dict
-    internal_forces = if_dict
+    # Look up the results of an identical analysis.
+    key = None
+    if analysis_cache.enabled:
+        settings = {'discType': discType, 'discElements': discElements,
+                    'discLength': discLength, 'solver': solver,
+                    'condensation': condensation, 'stations': stations,
+                    'quadrature': quadrature, 'mirror': mirror}
+        with stage('Cache Lookup'):
+            key = analysis_cache.get_key(model_original, points_of_interest, settings)
+            results = analysis_cache.get_results(key) if key is not None else None
+        if results is not None:
+            count_call('Cache Hit')
+            return results
 
-    return deformations, internal_forces, support_reactions, springs_reactions
+    # Verify, discretize and assemble the structure, then solve it for the loads.
+    compiled_model = prepare_model(model_original, discType=discType,
+                                   discElements=discElements, discLength=discLength,
+                                   solver=solver, condensation=condensation,
+                                   quadrature=quadrature, mirror=mirror)
+    results = compiled_model.solve(model_original['Loads'], *points_of_interest,
+                                   stations=stations)
+    if key is not None:
+        with stage('Cache Saving'):
+            analysis_cache.save_results(key, results)
+    return results
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the cache of the results of structure_analysis.
+
+Parameter studies and optimisations often analyse identical models again (for
+example the same tie or the same network arch of a repeated bridge
+configuration). The results are therefore stored under a key built from the
+content of the model (nodes, beams, loads and boundary conditions), the points
+of interest and the keyword arguments of the analysis. The key is a hash of a
+normalized representation: lists and tuples, integers and floats, and arrays
+and (nested) lists of numbers with the same shape and values give the same
+key. Dictionary keys keep their type, such that 1 and '1' differ. Models
+containing functions (e.g. functional loads) can not be hashed reliably and
+are never cached.
+
+The results are kept in memory and optionally in a directory as compressed npz
+files, such that they are shared between processes and runs. Both levels are
+least recently used caches bounded by the amount of results in memory and by
+the total size of the files on disk. The cached results are copied, changing
+returned results therefore does not change the cache.
+
+The cache used by structure_analysis is disabled by default, since it keeps
+copies of the results of all cached analyses. It is enabled by setting its
+size or its directory:
+
+    analysis_cache.maxsize = 32
+    analysis_cache.directory = 'cache'
+"""
+
+from collections import OrderedDict
+from copy import deepcopy
+from hashlib import sha1
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from .results import BeamResults
+
+# Changing the results of the analysis invalidates the files of older versions.
+CACHE_VERSION = 2
+
+
+class AnalysisCache:
+    """A least recently used cache of analysis results in memory and on disk.
+
+    Keyword arguments:
+        maxsize       -- the maximal amount of results kept in memory, a
+                         maxsize of zero disables the cache in memory
+        directory     -- the directory of the cached files, None disables the
+                         cache on disk
+        max_disk_size -- the maximal total size of the cached files in bytes
+    """
+
+    def __init__(self, maxsize=32, directory=None, max_disk_size=2**30):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_disk_size = max_disk_size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        return
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0 or self.directory is not None
+
+    def get_key(self, model, points_of_interest, settings):
+        """Creates the key of an analysis.
+
+        Arguments:
+            model              -- the structural model as a dictionary
+            points_of_interest -- the points of interest of the analysis
+            settings           -- a dictionary of the keyword arguments of the
+                                  analysis
+
+        Return values:
+            key -- a hash of the analysis, None if it can not be hashed
+        """
+        key = sha1(str(CACHE_VERSION).encode())
+        try:
+            update_key(key, model)
+            update_key(key, list(points_of_interest))
+            update_key(key, settings)
+        except TypeError:
+            return None
+        return key.hexdigest()
+
+    def get_results(self, key):
+        """Returns a copy of the cached results of the key, None if they are not cached."""
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return deepcopy(self.results[key])
+
+        results = self.load(key)
+        if results is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self.save_in_memory(key, results)
+        return deepcopy(results)
+
+    def save_results(self, key, results):
+        """Saves a copy of the results of the key in memory and on disk."""
+        results = deepcopy(results)
+        self.save_in_memory(key, results)
+        self.save(key, results)
+        return
+
+    def save_in_memory(self, key, results):
+        """Saves the results in memory and evicts the least recently used ones."""
+        if self.maxsize <= 0:
+            return
+        self.results[key] = results
+        self.results.move_to_end(key)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+        return
+
+    def get_path(self, key):
+        return os.path.join(self.directory, key + '.npz')
+
+    def load(self, key):
+        """Loads the results of the key from the directory, None if the file does not exist."""
+        if self.directory is None:
+            return None
+        path = self.get_path(key)
+        try:
+            with np.load(path) as arrays:
+                results = decode_results(arrays)
+            # Mark the file as recently used.
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        return results
+
+    def save(self, key, results):
+        """Saves the results of the key in the directory and evicts the least recently used files."""
+        if self.directory is None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Write a temporary file first, such that other processes never read
+        # an incomplete file.
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as file:
+            np.savez_compressed(file, **encode_results(results))
+        os.replace(temporary_path, self.get_path(key))
+        self.evict_files()
+        return
+
+    def evict_files(self):
+        """Deletes the least recently used files until the size of the directory is allowed."""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.npz'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                status = os.stat(path)
+            except OSError:
+                continue
+            files.append((status.st_mtime, status.st_size, path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total_size <= self.max_disk_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_size -= size
+        return
+
+    def clear(self, disk=False):
+        """Deletes all results in memory (and on disk) and resets the counters."""
+        self.results.clear()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if disk and self.directory is not None and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith('.npz'):
+                    os.remove(os.path.join(self.directory, name))
+        return
+
+    def info(self):
+        """Returns a dictionary with the hits, misses and the size of the cache."""
+        info = {'Hits': self.hits, 'Disk Hits': self.disk_hits, 'Misses': self.misses,
+                'Size': len(self.results), 'Maxsize': self.maxsize,
+                'Directory': self.directory}
+        return info
+
+
+def update_key(key, value):
+    """Adds the normalized representation of a value to the key.
+
+    Arguments:
+        key   -- the hash object (see hashlib)
+        value -- a dictionary, list, tuple, array, number, string or None
+
+    Raises a TypeError for any other value (e.g. functions).
+    """
+    if isinstance(value, dict):
+        key.update(b'D' + str(len(value)).encode())
+        for item_key in sorted(value, key=get_sort_key):
+            update_key(key, item_key)
+            update_key(key, value[item_key])
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        key.update(b'A' + str(value.shape).encode())
+        key.update(np.ascontiguousarray(value, dtype=np.float64).tobytes())
+    elif isinstance(value, (list, tuple, np.ndarray)):
+        # (Nested) lists of numbers are hashed as arrays, such that both are equal.
+        if is_numeric(value):
+            update_key(key, np.array(value, dtype=np.float64))
+            return
+        key.update(b'L' + str(len(value)).encode())
+        for item in value:
+            update_key(key, item)
+    elif isinstance(value, (bool, np.bool_)):
+        key.update(b'B' + str(bool(value)).encode())
+    elif isinstance(value, (int, float, np.number)):
+        key.update(b'F' + np.float64(value).tobytes())
+    elif isinstance(value, str):
+        key.update(b'S' + str(len(value)).encode() + b':' + value.encode())
+    elif value is None:
+        key.update(b'N')
+    else:
+        raise TypeError('The value ' + repr(value) + ' can not be hashed.')
+    return
+
+
+def is_numeric(value):
+    """Returns True if the value is a number or a rectangular (nested) list of numbers."""
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if isinstance(value, (int, float, np.number)):
+        return True
+    if isinstance(value, np.ndarray):
+        return value.dtype.kind in 'iuf' or (value.dtype == object and is_numeric(list(value)))
+    if not isinstance(value, (list, tuple)) or not value:
+        return False
+    if all(isinstance(item, (int, float, np.number)) and not isinstance(item, (bool, np.bool_))
+           for item in value):
+        return True
+    shapes = [np.shape(item) if is_numeric(item) else None for item in value]
+    return shapes[0] is not None and len(shapes[0]) > 0 and all(shape == shapes[0] for shape in shapes)
+
+
+def get_sort_key(item_key):
+    """Orders the keys of a dictionary, numbers by their value and all others by their type and string."""
+    if isinstance(item_key, (int, float, np.number)) and not isinstance(item_key, (bool, np.bool_)):
+        return 0, float(item_key), ''
+    return 1, 0.0, type(item_key).__name__ + ':' + str(item_key)
+
+
+def encode_results(results):
+    """Converts the results of an analysis into a dictionary of arrays for np.savez.
+
+    Beamwise results are saved as arrays, all other results (points of
+    interest and support reactions) as a JSON string.
+    """
+    arrays = {}
+    description = []
+    for i, part in enumerate(results):
+        if isinstance(part, BeamResults):
+            arrays['values_' + str(i)] = part.values
+            arrays['offsets_' + str(i)] = part.offsets
+            description.append({'Beams': part.keys})
+        else:
+            description.append({'List': part})
+    arrays['description'] = np.array(json.dumps(description, default=lambda x: x.tolist()))
+    return arrays
+
+
+def decode_results(arrays):
+    """Converts the arrays of encode_results back into the results of an analysis."""
+    results = []
+    for i, part in enumerate(json.loads(str(arrays['description']))):
+        if 'Beams' in part:
+            results.append(BeamResults(arrays['values_' + str(i)],
+                                       arrays['offsets_' + str(i)], part['Beams']))
+        else:
+            results.append(part['List'])
+    return tuple(results)
+
+
+# The cache used by the function structure_analysis of the package, it is
+# disabled until its maxsize or directory is set.
+analysis_cache = AnalysisCache(maxsize=0)
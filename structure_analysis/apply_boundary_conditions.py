@@ -25,7 +25,41 @@ def apply_boundary_conditions(boundary_conditions, stiffness_matrix, force_matri
     Return values:
         stiffness_and_force_matrices -- the stiffness and force matrices of the
                                         restricted and the unrestricted nodal
-                                        directions
+                                        directions, the rotation matrices and
+                                        the unrestricted nodal directions
+    """
+    stiffness_matrices = modify_stiffness_matrix(boundary_conditions, stiffness_matrix)
+    force_matrices = modify_force_matrix(stiffness_matrices, force_matrix)
+
+    stiffness_and_force_matrices = [stiffness_matrices[0],
+                                    stiffness_matrices[1],
+                                    force_matrices[0],
+                                    force_matrices[1],
+                                    stiffness_matrices[4],
+                                    stiffness_matrices[5],
+                                    stiffness_matrices[2]]
+    return stiffness_and_force_matrices
+
+
+def modify_stiffness_matrix(boundary_conditions, stiffness_matrix):
+    """Splits the stiffness matrix according to the boundary conditions.
+
+    The unrestricted and restricted nodal directions are returned as well, 
+    such that the force matrices of any loads can be split afterwards without
+    repeating this step. (see modify_force_matrix)
+    
+    The rotation matrices are None if the system has no rotated degrees.
+
+    Arguments:
+        boundary_conditions -- the boundary conditions of the system
+        stiffness_matrix    -- the stiffness matrix of the system, not including
+                               restricted degrees
+
+    Return values:
+        stiffness_matrices -- the stiffness matrices of the unrestricted and the
+                              restricted nodal directions, the indices of the
+                              unrestricted and the restricted nodal directions
+                              and the rotation matrix and its transposed
     """
     restricted_degrees = boundary_conditions['Restricted Degrees']
     springs = boundary_conditions['Springs']
@@ -33,36 +67,57 @@ def apply_boundary_conditions(boundary_conditions, stiffness_matrix, force_matri
 
     size = stiffness_matrix.shape[0]
 
-    # Determine the nodal directions which are restricted.    
-    indices = get_indices_todelete(restricted_degrees)
+    # Determine the nodal directions which are restricted and the free ones.
+    restricted_indices = get_indices_todelete(restricted_degrees)
+    free_indices = get_free_indices(size, restricted_indices)
 
-    # Get the matrices that can delete certain rows or columns
-    (delete_rows, delete_columns, keep_rows, keep_columns) = modifier_matrices(size, indices)
+    # Rotate the stiffness matrix, only if there are rotated degrees.
+    if rotated_degrees:
+        r, rt = rotation_matrices(size, rotated_degrees)
+        stiffness_mat = r @ stiffness_matrix @ rt
+    else:
+        r, rt = None, None
+        stiffness_mat = stiffness_matrix
 
-    r, rt = rotation_matrices(size, rotated_degrees)
+    # Include springs
+    if springs:
+        stiffness_mat = stiffness_mat + springs_matrix(size, springs)
 
-    # Delete the determined nodes with the help of the modifier matrices.
-    force_matrix_modified = delete_rows @ r @ force_matrix
-    force_matrix_supports = keep_rows @ r @ force_matrix
+    # Extract the blocks of the free and the restricted nodal directions.
+    stiffness_mat = sps.csr_matrix(stiffness_mat)
+    stiffness_matrix_free_rows = stiffness_mat[free_indices]
+    stiffness_matrix_modified = stiffness_matrix_free_rows[:, free_indices]
+    stiffness_matrix_supports = stiffness_mat[restricted_indices][:, free_indices]
 
-    stiffness_mat = r @ stiffness_matrix @ rt
+    stiffness_matrices = [stiffness_matrix_modified,
+                          stiffness_matrix_supports,
+                          free_indices, restricted_indices,
+                          r, rt]
+    return stiffness_matrices
 
-    # Include springs
-    for spring in springs:
-        i = spring[0]
-        stiffness_mat[3*i, 3*i] += spring[1]
-        stiffness_mat[3*i+1, 3*i+1] += spring[2]
-        stiffness_mat[3*i+2, 3*i+2] += spring[3]
-
-    stiffness_matrix_modified = delete_rows @ stiffness_mat @ delete_columns
-    stiffness_matrix_supports = keep_rows @ stiffness_mat @ delete_columns
-
-    stiffness_and_force_matrices = [stiffness_matrix_modified,
-                                    stiffness_matrix_supports,
-                                    force_matrix_modified,
-                                    force_matrix_supports,
-                                    r, rt]
-    return stiffness_and_force_matrices
+
+def modify_force_matrix(stiffness_matrices, force_matrix):
+    """Splits the force matrix with the indices given by modify_stiffness_matrix.
+
+    Arguments:
+        stiffness_matrices -- the list returned by modify_stiffness_matrix
+        force_matrix       -- a matrix combining the global force vectors of 
+                              the different loadgroups
+
+    Return values:
+        force_matrix_modified -- the force matrix of the unrestricted directions
+        force_matrix_supports -- the force matrix of the restricted directions
+    """
+    free_indices = stiffness_matrices[2]
+    restricted_indices = stiffness_matrices[3]
+    r = stiffness_matrices[4]
+
+    if r is not None:
+        force_matrix = r @ force_matrix
+
+    force_matrix_modified = force_matrix[free_indices]
+    force_matrix_supports = force_matrix[restricted_indices]
+    return force_matrix_modified, force_matrix_supports
 
 
 def rotation_matrices(original_size, rotated_degrees):
@@ -83,65 +138,49 @@ def rotation_matrices(original_size, rotated_degrees):
     return r1, rt
 
 
-def modifier_matrices(original_size, indices):
-    """Creates matrices that can keep or delete certain indices from a square matrix.
+def springs_matrix(original_size, springs):
+    """Creates the sparse diagonal matrix of the springs stiffnesses.
     
-    It creates the four matrices to delete or extract the specified indices
-    (rows or columns).
-    
-    Keyword argument:
+    Arguments:
         original_size -- the original amount of indices
-        indices       -- a numpy vector of the indices which are to be kept or 
-                         deleted
+        springs       -- the springs of the system
         
     Return values:
-        delete_rows    -- a matrix which deletes the specified indices rows
-                          from a matrix with original_size rows
-        delete_columns -- a matrix which deletes the specified indices columns
-                          from a matrix with original_size columns
-        keep_rows      -- a matrix which extracts the specified indices rows
-                          from a matrix with original_size rows
-        keep_columns   -- a matrix which extracts the specified indices columns
-                          from a matrix with original_size columns
+        springs_mat -- a sparse diagonal matrix with the springs stiffnesses
     """
-    amount_todelete = indices.shape[0]
-    new_size = original_size - amount_todelete
-
-    # List of the elements which are to be kept or killed
-    elements_original = np.arange(original_size)
-    elements_keep = np.delete(elements_original, indices, None)
-    elements_kill = indices
-
-    # List of ones for each element to kill or keep
-    ones_kill = np.ones(new_size)
-    ones_keep = np.ones(amount_todelete)
-
-    # Normal Count for the elements to kill or keep
-    count_kill = np.arange(new_size)
-    count_keep = np.arange(amount_todelete)
-
-    # Create the sparse matrices to delete or keep the specified rows or cols.
-    delete_rows = sps.csr_matrix((ones_kill, (count_kill, elements_keep)),
-                                 (new_size, original_size))
-
-    delete_columns = sps.csr_matrix((ones_kill, (elements_keep, count_kill)),
-                                    (original_size, new_size))
-    if any(ones_keep):
-        keep_rows = sps.csr_matrix((ones_keep, (count_keep, elements_kill)),
-                                   (amount_todelete, original_size))
-
-        keep_columns = sps.csr_matrix((ones_keep, (elements_kill, count_keep)),
-                                      (original_size, amount_todelete))
-    else:
-        keep_rows = sps.csr_matrix(([], ([], [])), (amount_todelete, original_size))
-        keep_columns = sps.csr_matrix(([], ([], [])), (original_size, amount_todelete))
+    springs_array = np.array([spring[0:4] for spring in springs], dtype=float)
+    indices = 3 * springs_array[:, 0:1].astype(int) + np.arange(3)
+    
+    # Multiple springs on the same node are summed up.
+    diagonal = np.zeros(original_size)
+    np.add.at(diagonal, indices.ravel(), springs_array[:, 1:4].ravel())
+    
+    springs_mat = sps.diags(diagonal, format='csr')
+    return springs_mat
 
-    return delete_rows, delete_columns, keep_rows, keep_columns
+
+def get_free_indices(original_size, indices):
+    """Gives a sorted numpy vector of all nodal degrees of freedom which are not deleted.
+    
+    Arguments:
+        original_size -- the original amount of indices
+        indices       -- a numpy vector of the indices which are to be deleted
+        
+    Return values:
+        free_indices -- a numpy vector of the remaining indices
+    """
+    is_free = np.ones(original_size, dtype=bool)
+    is_free[indices] = False
+    free_indices = np.flatnonzero(is_free)
+    return free_indices
 
 
 def get_indices_todelete(restricted_degrees):
     """Gives a numpy vector of the nodal degrees of freedom which are to be deleted.
     
+    The indices are ordered as the restricted degrees, which is the order of 
+    the support reactions.
+    
     Arguments:
         restricted_degrees -- the restricted degrees of the system 
     
@@ -149,17 +188,14 @@ def get_indices_todelete(restricted_degrees):
         indices_rdofs -- a numpy vector containing all the nodal degrees of
                             freedom which are to be deleted
     """
-    indices_rdofs = np.empty((0, 0), dtype=int)
-
-    # Append the list for each restricted nodal degree of freedom
-    for restricted_degree in restricted_degrees:
-        if restricted_degree[1] == 1:
-            indices_rdofs = np.append(indices_rdofs, restricted_degree[0] * 3 + 0)
-
-        if restricted_degree[2] == 1:
-            indices_rdofs = np.append(indices_rdofs, restricted_degree[0] * 3 + 1)
-
-        if restricted_degree[3] == 1:
-            indices_rdofs = np.append(indices_rdofs, restricted_degree[0] * 3 + 2)
+    if not restricted_degrees:
+        return np.empty(0, dtype=int)
+    
+    restricted_array = np.array([restricted_degree[0:4] for restricted_degree 
+                                 in restricted_degrees], dtype=int)
+    
+    # Select each restricted nodal degree of freedom
+    indices_all = 3 * restricted_array[:, 0:1] + np.arange(3)
+    indices_rdofs = indices_all[restricted_array[:, 1:4] == 1]
 
     return indices_rdofs
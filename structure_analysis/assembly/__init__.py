@@ -30,11 +30,12 @@ def assemble(model,discretization_information):
     Return values:
         stiffness_matrix         -- the stiffness matrix of the system, not 
                                     including restricted degrees
-        force_matrix             -- a matrix combining the global force vectors 
-                                    of the different loadgroups
-        internal_forces_assembly -- a list of matrices saving the internal 
-                                    forces for each loadgroup resulting from 
-                                    assembling its loads
+        force_matrix             -- a sparse matrix combining the global force
+                                    vectors of the different loadgroups
+        internal_forces_assembly -- a sparse matrix (6*elements, loadgroups)
+                                    saving the internal forces of each
+                                    loadgroup resulting from assembling its
+                                    loads
     """
     
     #Get the required information from the input.
@@ -59,6 +60,6 @@ def assemble(model,discretization_information):
                                                                 beams_information)
     
     #Applies the initial displacements on the restricted degrees
-    apply_initial_displacements(loads, stiffness_matrix, force_matrix)
+    force_matrix = apply_initial_displacements(loads, stiffness_matrix, force_matrix)
     
     return stiffness_matrix, force_matrix, internal_forces_assembly
\ No newline at end of file
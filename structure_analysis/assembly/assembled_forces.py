@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the array format of the assembled forces.
+
+The assembling functions of the loadtypes return the local nodal forces of each
+loaded element as a structured array with one entry per loaded element:
+
+    'Loadgroup' -- the number of the loadgroup
+    'Element'   -- the number of the loaded element
+    'Nodes'     -- the numbers of the start and end node of the element (the
+                   node -1 is a placeholder without forces)
+    'Theta'     -- the orientation of the element
+    'Forces'    -- the six local nodal forces (start and end node)
+
+The entries of all loadgroups are therefore added to the force matrix and the
+internal forces at once. (see force_matrix)
+"""
+
+import numpy as np
+
+ASSEMBLED_FORCES_DTYPE = np.dtype([('Loadgroup', int), ('Element', int),
+                                   ('Nodes', int, (2,)), ('Theta', float),
+                                   ('Forces', float, (6,))])
+
+
+def create_assembled_forces(loadgroups, elements, nodes_left, nodes_right, theta, forces):
+    """Creates the structured array of the assembled forces.
+
+    Arguments:
+        loadgroups  -- an array of the loadgroup numbers
+        elements    -- an array of the loaded elements
+        nodes_left  -- an array of the start nodes of the elements
+        nodes_right -- an array of the end nodes of the elements
+        theta       -- an array of the orientations of the elements
+        forces      -- an array (entries, 6) of the local nodal forces
+
+    Return values:
+        assembled_forces -- the structured array of the assembled forces
+    """
+    assembled_forces = np.empty(len(elements), dtype=ASSEMBLED_FORCES_DTYPE)
+    assembled_forces['Loadgroup'] = loadgroups
+    assembled_forces['Element']   = elements
+    assembled_forces['Nodes']     = np.column_stack((nodes_left, nodes_right))
+    assembled_forces['Theta']     = theta
+    assembled_forces['Forces']    = forces
+    return assembled_forces
+
+
+def convert_assembled_forces(assembled_forces_list, loadgroup):
+    """Converts a list of assembled forces of a loadgroup into the structured array.
+
+    Arguments:
+        assembled_forces_list -- a list containing for each loaded element its
+                                 element number, the two node numbers, the
+                                 orientation and its nodal forces (6, 1)
+        loadgroup             -- the number of the loadgroup
+
+    Return values:
+        assembled_forces -- the structured array of the assembled forces
+    """
+    assembled_forces = np.empty(len(assembled_forces_list), dtype=ASSEMBLED_FORCES_DTYPE)
+    for i, (element_nr, node_left, node_right, theta, forces) in enumerate(assembled_forces_list):
+        assembled_forces[i] = (loadgroup, element_nr, (node_left, node_right), theta,
+                               np.ravel(forces))
+    return assembled_forces
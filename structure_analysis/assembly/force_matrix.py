@@ -7,29 +7,36 @@ Created on Mon May 13 21:24:07 2019
 The module contains the functions to build the global force matrix and the 
 internal force matrix (from assembling). The functions to calculate the nodal
 forces depending on the different loadtypes are used from separate modules. 
-"""
 
-from copy import deepcopy
+Both are built as sparse matrices: a loadgroup usually only loads a few nodes
+(e.g. one unit load per loadgroup in influence studies), such that the memory
+scales with the amount of loaded nodes instead of the degrees of freedom times
+the amount of loadgroups.
+"""
 
 import numpy as np
 from scipy.sparse import csr_matrix
 
-from .loads_distributed import assemble_distributed_loads
+from .assembled_forces import ASSEMBLED_FORCES_DTYPE, convert_assembled_forces
+from .loads_distributed import assemble_distributed_loads, get_distributed_loads_array
 from .loads_functions import assemble_functional_loads
-from .loads_point import assemble_point_loads
-from .rotation_matrix import get_rotation_matrix
+from .loads_point import assemble_point_loads, get_point_loads_array
+from .rotation_matrix import get_rotation_components
 
 
 def get_force_matrices(loads, nodes_lists, elements_lists, releases_elements,
-                       beams_information):
+                       beams_information, quadrature='Adaptive'):
     """Assembles the global force matrix and the internal forces from the loads.
     
     It uses the separately defined loadtype assembling functions. These return
-    the local element forces together with the element number, its orientation
-    and its starting and ending node. (saved in assembled_forces)
+    the local element forces together with the loadgroup, the element number,
+    its orientation and its starting and ending node. (saved in a structured
+    array, see assembled_forces)
     
-    The assembled_forces variable is afterwards used to update the global force
-    vector and the internal forces matrix of each loadgroup.
+    The point and distributed loads of all loadgroups are assembled at once,
+    the functional loads loadgroup by loadgroup. All assembled forces are
+    afterwards added to the global force matrix and the internal forces
+    matrix in one step.
     
     The only exception are the 'Nodal' loads which are handled separately, since
     they cause no internal forces during assembling.
@@ -46,223 +53,207 @@ def get_force_matrices(loads, nodes_lists, elements_lists, releases_elements,
                              beam length, beam orientation, number of elements 
                              created on the beam, length of these elements
     
+    Keyword arguments:
+        quadrature -- the quadrature of the functional loads, either 'Adaptive'
+                      or 'Gauss-Legendre' (see quadrature)
+    
     Return values:
-        force_matrix             -- a matrix combining the global force vectors
-                                    of the different loadgroups
-        internal_forces_assembly -- a list of matrices saving the internal forces
-                                    for each loadgroup resulting from assembling 
-                                    its loads
+        force_matrix             -- a sparse matrix combining the global force
+                                    vectors of the different loadgroups
+        internal_forces_assembly -- a sparse matrix (6*elements, loadgroups)
+                                    saving the internal forces of each loadgroup
+                                    resulting from assembling its loads
     """
     number_of_nodes = max([max(sublist)] for sublist in nodes_lists)[0] + 1
     
     number_of_elements   = elements_lists[-1][-1]+1
     number_of_loadgroups = len(loads)
 
-    #Create the empty global force matrix.
-    force_matrix = np.zeros((3*number_of_nodes, number_of_loadgroups))
+    #Create the lists of the entries of the nodal loads.
+    force_vector = [[],[],[]]
     
-    #Create the empty internal forces list.
-    internal_forces_assembly=[]
+    #Assemble the point and distributed loads of all loadgroups.
+    assembled_forces = [assemble_point_loads(nodes_lists, elements_lists,
+                                             beams_information,
+                                             get_point_loads_array(loads)),
+                        assemble_distributed_loads(nodes_lists, elements_lists,
+                                                   beams_information,
+                                                   get_distributed_loads_array(loads))]
     
-    #Update the global force matrix and the internal forces list for each loadgroup.
+    #Add the nodal loads and assemble the functional loads of each loadgroup.
     for loadgroup_nr, loadgroup in enumerate(loads,0):
         
-        internal_forces_sparse_lists = [[],[],[]]
-        
-        #Get the force vector for the current loadgroup.
-        force_vector = force_matrix[:,loadgroup_nr]
-        
-        
-        #Update the global force vector for each loadtype and its internal forces
         if 'Nodal' in loadgroup and loadgroup['Nodal']:
-            add_nodal_forces(force_vector,loadgroup['Nodal'])
-            
-        if 'Point' in loadgroup and loadgroup['Point']:
-            assembled_forces=assemble_point_loads(nodes_lists, 
-                                                  elements_lists,
-                                                  beams_information,
-                                                  loadgroup['Point'])
-            add_assembled_forces(internal_forces_sparse_lists, force_vector,
-                                 assembled_forces, releases_elements, 
-                                 beams_information)
-         
-        if 'Distributed' in loadgroup and loadgroup['Distributed']:
-            assembled_forces=assemble_distributed_loads(nodes_lists, 
-                                                        elements_lists,
-                                                        beams_information,
-                                                        loadgroup['Distributed'])
-            add_assembled_forces(internal_forces_sparse_lists, force_vector,
-                                 assembled_forces, releases_elements, 
-                                 beams_information)
+            add_nodal_forces(force_vector, loadgroup['Nodal'], loadgroup_nr)
             
         if 'Functions' in loadgroup and loadgroup['Functions']:
-            assembled_forces=assemble_functional_loads(nodes_lists, 
-                                                       elements_lists,
-                                                      beams_information,
-                                                      loadgroup['Functions'])
-            add_assembled_forces(internal_forces_sparse_lists, force_vector,
-                                 assembled_forces, releases_elements, 
-                                 beams_information)
-            
-        #Create the internal forces matrix
-        rows = internal_forces_sparse_lists[0]
-        cols = internal_forces_sparse_lists[1]
-        data = internal_forces_sparse_lists[2]
-        
-        internal_forces_toadd=csr_matrix((data, (rows, cols)),
-                                          shape=(6, number_of_elements))
-        
-        #Add it to the list containing the internal force matrix of each loadgroup.
-        internal_forces_assembly.append(internal_forces_toadd)
+            assembled_functions=assemble_functional_loads(nodes_lists, 
+                                                          elements_lists,
+                                                          beams_information,
+                                                          loadgroup['Functions'],
+                                                          quadrature=quadrature)
+            assembled_forces.append(convert_assembled_forces(assembled_functions,
+                                                             loadgroup_nr))
+    
+    assembled_forces = np.concatenate(assembled_forces)
+    
+    #Get the entries of the global force matrix and the internal forces.
+    force_entries, internal_forces_entries = get_assembled_entries(assembled_forces,
+                                                                   releases_elements,
+                                                                   beams_information,
+                                                                   number_of_elements)
+    
+    #Create the global force matrix, entries of the same degree are summed up.
+    rows = np.concatenate((force_vector[0], force_entries[0]))
+    cols = np.concatenate((force_vector[1], force_entries[1]))
+    data = np.concatenate((force_vector[2], force_entries[2]))
+    
+    force_matrix = csr_matrix((data, (rows.astype(int), cols.astype(int))),
+                              shape=(3*number_of_nodes, number_of_loadgroups))
+    
+    #Create the internal forces matrix, the rows are ordered by the internal
+    # force and then by the element.
+    loadgroups, rows, cols, data = internal_forces_entries
+    internal_forces_assembly = csr_matrix((data, (rows*number_of_elements+cols, loadgroups)),
+                                          shape=(6*number_of_elements, number_of_loadgroups))
         
     return force_matrix, internal_forces_assembly
  
-def add_nodal_forces(force_vector, loads_nodal):
-    """Updates the global force vector with the nodal loads.
+def add_nodal_forces(force_vector, loads_nodal, loadgroup_nr):
+    """Updates the entries of the global force matrix with the nodal loads.
     
     Arguments:
-        force_vector -- a single global force vector corresponding to one loadgroup
-        loads_nodal -- the loads applied on nodes
+        force_vector -- the lists of the degrees, the loadgroups and the forces
+                        of the entries of the global force matrix
+        loads_nodal  -- the loads applied on nodes
+        loadgroup_nr -- the number of the loadgroup
     """
     for nodal_load in loads_nodal:
         nodeposition=nodal_load[0]*3
-        force_vector[nodeposition:nodeposition+3]+=nodal_load[1:4]
+        force_vector[0].extend(range(nodeposition, nodeposition+3))
+        force_vector[1].extend([loadgroup_nr]*3)
+        force_vector[2].extend(nodal_load[1:4])
     return
  
-def add_assembled_forces(internal_forces_sparse_lists, force_vector,
-                         assembled_forces, releases_elements, beams_information):
-    """Adds assembled forces to the global force vector and the internal forces matrix.
+def get_assembled_entries(assembled_forces, releases_elements, beams_information,
+                          number_of_elements):
+    """Gives the entries of the global force matrix and the internal forces of assembled forces.
     
     The function handles the modification of the assembled local forces into
-    internal forces and global nodal forces. It also takes into account 
-    possible hinges.
+    internal forces and global nodal forces of all entries at once. It also
+    takes into account possible hinges.
     
     Arguments:
-        internal_forces_sparse_lists -- the temporary lists used to create the 
-                                        sparse internal force matrix
-        force_vector                 -- a single global force vector corresponding
-                                        to one loadgroup
-        assembled_forces             -- a list containing for each loaded element
-                                        the assembled nodal forces, the two node
-                                        numbers and the orientation
-        releases_elements            -- a dictionary saving the special releases
-                                        to the corresponding element number
-        beams_information            -- a list containing for each beam its main
-                                        information: beam length, beam orientation,
-                                        number of elements created on the beam,
-                                        length of these elements
-    """
-    signmatrix = np.diag(np.array([-1,1,-1,1,-1,1]))
+        assembled_forces   -- a structured array containing for each loaded
+                              element its loadgroup, the assembled nodal forces,
+                              the two node numbers and the orientation (see
+                              assembled_forces)
+        releases_elements  -- a dictionary saving the special releases to the
+                              corresponding element number
+        beams_information  -- a list containing for each beam its main
+                              information: beam length, beam orientation,
+                              number of elements created on the beam, length
+                              of these elements
+        number_of_elements -- the amount of elements of the system
     
-    #Handle each entry of assembled forces.
-    for assembled_element_forces in assembled_forces:
-
-        element_nr  = assembled_element_forces[0]
-        theta       = assembled_element_forces[3]
-        startnode   = assembled_element_forces[1]
-        endnode     = assembled_element_forces[2]
-        
-        assembled_force_vector = assembled_element_forces[4]
-        
-        nodespositions = [startnode*3, startnode*3+1, startnode*3+2,
-                          endnode*3,   endnode*3+1,   endnode*3+2  ]
-        
-        #Special treatment for elements with hinged releases.
-        #Normal elements:
-        if element_nr not in releases_elements.keys():
-            local_force_vector = assembled_force_vector
-        #Hinged elements:    
-        else:
-            left_release  = releases_elements.get(element_nr,[0,0])[0]
-            right_release = releases_elements.get(element_nr,[0,0])[1]
-            
-            element_length = get_element_length(element_nr, beams_information)
-            
-            local_force_vector = include_hinges(assembled_force_vector,
-                                                element_length, left_release,
-                                                right_release)
-        
-        #Rotate the local forces into global forces
-        global_nodal_forces = get_rotation_matrix(theta) @ local_force_vector
-        
-        #Update the global force vector.
-        force_vector[nodespositions] += global_nodal_forces[:,0]
-        
-        #Adapt the local forces to the orientation of the internal forces.
-        local_internal_forces = signmatrix @ local_force_vector
-        
-        #Update the internal forces sparse lists.
-        for j in range(6):
-            if local_internal_forces[j][0]!=0:
-                internal_forces_sparse_lists[2].append(local_internal_forces[j][0])
-                internal_forces_sparse_lists[1].append(element_nr)
-                internal_forces_sparse_lists[0].append(j)
-
-    return
- 
-def get_element_length(element_number, beams_information):
-    """Finds the length of an element.
-    
-    Arguments:
-        element_number    -- the number of the element
-        beams_information -- a list containing for each beam its main information:
-                             beam length, beam orientation, number of elements 
-                             created on the beam, length of these elements
-        
     Return values:
-        element_length -- the length of the element
+        force_entries           -- the arrays of the degrees, the loadgroups
+                                   and the forces of the global force matrix
+        internal_forces_entries -- the arrays of the loadgroups, the rows, the
+                                   elements and the values of the internal
+                                   forces
     """
-    #Find the elements beam number
-    element_counter=0
-    for i in range(len(beams_information)):
-        if (element_number>=element_counter 
-            and element_number<=element_counter+beams_information[i][2]-1):
-            beam_nr = i
-            break
-        else:
-            element_counter+=beams_information[i][2]
+    signmatrix = np.array([-1,1,-1,1,-1,1])
+    
+    elements   = assembled_forces['Element']
+    loadgroups = assembled_forces['Loadgroup']
+    local_forces = assembled_forces['Forces']
     
-    #Get the element length with the beam number
-    element_length=beams_information[beam_nr][3]
+    #Special treatment for elements with hinged releases.
+    if releases_elements:
+        element_length = np.repeat([information[3] for information in beams_information],
+                                   [information[2] for information in beams_information])
+        releases = np.zeros((number_of_elements, 2), dtype=int)
+        for element_nr, release in releases_elements.items():
+            releases[element_nr] = release[0:2]
         
-    return element_length
+        local_forces = include_hinges(local_forces, element_length[elements],
+                                      releases[elements,0], releases[elements,1])
+    
+    #Rotate the local forces into global forces
+    cos, sin = get_rotation_components(assembled_forces['Theta'])
+    global_forces = np.empty_like(local_forces)
+    for k in (0, 3):
+        global_forces[:,k]   = cos*local_forces[:,k] - sin*local_forces[:,k+1]
+        global_forces[:,k+1] = sin*local_forces[:,k] + cos*local_forces[:,k+1]
+        global_forces[:,k+2] = local_forces[:,k+2]
+    
+    #Get the entries of the global force matrix. (The node -1 of point loads
+    #on a node is a placeholder without forces)
+    nodes     = assembled_forces['Nodes']
+    positions = np.hstack((3*nodes[:,0:1] + np.arange(3), 3*nodes[:,1:2] + np.arange(3)))
+    positions[np.repeat(nodes < 0, 3, axis=1)] = -1
+    valid = positions >= 0
+    force_entries = (positions[valid],
+                     np.broadcast_to(loadgroups[:,np.newaxis], positions.shape)[valid],
+                     global_forces[valid])
+    
+    #Adapt the local forces to the orientation of the internal forces.
+    local_internal_forces = signmatrix * local_forces
+    nonzero = local_internal_forces != 0
+    internal_forces_entries = (np.broadcast_to(loadgroups[:,np.newaxis], nonzero.shape)[nonzero],
+                               np.broadcast_to(np.arange(6), nonzero.shape)[nonzero],
+                               np.broadcast_to(elements[:,np.newaxis], nonzero.shape)[nonzero],
+                               local_internal_forces[nonzero])
+
+    return force_entries, internal_forces_entries
  
-def include_hinges(assembled_force_vector, element_length, release_start,
-                   release_end):
-    """Creates a copy of the assembled force vector to take into account the hinges.
+def include_hinges(local_forces, element_length, release_start, release_end):
+    """Creates a copy of the assembled forces to take into account the hinges.
     
     Arguments:
-        assembled_force_vector -- the nodal force vector of one assembled 
-                                  loaded element (not including any hinges)
-        element_length         -- the length of the beams elements
-        release_start          -- the type of the release at the start of the 
-                                  element
-        release_end            -- the type of the release at the end of the 
-                                  element
+        local_forces   -- an array (entries, 6) of the nodal forces of the
+                          assembled loaded elements (not including any hinges)
+        element_length -- an array of the lengths of the elements
+        release_start  -- an array of the types of the releases at the start of
+                          the elements
+        release_end    -- an array of the types of the releases at the end of
+                          the elements
     
     Return values:
-        local_force_vector -- the nodal force vector of one assembled loaded
-                              element (including hinges)
+        local_forces_hinged -- an array (entries, 6) of the nodal forces of the
+                               assembled loaded elements (including hinges)
     """
+    local_forces_hinged = local_forces.copy()
+    
+    forces = local_forces.T
+    l = element_length
     
-    local_force_vector = deepcopy(assembled_force_vector)
+    both  = (release_start==1) & (release_end==1)
+    start = (release_start==1) & ~both
+    end   = (release_end==1) & ~both
     
-    forces = assembled_force_vector
+    forces_both = np.array([forces[0],
+                            forces[1]-1/l*(forces[2]+forces[5]),
+                            0*forces[2],
+                            forces[3],
+                            forces[4]+1/l*(forces[2]+forces[5]),
+                            0*forces[5]]).T
+    forces_start = np.array([forces[0],
+                             forces[1]-3/(2*l)*(forces[2]),
+                             0*forces[2],
+                             forces[3],
+                             forces[4]+3/(2*l)*(forces[2]),
+                             forces[5]-1/2*(forces[2])]).T
+    forces_end = np.array([forces[0],
+                           forces[1]-3/(2*l)*(forces[5]),
+                           forces[2]-1/2*(forces[5]),
+                           forces[3],
+                           forces[4]+3/(2*l)*(forces[5]),
+                           0*forces[5]]).T
     
-    if release_start==1 and release_end==1:
-        local_force_vector[1] = forces[1]-1/element_length*(forces[2]+forces[5])
-        local_force_vector[2] = 0
-        local_force_vector[4] = forces[4]+1/element_length*(forces[2]+forces[5])
-        local_force_vector[5] = 0
-    elif release_start==1:
-        local_force_vector[1] = forces[1]-3/(2*element_length)*(forces[2])
-        local_force_vector[2] = 0
-        local_force_vector[4] = forces[4]+3/(2*element_length)*(forces[2])
-        local_force_vector[5] = forces[5]-1/2*(forces[2])
-    elif release_end==1:
-        local_force_vector[1]=forces[1]-3/(2*element_length)*(forces[5])
-        local_force_vector[2]=forces[2]-1/2*(forces[5])
-        local_force_vector[4]=forces[4]+3/(2*element_length)*(forces[5])
-        local_force_vector[5]=0
+    local_forces_hinged[both]  = forces_both[both]
+    local_forces_hinged[start] = forces_start[start]
+    local_forces_hinged[end]   = forces_end[end]
     
-    return local_force_vector
\ No newline at end of file
+    return local_forces_hinged
@@ -8,23 +8,27 @@ The module contains the function which modifies the force matrix to take into
 account initial displacements.
 """
 
-import numpy as np
+import scipy.sparse as sps
 
 def apply_initial_displacements(loads, stiffness_matrix, force_matrix):
-    """Adds the forces corresponding to the initial displacements in the force matrix.
+    """Deducts the forces corresponding to the initial displacements from the force matrix.
+    
+    The product with the stiffness matrix is skipped if no loadgroup contains
+    initial displacements.
     
     Arguments:
         loads            -- a list containing the loadgroups of the model
         stiffness_matrix -- the stiffness matrix of the system, not including 
                             restricted degrees 
-        force_matrix     -- a matrix combining the global force vectors of the
-                            different loadgroups 
-    """
-    #Creates a displacement matrix including all initial displacements.
-    nodal_dofs = stiffness_matrix.shape[0]
-    displacement_matrix = np.zeros((nodal_dofs, len(loads)))
+        force_matrix     -- a sparse matrix combining the global force vectors
+                            of the different loadgroups 
     
-    #Build the initial displacement matrix.
+    Return values:
+        force_matrix -- the sparse force matrix including the forces of the
+                        initial displacements
+    """
+    #Collect the entries of the initial displacement matrix.
+    rows, cols, data = [], [], []
     for load_nr, loadgroup in enumerate(loads,0):
         
         if ('Initial Displacements' in loadgroup 
@@ -34,10 +38,21 @@ def apply_initial_displacements(loads, stiffness_matrix, force_matrix):
                 
                 nr = initial_displacement[0]
                 
-                displacement_matrix[nr*3:nr*3+3, load_nr] += initial_displacement[1:4]
+                rows.extend(range(nr*3, nr*3+3))
+                cols.extend([load_nr]*3)
+                data.extend(initial_displacement[1:4])
+    
+    if not data:
+        return force_matrix
+    
+    #Build the sparse initial displacement matrix, entries of the same degree
+    #are summed up.
+    nodal_dofs = stiffness_matrix.shape[0]
+    displacement_matrix = sps.csr_matrix((data, (rows, cols)),
+                                         shape=(nodal_dofs, len(loads)))
     
     #Deduct the forces corresponding to the initial dispalcement from the 
     #force matrix.        
-    force_matrix -= (stiffness_matrix @ displacement_matrix)
+    force_matrix = sps.csr_matrix(force_matrix - stiffness_matrix @ displacement_matrix)
       
-    return
\ No newline at end of file
+    return force_matrix
\ No newline at end of file
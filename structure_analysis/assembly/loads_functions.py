@@ -12,13 +12,17 @@ calculate the internal forces.
 import numpy as np
 import scipy.integrate as integrate
 
+from ..quadrature import gauss_legendre, vectorize_function
 from .shape_functions import *
 
 
 def assemble_functional_loads(nodes_lists, elements_lists, beams_information,
-                              function_loads):
+                              function_loads, quadrature='Adaptive'):
     """Assembles global load functions into assembled nodal forces.
     
+    With the 'Gauss-Legendre' quadrature all loaded elements of a beam are 
+    integrated at once. (see quadrature)
+    
     Arguments:
         nodes_lists       -- a list containing for each beam an ordered list of
                              the node numbers along the beam
@@ -30,6 +34,10 @@ def assemble_functional_loads(nodes_lists, elements_lists, beams_information,
         function_loads    -- a list containing the functional loads of a 
                              loadgroup
     
+    Keyword arguments:
+        quadrature -- the quadrature of the load functions, either 'Adaptive'
+                      or 'Gauss-Legendre'
+    
     Return values:
         assembled_forces -- a list containing for an assembled load its element
                             number, the two node numbers, the orientation and
@@ -61,6 +69,21 @@ def assemble_functional_loads(nodes_lists, elements_lists, beams_information,
         xr_end   = x_end - (j_end * length_element)
         xr_end   = min(length_element, xr_end)
         
+        #Integrate all loaded elements at once.
+        if quadrature == 'Gauss-Legendre':
+            j = np.arange(j_start, j_end+1)
+            x_left  = np.where(j == j_start, xl_start, 0)
+            x_right = np.where(j == j_end, xr_end, length_element)
+            
+            local_nodal_forces = calculate_nodal_forces_gauss(function_load, theta,
+                                                              length_element, j,
+                                                              x_left, x_right)
+            for k in range(len(j)):
+                append_assembled_forces(assembled_forces, nodes_lists, elements_lists,
+                                        local_nodal_forces[:, k:k+1], beam_nr, j[k],
+                                        theta)
+            continue
+        
         #Append the assembled forces list with an entry for each partially or
         # entirely loaded element.
         
@@ -183,6 +206,54 @@ def calculate_nodal_forces(function_load, theta, length_element, j, x_left, x_ri
     return local_nodal_forces
 
  
+def calculate_nodal_forces_gauss(function_load, theta, length_element, j, x_left,
+                                 x_right):
+    """Calculates the nodal forces on several elements resulting from a load function.
+    
+    The load functions are rotated into the local system and multiplied with
+    the shape functions. All integrals are calculated at once with the
+    Gauss-Legendre quadrature. (see quadrature)
+    
+    Arguments:
+        function_load  -- a single functional load
+        theta          -- the orientation of the local coordinate systems 
+                          (the inclination of the beam)
+        length_element -- the length of the elements
+        j              -- an array of the numbers of the left nodes along the 
+                          beam starting from zero
+        x_left         -- an array of the distances of the loads start on the
+                          elements to their left nodes
+        x_right        -- an array of the distances of the loads end on the
+                          elements to their left nodes
+        
+    Return values:
+        local_nodal_forces -- an array (6, elements) of the assembled local 
+                              nodal forces on the left and the right side of
+                              the elements
+    """
+    l  = length_element
+    l0 = j * length_element
+    
+    fx, fy, mz = [vectorize_function(function_load[3+i]) for i in range(3)]
+    
+    def integrand(x, index):
+        #The global position of the points on the beam.
+        x_beam = x + l0[index, np.newaxis]
+        fx_i, fy_i, mz_i = fx(x_beam), fy(x_beam), mz(x_beam)
+        qx = np.cos(theta)*fx_i + np.sin(theta)*fy_i
+        qy = -np.sin(theta)*fx_i + np.cos(theta)*fy_i
+        return np.array([n1(x,l)*qx,
+                         n3(x,l)*qy + n31(x,l)*mz_i,
+                         n4(x,l)*qy + n41(x,l)*mz_i,
+                         n2(x,l)*qx,
+                         n5(x,l)*qy + n51(x,l)*mz_i,
+                         n6(x,l)*qy + n61(x,l)*mz_i])
+    
+    local_nodal_forces = gauss_legendre(integrand, x_left, x_right)
+    
+    return local_nodal_forces
+
+ 
 def append_assembled_forces(assembled_forces, nodes_lists, elements_lists,
                             local_nodal_forces, beam_nr, j, theta):
     """Appends the assembled_forces list with the information of an assembled load.
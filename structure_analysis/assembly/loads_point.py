@@ -7,24 +7,50 @@ Created on Tue May 14 07:05:08 2019
 The module contains the function to assemble point loads. It provides the result
 in a special format which will be used to create the force matrix and to 
 calculate the internal forces.
+
+The point loads of all loadgroups are gathered into one structured array and
+assembled at once. (see assembled_forces)
 """
 
 import numpy as np
 
-from .rotation_matrix import get_rotation_matrix
+from .assembled_forces import create_assembled_forces
+from .rotation_matrix import get_rotation_components
 from .shape_functions import *
 
+POINT_LOADS_DTYPE = np.dtype([('Loadgroup', int), ('Beam', int), ('Position', float),
+                              ('Load', float, (3,))])
+
+
+def get_point_loads_array(loads):
+    """Gathers the point loads of all loadgroups into a structured array.
+    
+    Arguments:
+        loads -- a list containing the loadgroups of the model
+    
+    Return values:
+        point_loads -- a structured array with the loadgroup, the beam, the
+                       position on the beam and the global load (Fx, Fy, Mz)
+                       of each point load
+    """
+    rows = [(loadgroup_nr, point_load[0], point_load[1], point_load[2:5])
+            for loadgroup_nr, loadgroup in enumerate(loads)
+            if 'Point' in loadgroup and loadgroup['Point']
+            for point_load in loadgroup['Point']]
+    
+    return np.array(rows, dtype=POINT_LOADS_DTYPE)
+
 
 def assemble_point_loads(nodes_lists, elements_lists, beams_information,
                          point_loads):
     """Assembles the global point loads into nodal forces.
     
     It uses the separately defined shape functions to determine the equivalent
-    nodal forces.
+    nodal forces. All point loads are assembled at once.
     
     If a point load is exactly on an element node, the program assumed half
     of the forces to come from each side. In this case the assembled_forces will
-    be appended with two lists, since two elements are involved.
+    be appended with two entries, since two elements are involved.
     
     Arguments:
         nodes_lists       -- a list containing for each beam an ordered list of
@@ -34,74 +60,78 @@ def assemble_point_loads(nodes_lists, elements_lists, beams_information,
         beams_information -- a list containing for each beam its main information:
                              beam length, beam orientation, number of elements 
                              created on the beam, length of these elements
-        point_loads       -- a list containing the point loads of a loadgroup
+        point_loads       -- a structured array of the point loads (see
+                             get_point_loads_array)
     
     Return values:
-        assembled_forces -- a list containing for an assembled load its element
-                            number, the two node numbers, the orientation and
-                            its nodal forces
+        assembled_forces -- a structured array containing for an assembled load
+                            its loadgroup, element number, the two node numbers,
+                            the orientation and its nodal forces
     """
+    beam_nr = point_loads['Beam']
     
-    assembled_forces = []
-    
-    #Expand the assembled forces list for each point load.
-    for point_load in point_loads:
-        
-        #Get beam information
-        beam_nr = point_load[0]
-        theta   = beams_information[beam_nr][1]
-        r       = get_rotation_matrix(theta)
-        
-        #Find the position on the element x, the elements length, its node
-        #numbers and the element it is on.     
-        element_length = beams_information[beam_nr][3]
-
-        x = point_load[1] % element_length
-        j = int(point_load[1] // element_length)
-
-        #Special Case Handling: Load is at the end of the beam
-        if j == beams_information[beam_nr][2]:
-            j-= 1
-            x = beams_information[beam_nr][3]
-        
-        element_nr  = elements_lists[beam_nr][j]
-        nodenr1     = nodes_lists[beam_nr][j]
-        nodenr2     = nodes_lists[beam_nr][j+1]
-                
-        #Rotate into local System
-        global_force = np.array(point_load[2:5]).reshape((3,1))
-        localpointloads = r[0:3,0:3].transpose() @ global_force
-        
-        Fx = localpointloads[0][0]
-        Fy = localpointloads[1][0]
-        Mz = localpointloads[2][0]
-        
-        #Calculation of local Nodal Forces
-        Fx1 = n1(x,element_length)*Fx
-        Fy1 = n3(x,element_length)*Fy + n31(x,element_length)*Mz    
-        Mz1 = n4(x,element_length)*Fy + n41(x,element_length)*Mz    
-        Fx2 = n2(x,element_length)*Fx    
-        Fy2 = n5(x,element_length)*Fy + n51(x,element_length)*Mz    
-        Mz2 = n6(x,element_length)*Fy + n61(x,element_length)*Mz
-        
-        localnodalforces=np.array([[Fx1], [Fy1], [Mz1], [Fx2], [Fy2], [Mz2]])
-        
-        #Append the assembled forces. (Which also includes the important element information)
-        #Normal Case: Load is not on a node. (Only if it is on the last node it
-        # does not need special treatment)
-        if x!=0 or j==0:
-            assembled_forces.append([element_nr, nodenr1, nodenr2, theta, localnodalforces])
-            
-        #Special Case Handling: Load is exactly on a node (x == 0).
-        else:
-            zeros = np.zeros((3,1))
-            
-            # The load will always have been assumed to be on the later element.
-            # Therefore the forces calculated on the second element node are
-            # always zero in this special case.
-            assembled_forces.append([element_nr, nodenr1, -1, theta,
-                                     np.vstack((localnodalforces[0:3]/2, zeros))]),
-            assembled_forces.append([elements_lists[beam_nr][j-1], -1, nodenr1, theta,
-                                     np.vstack((zeros, localnodalforces[0:3]/2))])
-
-    return assembled_forces
\ No newline at end of file
+    #Get beam information
+    theta           = np.array([information[1] for information in beams_information])[beam_nr]
+    element_length  = np.array([information[3] for information in beams_information])[beam_nr]
+    amount_elements = np.array([information[2] for information in beams_information])[beam_nr]
+    
+    #Find the position on the element x and the element it is on.
+    x = point_loads['Position'] % element_length
+    j = (point_loads['Position'] // element_length).astype(int)
+    
+    #Special Case Handling: Load is at the end of the beam
+    at_end = j >= amount_elements
+    j = np.where(at_end, amount_elements-1, j)
+    x = np.where(at_end, element_length, x)
+    
+    #Get the element numbers and the node numbers.
+    first_element = np.array([elements[0] for elements in elements_lists])[beam_nr]
+    first_node    = np.array([0]+[len(nodes) for nodes in nodes_lists]).cumsum()
+    nodes_all     = np.concatenate(nodes_lists)
+    element_nr    = first_element + j
+    nodenr1       = nodes_all[first_node[beam_nr] + j]
+    nodenr2       = nodes_all[first_node[beam_nr] + j + 1]
+    
+    #Rotate into local System
+    cos, sin = get_rotation_components(theta)
+    Fx =  cos*point_loads['Load'][:,0] + sin*point_loads['Load'][:,1]
+    Fy = -sin*point_loads['Load'][:,0] + cos*point_loads['Load'][:,1]
+    Mz = point_loads['Load'][:,2]
+    
+    #Calculation of local Nodal Forces
+    l = element_length
+    local_nodal_forces = np.column_stack((n1(x,l)*Fx,
+                                          n3(x,l)*Fy + n31(x,l)*Mz,
+                                          n4(x,l)*Fy + n41(x,l)*Mz,
+                                          n2(x,l)*Fx,
+                                          n5(x,l)*Fy + n51(x,l)*Mz,
+                                          n6(x,l)*Fy + n61(x,l)*Mz))
+    
+    #Normal Case: Load is not on a node. (Only if it is on the last node it
+    # does not need special treatment)
+    normal = (x != 0) | (j == 0)
+    assembled_normal = create_assembled_forces(point_loads['Loadgroup'][normal],
+                                               element_nr[normal], nodenr1[normal],
+                                               nodenr2[normal], theta[normal],
+                                               local_nodal_forces[normal])
+    
+    #Special Case Handling: Load is exactly on a node (x == 0).
+    # The load will always have been assumed to be on the later element.
+    # Therefore the forces calculated on the second element node are
+    # always zero in this special case.
+    on_node = ~normal
+    half_forces = local_nodal_forces[on_node, 0:3]/2
+    zeros = np.zeros_like(half_forces)
+    placeholder = -np.ones(np.count_nonzero(on_node), dtype=int)
+    assembled_later = create_assembled_forces(point_loads['Loadgroup'][on_node],
+                                              element_nr[on_node], nodenr1[on_node],
+                                              placeholder, theta[on_node],
+                                              np.hstack((half_forces, zeros)))
+    assembled_earlier = create_assembled_forces(point_loads['Loadgroup'][on_node],
+                                                element_nr[on_node]-1, placeholder,
+                                                nodenr1[on_node], theta[on_node],
+                                                np.hstack((zeros, half_forces)))
+    
+    assembled_forces = np.concatenate((assembled_normal, assembled_later, assembled_earlier))
+    
+    return assembled_forces
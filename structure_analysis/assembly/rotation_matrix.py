@@ -46,4 +46,21 @@ def get_rotation_matrix(theta):
                     [            0,              0,      0,  np.sin(theta),  np.cos(theta),      0],
                     [            0,              0,      0,              0,              0,      1]])
     
-    return r
\ No newline at end of file
+    return r
+
+def get_rotation_components(theta):
+    """Gives the cosines and sines of an array of orientations.
+    
+    As for the rotation matrix, the cases theta == +-pi/2 give exact zeros.
+    
+    Arguments:
+        theta -- an array of the orientations of the local coordinate systems
+    
+    Return values:
+        cos -- an array of the cosines of the orientations
+        sin -- an array of the sines of the orientations
+    """
+    theta = np.asarray(theta, dtype=float)
+    cos = np.where(np.abs(theta)==np.pi/2, 0., np.cos(theta))
+    sin = np.where(theta==np.pi/2, 1., np.where(theta==-np.pi/2, -1., np.sin(theta)))
+    return cos, sin
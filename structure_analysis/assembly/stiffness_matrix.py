@@ -19,8 +19,9 @@ def get_stiffness_matrix(beams_stiffness, nodes_lists, releases_beams,
                          beams_information):
     """Assembles the sparse stiffness matrix of an unrestricted system.
     
-    In a first step the function creates the lists needed to build the sparse
-    stiffness matrix which is assembled in a second step.
+    In a first step the function creates the arrays of the rows, columns and
+    entries of all elements at once, which are assembled in a second step into
+    a sparse matrix in csc format.
     
     Arguments:
         beams_stiffness   -- a list of each beams normal, beding (and shear) 
@@ -38,65 +39,47 @@ def get_stiffness_matrix(beams_stiffness, nodes_lists, releases_beams,
         stiffness_matrix -- the stiffness matrix of the system, not including 
                             restricted degrees 
     """
-    #Create the lists to create the sparse stiffness matrix
-    data = []
-    col  = []
-    row  = []    
-    
-    #Expand the lists for each beam
+    #Calculate the global stiffness matrix of each beams elements. (They are
+    #the same withhin the same beam.)
+    k_beams = np.empty((len(nodes_lists), 6, 6))
     for i in range(len(nodes_lists)):
-        #Get the beams element length and rotation matrix.
         length  = beams_information[i][3]
         theta   = beams_information[i][1]
         r       = get_rotation_matrix(theta)
-                
-        #Calculate the global stiffness matrix of the beams elements. (They are
-        #the same withhin the same beam.)
         k_local = get_local_stiffness_matrix(length, beams_stiffness[i])
-        k_global= r @ k_local @ r.transpose()
-        
-        
-        #Expand the lists for each element on the beam.
-        kglobalaslist=np.reshape(k_global, 36).tolist()
-        for j in range(beams_information[i][2]):
-            startnode=nodes_lists[i][j]
-            endnode=nodes_lists[i][j+1]
-            
-            #Expand the columns and the rows list with the corresponding 36 entries.
-            row.extend([3*startnode]*6+[3*startnode+1]*6+[3*startnode+2]*6
-                       +[3*endnode]*6+[3*endnode+1]*6+[3*endnode+2]*6)
-            col.extend([3*startnode, 3*startnode+1, 3*startnode+2,
-                        3*endnode, 3*endnode+1, 3*endnode+2]*6)
-            
-            #Expand the data list with the elements stiffness matrix.
-            #Normal treatment for the element withhin the beam.
-            if j!=0 and j!=beams_information[i][2]-1:
-                data.extend(kglobalaslist)
-            
-            #Special Treatment for the first and the last element on a beam.
-            else:
-                #Check for hinges:
-                if j==0:
-                    left_release=releases_beams.get(i, [0,0])[0]
-                else:
-                    left_release=0
-                if j==beams_information[i][2]-1:
-                    right_release=releases_beams.get(i, [0,0])[1]
-                else:
-                    right_release=0
-                
-                #Adapt the stiffness matrix to the releases.
-                k_with_releases = include_releases(k_global, left_release,
-                                                   right_release)
-                
-                k_with_releases_aslist = np.reshape(k_with_releases,36).tolist()
-                data.extend(k_with_releases_aslist)
-            
-        
+        k_beams[i] = r @ k_local @ r.transpose()
+    
+    #Repeat them for each element, the elements are numbered beam by beam.
+    elements_amount = np.array([beam_information[2] for beam_information in beams_information])
+    first_elements  = np.cumsum(elements_amount) - elements_amount
+    k_elements      = np.repeat(k_beams, elements_amount, axis=0)
+    
+    #Special Treatment for the first and the last element on a released beam.
+    for beam_nr, (left_release, right_release) in releases_beams.items():
+        first_element = first_elements[beam_nr]
+        last_element  = first_element + elements_amount[beam_nr] - 1
+        if left_release:
+            k_elements[first_element] = include_releases(k_elements[first_element],
+                                                         left_release, 0)
+        if right_release:
+            k_elements[last_element] = include_releases(k_elements[last_element],
+                                                        0, right_release)
+    
+    #Get the start and end node of each element and its degrees of freedom.
+    start_nodes = np.concatenate([nodes_list[:-1] for nodes_list in nodes_lists])
+    end_nodes   = np.concatenate([nodes_list[1:] for nodes_list in nodes_lists])
+    degrees     = np.column_stack((3*start_nodes, 3*start_nodes+1, 3*start_nodes+2,
+                                   3*end_nodes, 3*end_nodes+1, 3*end_nodes+2))
+    
+    #Create the rows, columns and data of all 36 entries of each element.
+    row  = np.repeat(degrees, 6, axis=1).ravel()
+    col  = np.tile(degrees, 6).ravel()
+    data = k_elements.ravel()
+    
     #Build the sparse stiffness matrix.
     number_of_nodes = max([max(sublist)] for sublist in nodes_lists)[0] + 1
 
-    stiffness_matrix=sps.csr_matrix((data, (row, col)), shape=(3*number_of_nodes,
+    stiffness_matrix=sps.csc_matrix((data, (row, col)), shape=(3*number_of_nodes,
                                                                3*number_of_nodes))
 
-    return stiffness_matrix
\ No newline at end of file
+    return stiffness_matrix
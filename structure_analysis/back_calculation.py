@@ -20,108 +20,85 @@ def get_internal_forces(beams, displacement_matrix, internal_forces_assembly,
                         discretization_information):
     """Calculates the internal forces from the displacements and combines them with the ones from assembling.
     
-    First the nodal displacements of each element are extracted from the
-    displacement matrix. They are saved into a new matrix per loadgroup with
-    one column per element. This allows the fast calculation of the internal 
-    forces of all elements on a beam in one second step.
+    First the nodal displacements of each element are gathered from the
+    displacement matrix into an array with one column per element and one 
+    layer per loadgroup. This allows the fast calculation of the internal 
+    forces of all elements on a beam and all loadgroups in one second step.
     
     Arguments:
         beams                      -- a dictionary containing all the model's
                                       information on the beams
         displacement_matrix        -- the matrix containing the displacement 
                                       vectors for each loadgroup
-        internal_forces_assembly   -- a list of matrices saving the internal 
-                                      forces for each loadgroup resulting from 
-                                      assembling its loads
+        internal_forces_assembly   -- a sparse matrix (6*elements, loadgroups)
+                                      saving the internal forces of each
+                                      loadgroup resulting from assembling its
+                                      loads
         discretization_information -- the dictionary containing the information
                                       of the discretized system
         
     Return values:
-        internal_forces_matrices -- the matrices storing the elementwise 
-                                    internal forces (left and right) of each 
-                                    loadgroup
+        internal_displacements -- an array (6, elements, loadgroups) storing 
+                                  the elementwise displacements (left and 
+                                  right) of each loadgroup
+        internal_forces        -- an array (6, elements, loadgroups) storing 
+                                  the elementwise internal forces (left and 
+                                  right) of each loadgroup
     """
-    nodes_lists         = discretization_information['Nodes']
     beams_information   = discretization_information['Beams Information']
     elements_lists      = discretization_information['Elements']
+    elements_degrees    = discretization_information['Degrees']
     releases            = discretization_information['Releases']
     beams_stiffness     = beams['Stiffness']
     
-    internal_displacements_matrices = get_internal_displacements(nodes_lists,
-                                                                 elements_lists,
-                                                                 displacement_matrix)
+    internal_displacements = get_internal_displacements(elements_degrees,
+                                                        displacement_matrix)
     
     #Calulate the internal forces of the nodal displacements.
-    internal_forces_matrices = calculate_internal_forces(internal_displacements_matrices,
-                                                         elements_lists, releases,
-                                                         beams_information,
-                                                         beams_stiffness)
+    internal_forces = calculate_internal_forces(internal_displacements,
+                                                elements_lists, releases,
+                                                beams_information,
+                                                beams_stiffness)
     
     #Subtract the internal forces from assembling the model.
-    for i in range(len(internal_forces_matrices)):
-        internal_forces_matrices[i] -= internal_forces_assembly[i]
-        
+    number_of_elements = internal_forces.shape[1]
+    assembly = internal_forces_assembly.tocoo()
+    internal_forces[assembly.row // number_of_elements,
+                    assembly.row % number_of_elements, assembly.col] -= assembly.data
     
-    return internal_displacements_matrices, internal_forces_matrices
+    return internal_displacements, internal_forces
 
  
-def get_internal_displacements(nodes_lists, elements_lists, displacement_matrix):
-    """Saves the displacements of each element into a column, each loadgroup into a matrix.
+def get_internal_displacements(elements_degrees, displacement_matrix):
+    """Gathers the displacements of each element into a column, each loadgroup into a layer.
     
     Arguments:
-        nodes_lists         -- a list containing for each beam an ordered list 
-                               of the node numbers along the beam
-        elements_lists      -- a list containing for each beam a list of the 
-                               elements on the beam in consecutive order
+        elements_degrees    -- an array (6, elements) containing for each 
+                               element the degrees of freedom of its start and
+                               end node
         displacement_matrix -- the matrix containing the displacement vectors 
                                for each loadgroup
         
     Return values:
-        internal_displacements -- a list with a matrix for each loadgroup, 
-                                  which contains the internal forces for each 
-                                  element a list of dictionaries containing for
-                                  each loadgroup the displacements of all beams
-                                  nodes
+        internal_displacements -- an array (6, elements, loadgroups) storing 
+                                  the elementwise displacements (left and 
+                                  right) of each loadgroup
     """
-    
-    internal_displacements = []
-    amount_of_elements = elements_lists[-1][-1]+1
-    amount_of_loadgroups = displacement_matrix.shape[1]
-    d_mat = displacement_matrix
-    
-    #Append the internal displacements for each loadgroup.
-    for k in range(amount_of_loadgroups):
-        
-        internal_displacements_loadgroup = np.empty((6,amount_of_elements))
-        id_loadgroup = internal_displacements_loadgroup
-        
-        for beam_nr, element_list in enumerate(elements_lists, 0):
-            for j_element, element_number in enumerate(element_list, 0):
-                #Get node and element numbers.
-                nr1=nodes_lists[beam_nr][j_element]
-                nr2=nodes_lists[beam_nr][j_element+1]
-                el_nr=element_number
-                
-                #Define the corresponding internal displacements
-                id_loadgroup[:,el_nr]=np.hstack([d_mat[3*nr1:3*nr1+3, k],
-                                                 d_mat[3*nr2:3*nr2+3, k]])
-        internal_displacements.append(id_loadgroup)
+    internal_displacements = np.asarray(displacement_matrix)[elements_degrees, :]
 
     return internal_displacements
 
  
 def calculate_internal_forces(internal_displacements, elements_lists, releases,
                               beams_information, beams_stiffness):
-    """Calculates the internal forces of each loadgroup into a matrix.
+    """Calculates the internal forces of all loadgroups into an array.
     
-    Per matrix, each column corresponds to one element.
+    Each column corresponds to one element, each layer to one loadgroup.
     
     Arguments:
-        internal_displacements -- a list with a matrix for each loadgroup,
-                                  which contains the internal forces for each 
-                                  element a list of dictionaries containing for
-                                  each loadgroup the displacements of all beams
-                                  nodes
+        internal_displacements -- an array (6, elements, loadgroups) storing 
+                                  the elementwise displacements (left and 
+                                  right) of each loadgroup
         elements_lists         -- a list containing for each beam a list of the
                                   elements on the beam in consecutive order
         releases               -- a dictionary with the keys 'Beams' and 
@@ -140,51 +117,44 @@ def calculate_internal_forces(internal_displacements, elements_lists, releases,
                                          displacements (without internal forces
                                          from assembling)
     """
-    internal_forces_displacements = []
-    amount_of_elements            = elements_lists[-1][-1]+1
-    amount_of_loadgroups          = len(internal_displacements)
+    internal_forces_displacements = np.empty_like(internal_displacements)
+    if_displacements              = internal_forces_displacements
     signmatrix                    = np.diag(np.array([-1,1,-1,1,-1,1]))
     i_d                           = internal_displacements
     
-    #Append the internal forces (from displacements) for each loadgroup.
-    for k in range(amount_of_loadgroups):
+    #Handle every beam.
+    for beam_nr, element_list in enumerate(elements_lists, 0):
+        
+        length = beams_information[beam_nr][3]
+        klocal = get_local_stiffness_matrix(length, beams_stiffness[beam_nr])
+        r      = get_rotation_matrix(beams_information[beam_nr][1])
+        r_t    = r.transpose() 
+        
+        #Get the first and the last element and their realases.
+        first_element = element_list[0]
+        last_element  = element_list[-1]
+        f_e           = first_element
+        l_e           = last_element
+        f_e_releases  = releases['Elements'].get(f_e,[0,0])
+        l_e_releases  = releases['Elements'].get(l_e,[0,0])
         
-        internal_forces_loadgroup = np.empty((6,amount_of_elements))
-        if_loadgroup              = internal_forces_loadgroup
+        #Calculate the internal forces for all elements on the beam and all
+        #loadgroups.
+        k_beam = signmatrix @ klocal @ r_t
+        if_displacements[:,f_e:l_e+1] = np.einsum('ij,jel->iel', k_beam,
+                                                  i_d[:,f_e:l_e+1])
         
-        #Handle every beam.
-        for beam_nr, element_list in enumerate(elements_lists, 0):
-            
-            length = beams_information[beam_nr][3]
-            klocal = get_local_stiffness_matrix(length, beams_stiffness[beam_nr])
-            r      = get_rotation_matrix(beams_information[beam_nr][1])
-            r_t    = r.transpose() 
-            
-            #Get the first and the last element and their realases.
-            first_element = element_list[0]
-            last_element  = element_list[-1]
-            f_e           = first_element
-            l_e           = last_element
-            f_e_releases  = releases['Elements'].get(f_e,[0,0])
-            l_e_releases  = releases['Elements'].get(l_e,[0,0])
-            
-            #Calculate the internal forces for all elements on the beam.
-            if_loadgroup[:,f_e:l_e+1] = signmatrix @ klocal @ r_t @ i_d[k][:, f_e:l_e+1]
-            
-            
-            #Include possible hinges on the first and the last element.
-            if f_e_releases[0]==1 and f_e_releases[1]==1:
-                k_mod = include_releases(klocal,1,1)
-                if_loadgroup[:,f_e]=signmatrix @ k_mod @ r_t @ i_d[k][:,f_e]
-           
-            else:
-                if f_e_releases[0]==1:
-                    k_mod =include_releases(klocal,1,0)
-                    if_loadgroup[:,f_e]=signmatrix @ k_mod @ r_t @ i_d[k][:,f_e]
-                if l_e_releases[1]==1:
-                    k_mod = include_releases(klocal,0,1)
-                    if_loadgroup[:,l_e]=signmatrix @ k_mod @ r_t @ i_d[k][:,l_e]
-            
-        internal_forces_displacements.append(internal_forces_loadgroup)    
+        #Include possible hinges on the first and the last element.
+        if f_e_releases[0]==1 and f_e_releases[1]==1:
+            k_mod = include_releases(klocal,1,1)
+            if_displacements[:,f_e]=signmatrix @ k_mod @ r_t @ i_d[:,f_e]
+       
+        else:
+            if f_e_releases[0]==1:
+                k_mod =include_releases(klocal,1,0)
+                if_displacements[:,f_e]=signmatrix @ k_mod @ r_t @ i_d[:,f_e]
+            if l_e_releases[1]==1:
+                k_mod = include_releases(klocal,0,1)
+                if_displacements[:,l_e]=signmatrix @ k_mod @ r_t @ i_d[:,l_e]
     
-    return internal_forces_displacements
\ No newline at end of file
+    return internal_forces_displacements
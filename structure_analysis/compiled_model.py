@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the compiled model, which carries out the geometry dependent
+stages of the structure analysis once and then analyses any amount of loads.
+
+The verification of the structure, the discretization, the assembly of the
+stiffness matrix, the application of the boundary conditions and the
+factorization only depend on the nodes, beams and boundary conditions. The
+method solve of the compiled model therefore only verifies and assembles the
+loads, solves the system and calculates the internal forces.
+
+Variants of the model whose stiffness only differs in a few beams are solved
+with the factorization of the compiled model. (see variants)
+
+Mirror symmetric structures are optionally factorized as two half-size
+systems. (see symmetry)
+
+The wall time and the size of each stage are recorded if profiling is switched
+on. (see profiling)
+"""
+
+from .apply_boundary_conditions import modify_stiffness_matrix, modify_force_matrix
+from .assembly import get_force_matrices, apply_initial_displacements, get_stiffness_matrix
+from .back_calculation import get_internal_forces
+from .condensation import StaticCondensation
+from .discretization import discretize
+from .factorization import factorization_cache
+from .make_lists import get_dictionaries
+from .points_of_interest import calculate_state_poi
+from .profiling import count_call, stage
+from .quadrature import QUADRATURES
+from .solve import solve
+from .stations import calculate_state_stations
+from .symmetry import get_nodes_coordinates, get_mirror_factorization
+from .variants import StiffnessVariant
+from .verification import verify_structure, verify_loads
+
+
+def prepare_model(model_original, discType='Lengthwise', discElements=100, discLength=1,
+                  solver='Sparse', condensation=False, quadrature='Adaptive', mirror=None):
+    """Verifies, discretizes and assembles the structure of the model for repeated analyses.
+
+    The loads of the model are ignored, they are given to the method solve of
+    the returned compiled model. The keyword arguments are the same as for
+    structure_analysis.
+
+    Arguments:
+        model_original -- the structural model as a dictionary. Containing the
+                          nodes, beams and boundary conditions
+
+    Keyword arguments:
+        discType     -- describes the method of discretizing the beams. Either
+                        'Elementwise' or 'Lengthwise'
+        discElements -- the amount of elements each beam is subdivided into if
+                        discType is 'Elementwise'
+        disclength   -- the maximal length of the elements each beam is
+                        subdivided into if discType is 'Lengthwise'
+        solver       -- the method of factorizing the stiffness matrix, either
+                        'Sparse' or 'Banded' (see factorization)
+        condensation -- if True, the interior nodes of the beams are condensed
+                        and the system is only solved at the original nodes
+                        (see condensation)
+        quadrature   -- the quadrature of the functional loads, either
+                        'Adaptive' or 'Gauss-Legendre' (see quadrature)
+        mirror       -- the x coordinate of a vertical mirror plane of the
+                        structure, 'Auto' for the middle of the structure if
+                        it is symmetric, or None (see symmetry)
+
+    Return values:
+        compiled_model -- the compiled model (see CompiledModel)
+    """
+    compiled_model = CompiledModel(model_original, discType=discType,
+                                   discElements=discElements, discLength=discLength,
+                                   solver=solver, condensation=condensation,
+                                   quadrature=quadrature, mirror=mirror)
+    return compiled_model
+
+
+class CompiledModel:
+    """A verified, discretized and assembled structure which can be solved for any loads.
+
+    The model must not be changed after its compilation, a changed structure
+    needs to be compiled again.
+    """
+
+    def __init__(self, model_original, discType='Lengthwise', discElements=100, discLength=1,
+                 solver='Sparse', condensation=False, quadrature='Adaptive', mirror=None):
+        if quadrature not in QUADRATURES:
+            raise Exception('The quadrature "' + str(quadrature) + '" is not defined.')
+        self.quadrature = quadrature
+        count_call('Compilation')
+
+        # Verify the structure.
+        with stage('Verification'):
+            model, nodes_adapt_dict = verify_structure(model_original)
+        self.model = model
+        self.nodes_adapt_dict = nodes_adapt_dict
+
+        nodes = model['Nodes']
+        beams = model['Beams']
+        boundary_conditions = model['Boundary Conditions']
+
+        # Discretize the structure.
+        with stage('Discretization') as current:
+            disc_information = discretize(nodes, beams, discType, discElements, discLength)
+            current.count(Elements=get_number_of_elements(disc_information))
+        self.discretization_information = disc_information
+
+        # Assemble the stiffness matrix and apply the boundary conditions.
+        with stage('Stiffness Assembly') as current:
+            self.stiffness_matrix = get_stiffness_matrix(beams['Stiffness'],
+                                                         disc_information['Nodes'],
+                                                         disc_information['Releases']['Beams'],
+                                                         disc_information['Beams Information'])
+            current.count(Degrees=self.stiffness_matrix.shape[0],
+                          Nonzeros=self.stiffness_matrix.nnz)
+
+        # Condense the interior nodes, the boundary conditions are then applied
+        # to the condensed stiffness matrix of the original nodes.
+        self.condensation = None
+        if condensation:
+            with stage('Condensation') as current:
+                self.condensation = StaticCondensation(self.stiffness_matrix, disc_information,
+                                                       len(nodes['Location']))
+                self.stiffness_matrix = self.condensation.stiffness_matrix
+                current.count(Degrees=self.stiffness_matrix.shape[0],
+                              Nonzeros=self.stiffness_matrix.nnz)
+        with stage('Boundary Conditions'):
+            self.stiffness_matrices = modify_stiffness_matrix(boundary_conditions,
+                                                              self.stiffness_matrix)
+
+        # Factorize the modified stiffness matrix, either by the symmetric and
+        # antisymmetric half-size systems or at once.
+        with stage('Factorization') as current:
+            self.factorization = None
+            if mirror is not None:
+                coordinates = get_nodes_coordinates(nodes['Location'], beams['Nodes'],
+                                                    disc_information['Nodes'])
+                if self.condensation is not None:
+                    coordinates = coordinates[:len(nodes['Location'])]
+                self.factorization = get_mirror_factorization(self.stiffness_matrices,
+                                                              coordinates, mirror, solver=solver)
+            if self.factorization is None:
+                self.factorization = factorization_cache.get_factorization(
+                    self.stiffness_matrices[0], solver=solver)
+            current.count(Degrees=self.stiffness_matrices[0].shape[0],
+                          Nonzeros=self.stiffness_matrices[0].nnz)
+        return
+
+    def prepare_variant(self, stiffness_changes):
+        """Prepares a variant of the model with changed stiffnesses of some beams.
+
+        The variant can be solved repeatedly by the method solve. (see variants)
+
+        Arguments:
+            stiffness_changes -- a dictionary of the numbers of the changed
+                                 beams and their new normal, bending (and
+                                 shear) stiffnesses. A stiffness None removes
+                                 the beam.
+
+        Return values:
+            variant -- the stiffness variant (see variants)
+        """
+        variant = StiffnessVariant(self, stiffness_changes)
+        return variant
+
+    def solve_variant(self, loads_original, stiffness_changes, *points_of_interest,
+                      stations=None):
+        """Solves a variant of the model with changed stiffnesses of some beams.
+
+        The same as solve, the variant is given by the stiffness changes (see
+        prepare_variant).
+        """
+        variant = self.prepare_variant(stiffness_changes)
+        return self.solve(loads_original, *points_of_interest, stations=stations,
+                          variant=variant)
+
+    def solve(self, loads_original, *points_of_interest, stations=None, variant=None):
+        """Calculates the support reactions, the deformations and internal forces of the loads.
+
+        Arguments:
+            loads_original -- a list containing the loadgroups to be analysed,
+                              in the same format as the loads of a model
+
+        Optional arguments:
+            points_of_interest -- a list of points, for which the state is to be
+                                  calculated
+
+        Keyword arguments:
+            stations -- a list containing for each beam an array of the
+                        distances from the beams start, at which the state is
+                        to be calculated (see stations)
+            variant  -- a stiffness variant of the model which is solved
+                        instead of the model itself (see prepare_variant)
+
+        Return values:
+            The same as the return values of structure_analysis.
+        """
+        if stations is not None and points_of_interest:
+            raise Exception('Either points of interest or stations can be specified, not both.')
+        count_call('Solve')
+        disc_information = self.discretization_information
+        boundary_conditions = self.model['Boundary Conditions']
+
+        # The stiffness of the model or of its variant.
+        stiffness_matrix = self.stiffness_matrix
+        stiffness_matrices = self.stiffness_matrices
+        factorization = self.factorization
+        beams = self.model['Beams']
+        if variant is not None:
+            if variant.compiled_model is not self:
+                raise Exception('The variant was prepared for another compiled model.')
+            stiffness_matrix = variant.stiffness_matrix
+            stiffness_matrices = variant.stiffness_matrices
+            factorization = variant.factorization
+            beams = variant.beams
+
+        # Verify the loads.
+        with stage('Load Verification') as current:
+            loads = verify_loads(loads_original, self.model, self.nodes_adapt_dict)
+            current.count(Loadgroups=len(loads))
+
+        # Get the global force matrix and the internal forces from assembling.
+        with stage('Load Assembly') as current:
+            force_mat, if_mat_assembly = get_force_matrices(loads,
+                                                            disc_information['Nodes'],
+                                                            disc_information['Elements'],
+                                                            disc_information['Releases']['Elements'],
+                                                            disc_information['Beams Information'],
+                                                            quadrature=self.quadrature)
+            if self.condensation is not None:
+                force_mat, interior_displacements = self.condensation.condense_force_matrix(force_mat)
+            force_mat = apply_initial_displacements(loads, stiffness_matrix, force_mat)
+            current.count(Loadgroups=len(loads), Nonzeros=force_mat.nnz)
+
+        # Apply the boundary conditions to the force matrix.
+        with stage('Boundary Conditions'):
+            force_matrices = modify_force_matrix(stiffness_matrices, force_mat)
+        modified_matrices = [stiffness_matrices[0], stiffness_matrices[1],
+                             force_matrices[0], force_matrices[1],
+                             stiffness_matrices[4], stiffness_matrices[5],
+                             stiffness_matrices[2]]
+
+        # Solve the system and create the support reactions list.
+        with stage('Solution') as current:
+            d_mat, support_reactions, springs_reactions = solve(modified_matrices, loads,
+                                                                boundary_conditions,
+                                                                factorization=factorization)
+
+            # Recover the displacements of the interior nodes.
+            if self.condensation is not None:
+                d_mat = self.condensation.recover_displacements(d_mat, interior_displacements)
+            current.count(Degrees=stiffness_matrices[0].shape[0], Loadgroups=len(loads))
+
+        # Get the elementwise displacements and calculate the internal forces.
+        with stage('Back Calculation') as current:
+            id_matrix, if_matrices = get_internal_forces(beams, d_mat, if_mat_assembly,
+                                                         disc_information)
+            if variant is not None:
+                variant.remove_internal_forces(if_matrices)
+            current.count(Elements=get_number_of_elements(disc_information),
+                          Loadgroups=len(loads))
+
+        # Create the dictionaries to return, depending on whether points of interest or stations are specified.
+        with stage('Results'):
+            if stations is not None:
+                d_dict, if_dict = calculate_state_stations(loads, stations, beams,
+                                                           disc_information, id_matrix,
+                                                           if_matrices, quadrature=self.quadrature)
+            elif not points_of_interest:
+                d_dict, if_dict = get_dictionaries(disc_information, id_matrix, if_matrices)
+            else:
+                d_dict, if_dict = calculate_state_poi(loads, points_of_interest,
+                                                      disc_information, id_matrix,
+                                                      if_matrices, quadrature=self.quadrature)
+
+        deformations = d_dict
+        internal_forces = if_dict
+
+        return deformations, internal_forces, support_reactions, springs_reactions
+
+
+def get_number_of_elements(discretization_information):
+    """Returns the amount of elements of the discretized system."""
+    elements = discretization_information['Elements']
+    return elements[-1][-1] + 1 if elements and elements[-1] else 0
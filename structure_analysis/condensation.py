@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the static condensation of the interior nodes of the beams.
+
+The discretization numbers the nodes created on the beams after the original
+nodes. The stiffness matrix is therefore split into the degrees of freedom of
+the original (boundary) nodes b and of the interior nodes i:
+
+    | K_bb  K_bi | | u_b |   | f_b |
+    | K_ib  K_ii | | u_i | = | f_i |
+
+The interior nodes of a beam are only connected to each other and to the two
+nodes at the ends of the beam. K_ii is therefore block diagonal (one block per
+beam) and each of its rows only couples to the six degrees of freedom of its
+beam's end nodes. Eliminating u_i gives the exact condensed system
+
+    (K_bb - K_bi X) u_b = f_b - K_bi z      with X = K_ii^-1 K_ib, z = K_ii^-1 f_i
+
+which only contains the original nodes (each beam becomes a super-element).
+The interior displacements are recovered afterwards by u_i = z - X u_b.
+
+Initial displacements of rotated degrees are applied to the loads in the
+global directions, but inserted into the displacements in the rotated
+directions (see solve). Only for these the interior displacements differ from
+the ones of the uncondensed system.
+"""
+
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsl
+
+from .factorization import solve_force_matrix
+
+
+class StaticCondensation:
+    """The condensation of the interior nodes of a discretized system.
+
+    Arguments:
+        stiffness_matrix           -- the stiffness matrix of the system, not
+                                      including restricted degrees
+        discretization_information -- the dictionary containing the information
+                                      of the discretized system
+        number_of_nodes            -- the amount of original (not discretized)
+                                      nodes
+    """
+
+    def __init__(self, stiffness_matrix, discretization_information, number_of_nodes):
+        nodes_lists = discretization_information['Nodes']
+        size = stiffness_matrix.shape[0]
+        boundary_size = 3 * number_of_nodes
+        interior_size = size - boundary_size
+        self.boundary_size = boundary_size
+        self.interior_size = interior_size
+
+        stiffness_matrix = sps.csr_matrix(stiffness_matrix)
+        stiffness_boundary = stiffness_matrix[:boundary_size][:, :boundary_size]
+        if interior_size == 0:
+            self.factorization = None
+            self.coupling = None
+            self.stiffness_matrix = stiffness_boundary
+            return
+
+        stiffness_interior = stiffness_matrix[boundary_size:][:, boundary_size:]
+        stiffness_coupling = stiffness_matrix[:boundary_size][:, boundary_size:]
+
+        # Get the six degrees of freedom of the end nodes of each interior row.
+        end_degrees = get_end_degrees(nodes_lists, interior_size)
+        rows = np.repeat(np.arange(interior_size), 6)
+        cols = end_degrees.ravel()
+
+        # Solve the interior system once for the six end degrees of freedom.
+        coupling_local = np.asarray(stiffness_matrix[rows + boundary_size, cols])
+        coupling_local = coupling_local.reshape((interior_size, 6))
+        self.factorization = spsl.splu(sps.csc_matrix(stiffness_interior))
+        x_local = self.factorization.solve(coupling_local)
+
+        # The sparse matrix X = K_ii^-1 K_ib and the condensed stiffness matrix.
+        self.coupling = stiffness_coupling
+        self.x_matrix = sps.csr_matrix((x_local.ravel(), (rows, cols)),
+                                       shape=(interior_size, boundary_size))
+        self.stiffness_matrix = stiffness_boundary - stiffness_coupling @ self.x_matrix
+        return
+
+    def condense_force_matrix(self, force_matrix):
+        """Condenses the force matrix onto the original nodes.
+
+        Arguments:
+            force_matrix -- a sparse matrix combining the global force vectors
+                            of the different loadgroups
+
+        Return values:
+            force_matrix_condensed -- the sparse force matrix of the original
+                                      nodes
+            interior_displacements -- the displacements of the interior nodes
+                                      for fixed original nodes
+        """
+        force_matrix = sps.csr_matrix(force_matrix)
+        force_boundary = force_matrix[:self.boundary_size]
+        if self.interior_size == 0:
+            interior_displacements = np.zeros((0, force_matrix.shape[1]))
+            return force_boundary.copy(), interior_displacements
+
+        interior_displacements = solve_force_matrix(self.factorization,
+                                                    force_matrix[self.boundary_size:])
+        interior_displacements = interior_displacements.reshape((self.interior_size, -1))
+        force_matrix_condensed = force_boundary - sps.csr_matrix(self.coupling @ interior_displacements)
+        return force_matrix_condensed, interior_displacements
+
+    def recover_displacements(self, displacements_boundary, interior_displacements):
+        """Adds the displacements of the interior nodes to the ones of the original nodes.
+
+        Arguments:
+            displacements_boundary -- the displacement matrix of the original
+                                      nodes
+            interior_displacements -- the displacements of the interior nodes
+                                      for fixed original nodes
+
+        Return values:
+            displacements -- the displacement matrix of all nodes
+        """
+        if self.interior_size == 0:
+            return displacements_boundary
+        displacements_interior = interior_displacements - self.x_matrix @ displacements_boundary
+        displacements = np.vstack((displacements_boundary, displacements_interior))
+        return displacements
+
+
+def get_end_degrees(nodes_lists, interior_size):
+    """Gives for each interior degree of freedom the six degrees of freedom of its beam ends.
+
+    Arguments:
+        nodes_lists   -- a list containing for each beam an ordered list of the
+                         node numbers along the beam
+        interior_size -- the amount of interior degrees of freedom
+
+    Return values:
+        end_degrees -- an array (interior degrees, 6) of the degrees of freedom
+                       of the start and end node of the corresponding beam
+    """
+    # The interior nodes are numbered consecutively beam by beam.
+    interior_amounts = [len(nodes_list) - 2 for nodes_list in nodes_lists]
+    end_nodes = np.array([[nodes_list[0], nodes_list[-1]] for nodes_list in nodes_lists])
+    beams_degrees = np.hstack((3 * end_nodes[:, 0:1] + np.arange(3),
+                               3 * end_nodes[:, 1:2] + np.arange(3)))
+
+    beam_of_node = np.repeat(np.arange(len(nodes_lists)), interior_amounts)
+    end_degrees = np.repeat(beams_degrees[beam_of_node], 3, axis=0)
+    if end_degrees.shape[0] != interior_size:
+        raise Exception('The interior nodes are not numbered consecutively after the original nodes.')
+    return end_degrees
@@ -21,6 +21,9 @@ the following keys:
                             'Elements' containing for each a dictionary
                             containing the hinged releases to the according 
                             element or beam numbers
+    'Degrees'            -- a numpy array (6, number of elements) containing
+                            for each element the global degrees of freedom 
+                            of its start and end node
 """
 
 import numpy as np
@@ -71,11 +74,14 @@ def discretize(nodes, beams, discType='Elementwise', discElements=100, discLengt
     
     releases = get_releases_lists(beams_nodes, beams_releases, elements_lists)
     
+    elements_degrees = get_elements_degrees(nodes_lists)
+    
     #Create the output dictionary containing the created information.
     discretization_information={'Nodes'             :nodes_lists,
                                 'Beams Information' :beams_information,
                                 'Elements'          :elements_lists,
-                                'Releases'          :releases}
+                                'Releases'          :releases,
+                                'Degrees'           :elements_degrees}
     
     return discretization_information
 
@@ -273,4 +279,28 @@ def get_releases_lists(beams_nodes, beams_releases, elements_lists):
          
     releases={'Beams':releases_beams, 'Elements':releases_elements}
     
-    return releases
\ No newline at end of file
+    return releases
+
+
+def get_elements_degrees(nodes_lists):
+    """Creates an array of the global degrees of freedom of each element.
+    
+    The elements are numbered consecutively along the beams, the same way as
+    in enumerate_beam_element.
+    
+    Arguments:
+        nodes_lists -- a list containing for each beam an ordered list of the 
+                       node numbers along the beam
+    
+    Return values:
+        elements_degrees -- a numpy array (6, number of elements) containing 
+                            for each element the degrees of freedom of its 
+                            start and end node
+    """
+    start_nodes = np.concatenate([nodes_list[:-1] for nodes_list in nodes_lists])
+    end_nodes   = np.concatenate([nodes_list[1:] for nodes_list in nodes_lists])
+    
+    elements_degrees = np.vstack((3*start_nodes, 3*start_nodes+1, 3*start_nodes+2,
+                                  3*end_nodes, 3*end_nodes+1, 3*end_nodes+2))
+    
+    return elements_degrees
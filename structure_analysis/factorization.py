@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the cache of the factorized stiffness matrices.
+
+Repeated analyses of the same structure (for example during the optimisation
+of the self-stress state) only differ in their loads. The factorization of the
+modified stiffness matrix is therefore stored under a key built from the
+matrix itself (which includes the boundary conditions), such that any further
+analysis only carries out the back-substitution.
+
+Two solvers are available:
+    'Sparse' -- the general sparse LU factorization of scipy.sparse.linalg.splu
+    'Banded' -- the degrees of freedom are renumbered by the reverse 
+                Cuthill-McKee algorithm to reduce the bandwidth, then the 
+                symmetric positive definite matrix is factorized by the banded
+                Cholesky factorization of scipy.linalg.cholesky_banded. If the
+                bandwidth is too large or the matrix is not positive definite,
+                the sparse LU factorization is used instead.
+
+The factorizations only solve dense right-hand sides, sparse force matrices are
+therefore solved in chunks of columns by solve_force_matrix.
+"""
+
+from collections import OrderedDict
+from hashlib import sha1
+
+import numpy as np
+import scipy.linalg as sl
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsl
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+SOLVERS = ('Sparse', 'Banded')
+
+
+class FactorizationCache:
+    """A least recently used cache of factorized stiffness matrices.
+
+    Arguments:
+        maxsize -- the maximal amount of factorizations kept in memory, a
+                   maxsize of zero disables the cache
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.factorizations = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def __len__(self):
+        return len(self.factorizations)
+
+    def get_factorization(self, stiffness_matrix, solver='Sparse'):
+        """Returns the factorization of the stiffness matrix, factorizing it only if needed.
+
+        Arguments:
+            stiffness_matrix -- the modified (regular) stiffness matrix of the
+                                system
+
+        Keyword arguments:
+            solver -- the method of the factorization, either 'Sparse' or 
+                      'Banded' (see the module description)
+
+        Return values:
+            factorization -- the factorized stiffness matrix, its method solve
+                             returns the displacements of a force matrix
+        """
+        if solver not in SOLVERS:
+            raise Exception('The solver "' + str(solver) + '" is not defined.')
+        stiffness_matrix = stiffness_matrix.tocsc()
+        key = solver + get_key(stiffness_matrix)
+
+        if key in self.factorizations:
+            self.hits += 1
+            self.factorizations.move_to_end(key)
+            return self.factorizations[key]
+
+        self.misses += 1
+        factorization = None
+        if solver == 'Banded':
+            factorization = get_banded_factorization(stiffness_matrix)
+        if factorization is None:
+            factorization = spsl.splu(stiffness_matrix)
+
+        # Save the factorization and evict the least recently used ones.
+        if self.maxsize > 0:
+            self.factorizations[key] = factorization
+            while len(self.factorizations) > self.maxsize:
+                self.factorizations.popitem(last=False)
+        return factorization
+
+    def clear(self):
+        """Deletes all factorizations and resets the counters."""
+        self.factorizations.clear()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def info(self):
+        """Returns a dictionary with the hits, misses and the size of the cache."""
+        info = {'Hits': self.hits, 'Misses': self.misses,
+                'Size': len(self.factorizations), 'Maxsize': self.maxsize}
+        return info
+
+
+class BandedFactorization:
+    """The banded Cholesky factorization of a renumbered stiffness matrix.
+
+    Arguments:
+        cholesky    -- the upper cholesky factor in banded storage
+        permutation -- the order of the degrees of freedom in the factor
+    """
+
+    def __init__(self, cholesky, permutation):
+        self.cholesky = cholesky
+        self.permutation = permutation
+        return
+
+    def solve(self, force_matrix):
+        """Returns the displacements of a force vector or matrix."""
+        displacements = np.empty_like(force_matrix)
+        displacements[self.permutation] = sl.cho_solve_banded((self.cholesky, False),
+                                                              force_matrix[self.permutation],
+                                                              check_finite=False)
+        return displacements
+
+
+def get_banded_factorization(stiffness_matrix, max_bandwidth=200):
+    """Renumbers and factorizes the stiffness matrix with the banded Cholesky factorization.
+
+    Arguments:
+        stiffness_matrix -- the modified stiffness matrix in sparse csc format
+
+    Keyword arguments:
+        max_bandwidth -- the largest bandwidth of the renumbered matrix for
+                         which the banded factorization is used
+
+    Return values:
+        factorization -- the banded factorization, None if the bandwidth is
+                         too large or the matrix is not positive definite
+    """
+    size = stiffness_matrix.shape[0]
+    if size == 0:
+        return None
+
+    # Renumber the degrees of freedom to reduce the bandwidth.
+    permutation = reverse_cuthill_mckee(stiffness_matrix.tocsr(), symmetric_mode=True)
+    stiffness_matrix_permuted = stiffness_matrix.tocsr()[permutation][:, permutation]
+    upper_triangle = sps.triu(stiffness_matrix_permuted).tocoo()
+    bandwidth = np.max(upper_triangle.col - upper_triangle.row)
+    if bandwidth > max_bandwidth:
+        return None
+
+    # Save the upper triangle in the banded storage and factorize it.
+    banded_matrix = np.zeros((bandwidth + 1, size))
+    banded_matrix[bandwidth + upper_triangle.row - upper_triangle.col,
+                  upper_triangle.col] = upper_triangle.data
+    try:
+        cholesky = sl.cholesky_banded(banded_matrix, lower=False, check_finite=False)
+    except sl.LinAlgError:
+        return None
+    factorization = BandedFactorization(cholesky, permutation)
+    return factorization
+
+
+def solve_force_matrix(factorization, force_matrix, chunk_size=256):
+    """Solves a dense or sparse force matrix with a factorization.
+
+    A sparse force matrix is only converted to a dense matrix in chunks of
+    columns, such that no dense copy of the whole force matrix is created.
+
+    Arguments:
+        factorization -- the factorized stiffness matrix
+        force_matrix  -- a dense or sparse matrix combining the force vectors
+                         of the different loadgroups
+
+    Keyword arguments:
+        chunk_size -- the amount of columns converted to a dense matrix at once
+
+    Return values:
+        displacements -- the dense displacement matrix
+    """
+    if not sps.issparse(force_matrix):
+        return factorization.solve(np.asarray(force_matrix, dtype=float))
+
+    force_matrix = sps.csc_matrix(force_matrix, dtype=float)
+    rows, columns = force_matrix.shape
+    displacements = np.zeros((rows, columns))
+    for start in range(0, columns, chunk_size):
+        end = min(start + chunk_size, columns)
+        force_chunk = force_matrix[:, start:end]
+        # Columns without any forces have no displacements.
+        if force_chunk.nnz == 0 or rows == 0:
+            continue
+        displacements[:, start:end] = factorization.solve(force_chunk.toarray())
+    return displacements
+
+
+def get_key(stiffness_matrix):
+    """Creates the key of a sparse stiffness matrix from its shape and its entries.
+
+    Arguments:
+        stiffness_matrix -- the modified stiffness matrix in sparse csc format
+
+    Return values:
+        key -- a hash of the matrix, equal for equal matrices
+    """
+    stiffness_matrix.sum_duplicates()
+    stiffness_matrix.sort_indices()
+
+    key = sha1(np.array(stiffness_matrix.shape, dtype=np.int64).tobytes())
+    key.update(stiffness_matrix.indptr.astype(np.int64).tobytes())
+    key.update(stiffness_matrix.indices.astype(np.int64).tobytes())
+    key.update(stiffness_matrix.data.astype(np.float64).tobytes())
+    return key.hexdigest()
+
+
+# The cache used by the function solve of the package.
+factorization_cache = FactorizationCache()
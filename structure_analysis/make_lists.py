@@ -10,89 +10,96 @@ the displacement and internal force matrices.
 """
 
 import numpy as np
+
+from .results import BeamResults
  
 def get_dictionaries(discretization_information, internal_displacements_matrices,
                      internal_forces_matrices):
-    """Creates two lists containing the components of interst for each loadgroup.
+    """Creates the beamwise results of the displacements and the internal forces of all loadgroups.
     
-    The first list contains the displacements in each degree of freedom. The 
-    second list contains the internal forces.
+    The first results contain the displacements in each degree of freedom. The 
+    second results contain the internal forces. Each loadgroup of the results
+    can be used as the former dictionaries. (see results)
     
     Arguments:
         discretization_information      -- the dictionary containing the 
                                            information of the discretized system
-        internal_displacements_matrices -- the matrices storing the elementwise
+        internal_displacements_matrices -- the array (6, elements, loadgroups)
+                                           storing the elementwise 
                                            displacements (left and right) of 
                                            each loadgroup
-        internal_forces_matrices        -- the matrices storing the elementwise
-                                           internal forces (left and right) of 
-                                           each loadgroup
+        internal_forces_matrices        -- the array (6, elements, loadgroups)
+                                           storing the elementwise internal 
+                                           forces (left and right) of each 
+                                           loadgroup
         
     Return values:
-        displacement_dictionaries    -- the dictionary containing the 
-                                        displacements of the system
-        internal_forces_dictionaries -- the dictionary containing the internal 
-                                        forces of the system
+        displacement_results    -- the beamwise displacements of the nodes of
+                                   all loadgroups
+        internal_forces_results -- the beamwise internal forces of the nodes of
+                                   all loadgroups
     """
     elements_lists = discretization_information['Elements']
-    amount_of_loadgroups = len(internal_displacements_matrices)
     
     keys_id=['Displacement X','Displacement Y','Rotation Z']
     keys_if=['Normal Force','Shear Force','Moment']
     
-    displacement_dictionaries=[]
-    internal_forces_dictionaries=[]
+    #Get the left values of each element and the right value of each beams last element.
+    elements, rows, offsets = get_nodes_indices(elements_lists)
     
-    #Append the lists with a dictionary for each loadgroup.
-    for i in range(amount_of_loadgroups):
+    displacement_results    = create_results(internal_displacements_matrices,
+                                             elements, rows, offsets, keys_id)
+    internal_forces_results = create_results(internal_forces_matrices,
+                                             elements, rows, offsets, keys_if)
         
-        #Get the displacements and the internal forces of the current loagroup
-        id_matrix = internal_displacements_matrices[i]
-        if_matrix = np.asarray(internal_forces_matrices[i])
-        
-        #Create the Displacement Dictionary
-        displacements_dict = create_dictionary(elements_lists, id_matrix, keys_id)
-        internal_forces_dict = create_dictionary(elements_lists, if_matrix, keys_if)
+    return displacement_results, internal_forces_results
 
-        displacement_dictionaries.append(displacements_dict)
-        internal_forces_dictionaries.append(internal_forces_dict)
-        
-    return displacement_dictionaries, internal_forces_dictionaries
 
- 
-def create_dictionary(elements_lists, internal_matrix, keys):
-    """Creates a dictionary with the 3 entries of an internal matrix.
+def get_nodes_indices(elements_lists):
+    """Gives the element and the first row of the internal matrices of each node.
+    
+    Each beam has a value for each node: the left values of its elements and
+    the right value of its last element.
     
     Arguments:
-        elements_lists  -- a list containing for each beam a list of the elements
-                           on the beam in consecutive order
-        internal_matrix -- any internal matrix (storing left and right side
-                           values) to be saved in a dictionary
-        keys            -- the keys to the three entries of the dictionary
+        elements_lists -- a list containing for each beam a list of the elements
+                          on the beam in consecutive order
         
     Return values:
-        dictionary -- the dictionary created from the internal_matrix
+        elements -- an array of the element of each node
+        rows     -- an array of the first row (0 for left, 3 for right values)
+                    of each node
+        offsets  -- an array of the index of the first node of each beam
     """
-    value_1 = []
-    value_2 = []
-    value_3 = []
+    amounts = np.array([len(element_list) + 1 for element_list in elements_lists], dtype=int)
+    offsets = np.concatenate(([0], np.cumsum(amounts)))
     
-    #Append the lists for each beam.
-    for element_list in elements_lists:
-        
-        #Get the left and the right element number of each beam.
-        left_element  = element_list[0]
-        right_element = element_list[-1]
-        
-        #Get a value for each node. Combine the left values with the last right value.
-        values_left = internal_matrix[0:3,left_element:right_element+1]
-        value_right = internal_matrix[3:6,right_element].reshape((3,1))
-        values_beam = np.hstack((values_left,value_right))
+    elements = np.concatenate([list(element_list) + [element_list[-1]]
+                               for element_list in elements_lists]).astype(int)
+    rows = np.zeros(offsets[-1], dtype=int)
+    rows[offsets[1:] - 1] = 3
+    
+    return elements, rows, offsets
+
+ 
+def create_results(internal_matrices, elements, rows, offsets, keys):
+    """Creates the beamwise results with the 3 entries of an internal matrix.
+    
+    Arguments:
+        internal_matrices -- any internal matrices (6, elements, loadgroups) 
+                             storing left and right side values
+        elements          -- an array of the element of each node
+        rows              -- an array of the first row of each node
+        offsets           -- an array of the index of the first node of each beam
+        keys              -- the keys to the three entries of the results
         
-        value_1.append(list(values_beam[0,:]))
-        value_2.append(list(values_beam[1,:]))
-        value_3.append(list(values_beam[2,:]))
+    Return values:
+        results -- the beamwise results (see results)
+    """
+    #Gather the values (loadgroups, 3, nodes) of all nodes at once.
+    values = internal_matrices[rows + np.arange(3)[:, np.newaxis], elements, :]
+    values = np.ascontiguousarray(values.transpose((2, 0, 1)))
     
-    dictionary = {keys[0]: value_1, keys[1]: value_2, keys[2]:value_3}
+    results = BeamResults(values, offsets, keys)
     
-    return dictionary
\ No newline at end of file
+    return results
@@ -8,6 +8,12 @@ Created on Fri May 24 14:05:46 2019
 This module contains the function to calculate the state of the points of
 interest after having calculated the displacements and the internal forces 
 at the discretization nodes.
+
+All points of interest and loadgroups are evaluated at once: the points are
+sorted by their beams, their elements are located by a binary search on the
+element grid of each beam and the shape functions and the influence of the
+member loads are evaluated on arrays (points, loadgroups). The member loads are
+gathered as for the stations. (see stations)
 """
 
 import numpy as np
@@ -15,14 +21,17 @@ import scipy.integrate as integrate
 
 from .assembly.rotation_matrix import get_rotation_matrix
 from .assembly.shape_functions import *
+from .quadrature import gauss_legendre, vectorize_function
+from .stations import get_member_loads, get_load_station_pairs, gauss_points, get_local_functions
 
 
 def calculate_state_poi(loads, points_of_interest, discretization_information,
-                        internal_displacements_matrices, internal_forces_matrices):
+                        internal_displacements_matrices, internal_forces_matrices,
+                        quadrature='Adaptive'):
     """Calculates the displacements and the internal forces of all points of interest.
     
-    In a first step the data is calculated pointwise. Afterwards it is reordered
-    elementwise.
+    In a first step the data is calculated as arrays (3, points, loadgroups).
+    Afterwards it is split into dictionaries for each loadgroup.
     
     Arguments:
         loads                           -- a list containing the loadgroups of 
@@ -31,12 +40,18 @@ def calculate_state_poi(loads, points_of_interest, discretization_information,
                                            is to be calculated
         discretization_information      -- the dictionary containing the 
                                            information of the discretized system
-        internal_displacements_matrices -- the matrices storing the elementwise
+        internal_displacements_matrices -- the array (6, elements, loadgroups)
+                                           storing the elementwise 
                                            displacements (left and right) of 
                                            each loadgroup
-        internal_forces_matrices        -- the matrices storing the elementwise
-                                           internal forces (left and right) of 
-                                           each loadgroup
+        internal_forces_matrices        -- the array (6, elements, loadgroups)
+                                           storing the elementwise internal 
+                                           forces (left and right) of each 
+                                           loadgroup
+        
+    Keyword arguments:
+        quadrature -- the quadrature of the functional loads, either 'Adaptive'
+                      or 'Gauss-Legendre' (see quadrature)
         
     Return values:
         displacements_dictionaries   -- the dictionary containing the 
@@ -44,290 +59,287 @@ def calculate_state_poi(loads, points_of_interest, discretization_information,
         internal_forces_dictionaries -- the dictionary containing the internal 
                                         forces of the points of interest
     """
+    grid = get_poi_grid(points_of_interest[0], discretization_information)
     
-    beams_information   = discretization_information['Beams Information']
-    elements_lists      = discretization_information['Elements']
+    #Get the points displacements.
+    displacements = get_poi_displacements(grid, internal_displacements_matrices)
     
-    displacement_list    =[]
-    internal_forces_list =[]
+    #Get the points internal forces.
+    internal_forces = get_poi_internal_forces(loads, grid, internal_forces_matrices,
+                                              quadrature=quadrature)
     
-    #Calculate the data pointwise.
-    for point_of_interest in points_of_interest[0]:
-        
-        #Get all necessary information
-        beam_nr         = point_of_interest[0]
-        poi_distance    = point_of_interest[1]
-        element_length  = beams_information[beam_nr][3]
-        theta           = beams_information[beam_nr][1]
-        j_element       = max(int(np.ceil(poi_distance / element_length)-1),0)
-        j_element       = min(beams_information[beam_nr][2]-1,j_element)
-        element_distance= j_element*element_length
-        dif_distance    = poi_distance - element_distance
-        element_nr      = elements_lists[beam_nr][j_element]
-        
-        #Get the points displacements.
-        poi_displacements = get_poi_displacement(element_nr, element_length,
-                                                 theta, dif_distance,
-                                                 internal_displacements_matrices)
-        
-        #Get the points intrenal forces.
-        poi_internal_forces = get_poi_internal_forces(loads, beam_nr, theta,
-                                                      element_nr, element_distance,
-                                                      poi_distance,
-                                                      internal_forces_matrices)
-        
-        displacement_list.append(poi_displacements)
-        internal_forces_list.append(poi_internal_forces)
-        
-    #Reorder the lists loadgroupwise.
-    displacements_dictionaries =[]
-    internal_forces_dictionaries =[]
-    
-    #Build the lists for every loadgroup
-    for i in range(len(loads)):
-        dx_list  =[]
-        dy_list  =[]
-        drz_list =[]
-        n_list   =[]
-        v_list   =[]
-        m_list   =[]
-        
-        #Build the lists which include all values of a loadcase.
-        for j in range(len(points_of_interest[0])):
-            dx_list.append(displacement_list[j][i][0])
-            dy_list.append(displacement_list[j][i][1])
-            drz_list.append(displacement_list[j][i][2])
-            n_list.append(internal_forces_list[j][i][0])
-            v_list.append(internal_forces_list[j][i][1])
-            m_list.append(internal_forces_list[j][i][2])
-        
-        #Create the dictionaries.
-        displacements_dictionary={'Displacement X':dx_list,
-                                  'Displacement Y':dy_list,
-                                  'Rotation Z':drz_list}
+    #Restore the order of the points and create the dictionaries of each loadgroup.
+    order = np.argsort(grid['Order'])
+    displacements   = displacements[:, order, :].transpose((2, 0, 1)).tolist()
+    internal_forces = internal_forces[:, order, :].transpose((2, 0, 1)).tolist()
+    
+    keys_id = ['Displacement X', 'Displacement Y', 'Rotation Z']
+    keys_if = ['Normal Force', 'Shear Force', 'Moment']
+    displacements_dictionaries = [dict(zip(keys_id, values)) for values in displacements]
+    internal_forces_dictionaries = [dict(zip(keys_if, values)) for values in internal_forces]
+    
+    return displacements_dictionaries, internal_forces_dictionaries
+
+
+def get_poi_grid(points_of_interest, discretization_information):
+    """Sorts the points of interest by their beams and locates them on their elements.
+    
+    A point on a node between two elements belongs to the left element.
+    
+    Arguments:
+        points_of_interest         -- a list of points, for which the state is
+                                      to be calculated
+        discretization_information -- the dictionary containing the information
+                                      of the discretized system
         
-        internal_forces_dictionary={'Normal Force':n_list,
-                                    'Shear Force':v_list,
-                                    'Moment':m_list}
+    Return values:
+        grid -- a dictionary of arrays with one entry per sorted point: its
+                original index, beam, element, distance from the beams start,
+                the start and length of its element and its orientation.
+                Further the offsets of each beams points and the orientation
+                (cosine and sine) of each beam.
+    """
+    beams_information = discretization_information['Beams Information']
+    elements_lists    = discretization_information['Elements']
+    
+    points = np.array([point[0:2] for point in points_of_interest], dtype=float).reshape((-1, 2))
+    order     = np.argsort(points[:, 0], kind='stable')
+    beams_nrs = points[order, 0].astype(int)
+    distances = points[order, 1]
+    offsets   = np.searchsorted(beams_nrs, np.arange(len(beams_information) + 1))
+    
+    orientations = np.array([get_rotation_matrix(beam_information[1])[0:2, 0]
+                             for beam_information in beams_information],
+                            dtype=float).reshape((-1, 2))
+    
+    #Search the element of the points beam by beam on the grid of the elements ends.
+    elements = np.zeros(len(beams_nrs), dtype=int)
+    starts   = np.zeros(len(beams_nrs))
+    lengths  = np.zeros(len(beams_nrs))
+    for beam_nr in np.unique(beams_nrs):
+        points_beam    = slice(offsets[beam_nr], offsets[beam_nr + 1])
+        element_length = beams_information[beam_nr][3]
+        n_elements     = beams_information[beam_nr][2]
+        elements_ends  = np.arange(1, n_elements) * element_length
+        j_element      = np.searchsorted(elements_ends, distances[points_beam], side='left')
         
-        displacements_dictionaries.append(displacements_dictionary)
-        internal_forces_dictionaries.append(internal_forces_dictionary)
+        elements[points_beam] = np.asarray(elements_lists[beam_nr])[j_element]
+        starts[points_beam]   = j_element * element_length
+        lengths[points_beam]  = element_length
     
-    return displacements_dictionaries, internal_forces_dictionaries
+    grid = {'Order'       : order,
+            'Beams'       : beams_nrs,
+            'Elements'    : elements,
+            'Distances'   : distances,
+            'Starts'      : starts,
+            'Lengths'     : lengths,
+            'Cos'         : orientations[beams_nrs, 0],
+            'Sin'         : orientations[beams_nrs, 1],
+            'Offsets'     : offsets,
+            'Orientations': orientations}
+    
+    return grid
 
-def get_poi_displacement(element_nr, element_length, theta, distance,
-                         internal_displacements_matrices):
-    """Calculates the displacements of the point of interest on the corresponding element.
+
+def get_poi_displacements(grid, internal_displacements_matrices):
+    """Calculates the displacements of all points of interest on their elements.
     
     The calculation uses the shape functions and is therefore an approximation
     even for the case of infinite shear stiffness.
     
     Arguments:
-        element_nr                      -- the number of the element on which 
-                                           the point of interest is located
-        element_length                  -- the length of the element on which 
-                                           the point of interest is located
-        theta                           -- the orientation of the local 
-                                           coordinate systems (the inclination 
-                                           of the beam)
-        distance                        -- the distance of the point of interest
-                                           from the starting node
-        internal_displacements_matrices -- the matrices storing the elementwise
-                                           internal forces (left and right) of 
+        grid                            -- the dictionary describing the points
+                                           (see get_poi_grid)
+        internal_displacements_matrices -- the array (6, elements, loadgroups)
+                                           storing the elementwise 
+                                           displacements (left and right) of 
                                            each loadgroup
         
     Return values:
-        poi_displacements -- a list of the displacements of the point of 
-                             interest for each loadgroup
+        displacements -- an array (3, points, loadgroups) of the global 
+                         displacements of the points of interest
     """
+    cos = grid['Cos'][:, np.newaxis]
+    sin = grid['Sin'][:, np.newaxis]
     
-    poi_displacements = []
-    r                 = get_rotation_matrix(theta)
-    r_t               = r.transpose()
-    i_d_matrices      = internal_displacements_matrices
-    for i in range(len(internal_displacements_matrices)):
-        local_nodal_displacements = r_t @ i_d_matrices[i][:,element_nr]
-
-        x_left   = local_nodal_displacements[0]
-        y_left   = local_nodal_displacements[1]
-        rz_left  = local_nodal_displacements[2]
-        
-        x_right  = local_nodal_displacements[3]
-        y_right  = local_nodal_displacements[4]
-        rz_right = local_nodal_displacements[5]
-        l = element_length
+    #The local displacements of all points and loadgroups at once.
+    nodal = internal_displacements_matrices[:, grid['Elements'], :]
+    
+    x_left   =  cos*nodal[0] + sin*nodal[1]
+    y_left   = -sin*nodal[0] + cos*nodal[1]
+    rz_left  =  nodal[2]
+    
+    x_right  =  cos*nodal[3] + sin*nodal[4]
+    y_right  = -sin*nodal[3] + cos*nodal[4]
+    rz_right =  nodal[5]
+    
+    distance = (grid['Distances'] - grid['Starts'])[:, np.newaxis]
+    l = grid['Lengths'][:, np.newaxis]
 
-        dx=     x_left  * n1(distance, l)  + x_right  * n2(distance, l)
-        dy=  (  y_left  * n3(distance, l)  + y_right  * n5(distance, l)
-              + rz_left * n4(distance, l)  + rz_right * n6(distance, l))
-        drz= (  y_left  * n31(distance, l) + y_right  * n51(distance, l)
-              + rz_left * n41(distance, l) + rz_right * n61(distance, l))
-        
-        global_displacements = r[0:3,0:3] @ np.array([dx,dy,drz])
-        
-        poi_displacements.append([global_displacements[0],
-                                  global_displacements[1],
-                                  global_displacements[2]])
+    dx=     x_left  * n1(distance, l)  + x_right  * n2(distance, l)
+    dy=  (  y_left  * n3(distance, l)  + y_right  * n5(distance, l)
+          + rz_left * n4(distance, l)  + rz_right * n6(distance, l))
+    drz= (  y_left  * n31(distance, l) + y_right  * n51(distance, l)
+          + rz_left * n41(distance, l) + rz_right * n61(distance, l))
+    
+    displacements = np.array([cos*dx - sin*dy, sin*dx + cos*dy, drz]).reshape(
+        (3, len(grid['Elements']), internal_displacements_matrices.shape[2]))
     
-    return poi_displacements
+    return displacements
+
 
-def get_poi_internal_forces(loads, beam_nr, theta, element_nr, element_distance,
-                            poi_distance, internal_forces_matrices):
-    """Calculates the displacements of the point of interest on the corresponding element.
+def get_poi_internal_forces(loads, grid, internal_forces_matrices, quadrature='Adaptive'):
+    """Calculates the internal forces of all points of interest.
+    
+    The internal forces on the left side of the element are completed with the
+    influence of the shear force and of the member loads between the elements
+    start and the point.
     
     Arguments:
         loads                    -- a list containing the loadgroups of the model
-        beam_nr                  -- the number of the beam on which the point is
-                                    located
-        theta                    -- the orientation of the local coordinate 
-                                    systems (the inclination of the beam)
-        element_nr               -- the number of the element on which the point
-                                    is located
-        element_distance         -- the distance of the element to the beams 
-                                    starting node
-        poi_distance             -- the distance of the point of interest to the
-                                    beams starting node
-        internal_forces_matrices -- the matrices storing the elementwise internal
-                                    forces (left and right) of each loadgroup
+        grid                     -- the dictionary describing the points (see
+                                    get_poi_grid)
+        internal_forces_matrices -- the array (6, elements, loadgroups) storing
+                                    the elementwise internal forces (left and
+                                    right) of each loadgroup
+    
+    Keyword arguments:
+        quadrature -- the quadrature of the functional loads (see quadrature)
     
     Return values:
-        poi_internal_forces -- a list of the internal forces of the point of
-                               interest for each loadgroup
+        internal_forces -- an array (3, points, loadgroups) of the internal 
+                           forces of the points of interest
     """
+    #The value on the left side of the element and the influence of the shear force.
+    internal_forces = internal_forces_matrices[0:3, grid['Elements'], :].copy()
+    internal_forces[2] += internal_forces[1] * (grid['Distances'] - grid['Starts'])[:, np.newaxis]
     
-    poi_internal_forces=[]
-    for loadgroup_nr, loadgroup in enumerate(loads,0):
-        
-        #The value on the left side of the element.
-        n_left   = internal_forces_matrices[loadgroup_nr][0,element_nr]
-        v_left   = internal_forces_matrices[loadgroup_nr][1,element_nr]
-        m_left   = internal_forces_matrices[loadgroup_nr][2,element_nr]
-        
-        #The influence of the shear force.
-        forces_toadd=np.array([0, 0, v_left*(poi_distance-element_distance)])
-        
-        #The influence of the different loadtypes.
-        
-        if 'Point' in loadgroup and loadgroup['Point']:
-            for point_load in loadgroup['Point']:
-                if (point_load[0]==beam_nr and element_distance<point_load[1] 
-                    and poi_distance>point_load[1]):
-                    
-                    distance = (poi_distance-point_load[1])
-                    
-                    forces_toadd[0] -= np.cos(theta)*point_load[2]
-                    forces_toadd[0] -= np.sin(theta)*point_load[3]
-                    forces_toadd[1] -= np.sin(theta)*point_load[2]
-                    forces_toadd[1] += np.cos(theta)*point_load[3]
-                    forces_toadd[2] -= point_load[4]
-                    forces_toadd[2] -= np.sin(theta)*point_load[2]*distance
-                    forces_toadd[2] += np.cos(theta)*point_load[3]*distance
-         
-        if 'Distributed' in loadgroup and loadgroup['Distributed']:
-            for distributed_load in loadgroup['Distributed']:
-                if (distributed_load[0]==beam_nr 
-                    and element_distance<distributed_load[2]
-                    and poi_distance>distributed_load[1]):
-                    
-                    #Defining the borders of the integration.
-                    integration_start = max(element_distance, distributed_load[1])
-                    integration_end   = min(poi_distance, distributed_load[2])
-                    
-                    #Calculate and update the forces for each direction.
-                    for i in range(3):
-                        fun=distributed_load_function(distributed_load, i)
-                        forces_toadd+=calculate_forces_toadd(fun,theta,i,poi_distance,
-                                                             integration_start,
-                                                             integration_end)
-        
-        if 'Functions' in loadgroup and loadgroup['Functions']:
-            for load_function in loadgroup['Functions']:
-                if (load_function[0]==beam_nr 
-                    and element_distance<load_function[2] 
-                    and poi_distance>load_function[1]):
-                    #Defining the borders of the integration.
-                    integration_start = max(element_distance, load_function[1])
-                    integration_end   = min(poi_distance, load_function[2])
-                    
-                    #Calculate and update the forces for each direction.
-                    for i in range(3):
-                        forces_toadd+=calculate_forces_toadd(load_function[3+i],
-                                                             theta,i,poi_distance,
-                                                             integration_start,
-                                                             integration_end)
-        
-        #Include all of the loads influences on the internal forces of the
-        # current loadgroup.
-        poi_internal_forces.append([n_left+forces_toadd[0],
-                                    v_left+forces_toadd[1],
-                                    m_left+forces_toadd[2]])
-    
-    return poi_internal_forces
+    #The influence of the different loadtypes.
+    point_loads, distributed_loads, functional_loads = get_member_loads(loads, grid)
+    add_point_loads(grid, point_loads, internal_forces)
+    add_distributed_loads(grid, distributed_loads, internal_forces)
+    add_functional_loads(grid, functional_loads, internal_forces, quadrature=quadrature)
     
-def distributed_load_function(distributed_load, direction):
-    """Creates a load function out of the distributed load.
+    return internal_forces
+
+
+def add_point_loads(grid, point_loads, internal_forces):
+    """Adds the influence of the point loads between the elements start and the points.
     
-    Keyword argument:
-        distributed_load -- a single distributed load
-        direction -- the direction of interest of the distributed load
-        
-    Return values:
-        function_load -- the load function of the specified direction
+    Arguments:
+        grid            -- the dictionary describing the points (see get_poi_grid)
+        point_loads     -- the array of the point loads (see stations)
+        internal_forces -- the array (3, points, loadgroups) of the internal 
+                           forces, which is updated
     """
-    def function_load(x):
-        q=(distributed_load[3+direction]+x/(distributed_load[2]-distributed_load[1])
-          *(distributed_load[6+direction]-distributed_load[3+direction]))
-        return q
+    load_index, point = get_load_station_pairs(point_loads[:, 1], grid['Offsets'])
+    if not len(point):
+        return
+    loadgroup = point_loads[load_index, 0].astype(int)
+    position  = point_loads[load_index, 2]
+    fx, fy, mz = point_loads[load_index, 3:6].transpose()
+    
+    distance = grid['Distances'][point]
+    weight = ((grid['Starts'][point] < position) & (position < distance)).astype(float)
+    np.add.at(internal_forces[0], (point, loadgroup), -weight * fx)
+    np.add.at(internal_forces[1], (point, loadgroup),  weight * fy)
+    np.add.at(internal_forces[2], (point, loadgroup),  weight * (fy * (distance - position) - mz))
     
-    return function_load
+    return
 
 
-def calculate_forces_toadd(function, theta, direction ,poi_distance,
-                           integration_start, integration_end):
-    """Calculates influence of a loadfunction on the internal forces at a point of interest 
+def add_distributed_loads(grid, distributed_loads, internal_forces):
+    """Adds the influence of the distributed loads between the elements start and the points.
     
-    Keyword arguments:
-        function          -- the load function in a specified direction
-        theta             -- the orientation of the local coordinate systems 
-                             (the inclination of the beam)
-        direction         -- described in which global direction the force is 
-                             acting.
-        poi_distance      -- the distance of the point of interest to the beams
-                             starting node
-        integration_start -- the start of the integration (either the loads 
-                             start or the start of the element)
-        integration_end   -- the end of the integration (either the loads end 
-                             or the distance of the point of interest)
+    The loads are linear, their integrals are therefore exact with the 
+    three-point Gauss-Legendre quadrature.
     
-    Return values:
-        forces_toadd -- the internal forces deviating from the unloaded element
-                        because of the calculated load function
+    Arguments:
+        grid              -- the dictionary describing the points (see
+                             get_poi_grid)
+        distributed_loads -- the array of the distributed loads (see stations)
+        internal_forces   -- the array (3, points, loadgroups) of the internal
+                             forces, which is updated
     """
+    load_index, point = get_load_station_pairs(distributed_loads[:, 1], grid['Offsets'])
+    if not len(point):
+        return
+    loads     = distributed_loads[load_index]
+    loadgroup = loads[:, 0].astype(int)
+    x_start   = loads[:, 2:3]
+    x_end     = loads[:, 3:4]
+    
+    #Defining the borders of the integration, empty if the load is not in between.
+    distance = grid['Distances'][point][:, np.newaxis]
+    lower = np.maximum(grid['Starts'][point][:, np.newaxis], x_start)
+    upper = np.maximum(np.minimum(distance, x_end), lower)
+    x, w = gauss_points(lower, upper)
+    
+    ratio = (x - x_start) / np.where(x_end > x_start, x_end - x_start, 1)
+    qx, qy, mz = [loads[:, 4+i:5+i] + (loads[:, 7+i:8+i] - loads[:, 4+i:5+i]) * ratio
+                  for i in range(3)]
+    np.add.at(internal_forces[0], (point, loadgroup), -np.sum(w * qx, axis=1))
+    np.add.at(internal_forces[1], (point, loadgroup),  np.sum(w * qy, axis=1))
+    np.add.at(internal_forces[2], (point, loadgroup),  np.sum(w * (qy * (distance - x) - mz), axis=1))
+    
+    return
+
+
+def add_functional_loads(grid, functional_loads, internal_forces, quadrature='Adaptive'):
+    """Adds the influence of the functional loads between the elements start and the points.
     
-    forces_toadd=np.zeros((3))
-    
-    #Calculation according to the direction of the load.
-    if direction==0 and function!=0 and function!=None:
-        forces_toadd[0] = -np.cos(theta)*integrate.quad(function,integration_start,
-                                                        integration_end)[0]
-        forces_toadd[1] = -np.sin(theta)*integrate.quad(function,integration_start,
-                                                        integration_end)[0]
-        forces_toadd[2] = -np.sin(theta)*integrate.quad((lambda x: function(x)
-                                                        *(poi_distance-x)),
-                                                        integration_start,
-                                                        integration_end)[0]
+    The load functions are integrated point by point using scipy.integrate.quad
+    or, with the 'Gauss-Legendre' quadrature, for all points of a beam at once.
+    
+    Arguments:
+        grid             -- the dictionary describing the points (see 
+                            get_poi_grid)
+        functional_loads -- the list of the functional loads (see stations)
+        internal_forces  -- the array (3, points, loadgroups) of the internal
+                            forces, which is updated
         
-    if direction ==1 and function!=0 and function!=None:
-        forces_toadd[0] = -np.sin(theta)*integrate.quad(function,integration_start,
-                                                        integration_end)[0]
-        forces_toadd[1] =  np.cos(theta)*integrate.quad(function,integration_start,
-                                                        integration_end)[0]
-        forces_toadd[2] =  np.cos(theta)*integrate.quad((lambda x: function(x)
-                                                        *(poi_distance-x)),
-                                                         integration_start,
-                                                         integration_end)[0]
+    Keyword arguments:
+        quadrature -- the quadrature of the load functions (see quadrature)
+    """
+    for loadgroup, load_function in functional_loads:
+        beam_nr = load_function[0]
         
-    if direction ==2 and function!=0 and function!=None:
-        forces_toadd[2] = -integrate.quad(function,integration_start,integration_end)[0]
+        cos, sin = grid['Orientations'][beam_nr]
+        if quadrature == 'Gauss-Legendre':
+            vectorized_load = list(load_function[0:3]) + [vectorize_function(function)
+                                                          for function in load_function[3:6]]
+            qx, qy, mz = get_local_functions(vectorized_load, cos, sin)
+            
+            #Defining the borders of the integration for all points of the beam.
+            points   = np.arange(grid['Offsets'][beam_nr], grid['Offsets'][beam_nr + 1])
+            distance = grid['Distances'][points]
+            lower = np.maximum(grid['Starts'][points], load_function[1])
+            upper = np.maximum(np.minimum(distance, load_function[2]), lower)
+            
+            def integrand(x, index):
+                qy_x = qy(x)
+                return np.array([qx(x), qy_x, qy_x * (distance[index, np.newaxis] - x) - mz(x)])
+            
+            values = gauss_legendre(integrand, lower, upper)
+            internal_forces[0, points, loadgroup] -= values[0]
+            internal_forces[1, points, loadgroup] += values[1]
+            internal_forces[2, points, loadgroup] += values[2]
+            continue
         
-    return forces_toadd
\ No newline at end of file
+        qx, qy, mz = get_local_functions(load_function, cos, sin)
+        
+        for point in range(grid['Offsets'][beam_nr], grid['Offsets'][beam_nr + 1]):
+            
+            #Defining the borders of the integration.
+            distance = grid['Distances'][point]
+            lower = max(grid['Starts'][point], load_function[1])
+            upper = min(distance, load_function[2])
+            if upper <= lower:
+                continue
+            
+            internal_forces[0, point, loadgroup] -= integrate.quad(qx, lower, upper)[0]
+            internal_forces[1, point, loadgroup] += integrate.quad(qy, lower, upper)[0]
+            internal_forces[2, point, loadgroup] += integrate.quad(
+                lambda x: qy(x) * (distance - x) - mz(x), lower, upper)[0]
+    
+    return
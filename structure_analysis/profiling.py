@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the optional profiling of the stages of structure_analysis.
+
+The stages of the analysis (verification, discretization, assembly, boundary
+conditions, factorization, solution, back calculation and the creation of the
+results) record their wall time and the size of the problem (degrees of
+freedom, non-zero entries of the stiffness matrix, loadgroups and elements)
+in the stage profiler. Profiling is switched on by the context manager
+profile_stages:
+
+    with profile_stages() as profiler:
+        structure_analysis(model)
+    print(profiler.report())
+
+The profiler aggregates the records of all analyses until it is cleared. It
+is thread-safe, such that analyses of several threads can be profiled at the
+same time. If profiling is switched off, each stage only checks a flag.
+
+Further the calls of the entry points of the package (structure_analysis,
+the compilation and the solution of compiled models and the results taken
+from the analysis cache) are counted for each call site outside of the
+package, such that the analyses can be attributed to the calling code.
+"""
+
+from contextlib import contextmanager
+import os
+import sys
+from threading import Lock
+from time import perf_counter
+
+COUNTERS = ('Degrees', 'Nonzeros', 'Loadgroups', 'Elements')
+
+# Frames of files in this directory are skipped when looking up the call site.
+PACKAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+class StageProfiler:
+    """A thread-safe collector of the wall times and counters of the analysis stages."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.active = 0
+        self.stages = {}
+        self.calls = {}
+        return
+
+    @property
+    def enabled(self):
+        return self.active > 0
+
+    def record(self, name, duration, counters):
+        """Adds the wall time and the counters of a stage to its aggregated record.
+
+        Arguments:
+            name     -- the name of the stage
+            duration -- the wall time of the stage in seconds
+            counters -- a dictionary of the counters of the stage (see COUNTERS)
+        """
+        with self.lock:
+            stage_record = self.stages.get(name)
+            if stage_record is None:
+                stage_record = {'Calls': 0, 'Total': 0.0, 'Max': 0.0}
+                self.stages[name] = stage_record
+            stage_record['Calls'] += 1
+            stage_record['Total'] += duration
+            stage_record['Max'] = max(stage_record['Max'], duration)
+            for counter, value in counters.items():
+                stage_record[counter] = max(stage_record.get(counter, 0), value)
+        return
+
+    def record_call(self, name, call_site):
+        """Counts a call of an entry point of the package.
+
+        Arguments:
+            name      -- the name of the entry point, e.g. 'Analysis' or 'Solve'
+            call_site -- the calling code outside of the package (see get_call_site)
+        """
+        with self.lock:
+            self.calls[(name, call_site)] = self.calls.get((name, call_site), 0) + 1
+        return
+
+    def count_calls(self, name):
+        """Returns the amount of calls of an entry point of all call sites."""
+        with self.lock:
+            return sum(calls for (name_i, _), calls in self.calls.items() if name_i == name)
+
+    def summary(self):
+        """Returns a dictionary of the aggregated records of each stage.
+
+        Each record contains the amount of calls, the total, mean and maximal
+        wall time in seconds and the largest value of each recorded counter.
+        """
+        with self.lock:
+            summary = {}
+            for name, stage_record in self.stages.items():
+                summary[name] = dict(stage_record)
+                summary[name]['Mean'] = stage_record['Total'] / stage_record['Calls']
+        return summary
+
+    def report(self):
+        """Returns the summary as a table sorted by the total wall time."""
+        summary = self.summary()
+        lines = ['{:<24}{:>7}{:>11}{:>11}{:>11}'.format('Stage', 'Calls', 'Total [s]',
+                                                         'Mean [s]', 'Max [s]')
+                 + ''.join('{:>11}'.format(counter) for counter in COUNTERS)]
+        for name, stage_record in sorted(summary.items(), key=lambda item: -item[1]['Total']):
+            line = '{:<24}{:>7}{:>11.4f}{:>11.4f}{:>11.4f}'.format(
+                name, stage_record['Calls'], stage_record['Total'], stage_record['Mean'],
+                stage_record['Max'])
+            line += ''.join('{:>11}'.format(stage_record.get(counter, '')) for counter in COUNTERS)
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def clear(self):
+        """Deletes all records."""
+        with self.lock:
+            self.stages.clear()
+            self.calls.clear()
+        return
+
+
+class Stage:
+    """The context manager measuring a single stage, its counters are set by count."""
+
+    def __init__(self, name):
+        self.name = name
+        self.counters = {}
+        return
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exception):
+        stage_profiler.record(self.name, perf_counter() - self.start, self.counters)
+        return False
+
+    def count(self, **counters):
+        """Sets the counters of the stage, e.g. count(Degrees=..., Nonzeros=...)."""
+        self.counters.update(counters)
+        return
+
+
+class DisabledStage:
+    """The context manager of all stages if profiling is switched off."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+    def count(self, **counters):
+        return
+
+
+DISABLED_STAGE = DisabledStage()
+
+
+def stage(name):
+    """Returns the context manager measuring a stage of the analysis.
+
+    Arguments:
+        name -- the name of the stage
+    """
+    if stage_profiler.active == 0:
+        return DISABLED_STAGE
+    return Stage(name)
+
+
+def count_call(name):
+    """Counts a call of an entry point of the package if profiling is switched on.
+
+    Arguments:
+        name -- the name of the entry point
+    """
+    if stage_profiler.active == 0:
+        return
+    stage_profiler.record_call(name, get_call_site())
+    return
+
+
+def get_call_site():
+    """Returns the file, line and function of the innermost caller outside of the package."""
+    frame = sys._getframe(1)
+    while frame is not None and os.path.abspath(frame.f_code.co_filename).startswith(PACKAGE_DIRECTORY + os.sep):
+        frame = frame.f_back
+    if frame is None:
+        return ''
+    return '{}:{} ({})'.format(os.path.basename(frame.f_code.co_filename), frame.f_lineno,
+                               frame.f_code.co_name)
+
+
+@contextmanager
+def profile_stages(clear=True):
+    """Switches the profiling of the analysis stages on within the context.
+
+    Keyword arguments:
+        clear -- if True, the records of former analyses are deleted
+
+    Return values:
+        profiler -- the stage profiler containing the records
+    """
+    if clear:
+        stage_profiler.clear()
+    with stage_profiler.lock:
+        stage_profiler.active += 1
+    try:
+        yield stage_profiler
+    finally:
+        with stage_profiler.lock:
+            stage_profiler.active -= 1
+    return
+
+
+# The profiler used by the stages of the package.
+stage_profiler = StageProfiler()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the quadratures used to integrate the functional loads.
+
+Two quadratures are available:
+    'Adaptive'       -- each integral is calculated separately by the adaptive
+                        scalar integration scipy.integrate.quad
+    'Gauss-Legendre' -- the integrals of all intervals (e.g. all elements of a
+                        beam) are calculated at once with a fixed order
+                        Gauss-Legendre quadrature. The load functions are
+                        therefore evaluated on arrays.
+
+The error of the Gauss-Legendre quadrature is controlled by comparing the
+results of two orders: the order is doubled until the results agree within
+the tolerance. Intervals which do not converge up to the maximal order (e.g.
+because of a kink or a jump of the load function) are split in halves. The
+halves are checked with the two highest orders, as low orders of an interval
+close to a jump may agree although none of their points lies beyond the jump.
+The quadrature is nevertheless meant for smooth load functions: a jump close to
+the end of an element can remain undetected. Load functions with jumps are
+better split into several functional loads at the jumps.
+"""
+
+import numpy as np
+
+QUADRATURES = ('Adaptive', 'Gauss-Legendre')
+
+# The Gauss-Legendre points and weights on the interval (-1, 1) of each order
+_GAUSS_LEGENDRE = {}
+
+
+def get_gauss_legendre(order):
+    """Returns the Gauss-Legendre points and weights of an order on the interval (-1, 1)."""
+    if order not in _GAUSS_LEGENDRE:
+        _GAUSS_LEGENDRE[order] = np.polynomial.legendre.leggauss(order)
+    return _GAUSS_LEGENDRE[order]
+
+
+def vectorize_function(function):
+    """Gives a function which evaluates a load function on an array.
+
+    Load functions written for scalars (e.g. containing an if statement) are
+    evaluated element by element, zero or None gives a function returning zeros.
+
+    Arguments:
+        function -- a load function of the distance from the beams start
+
+    Return values:
+        vectorized_function -- the function returning an array of the same
+                               shape as its argument
+    """
+    if function is None or (not callable(function) and function == 0):
+        return lambda x: np.zeros(np.shape(x))
+
+    def vectorized_function(x):
+        x = np.asarray(x, dtype=float)
+        try:
+            values = np.asarray(function(x), dtype=float)
+        except (TypeError, ValueError):
+            values = None
+        if values is None or values.shape not in (x.shape, ()):
+            values = np.vectorize(function, otypes=[float])(x)
+        return np.broadcast_to(values, x.shape)
+
+    return vectorized_function
+
+
+def gauss_legendre(integrand, lower, upper, tolerance=1e-10, order=4, max_order=32,
+                   max_depth=30):
+    """Integrates an integrand on many intervals with a Gauss-Legendre quadrature.
+
+    Arguments:
+        integrand -- a function integrand(x, index) giving the values of the
+                     integrands at the points x, an array (intervals, points),
+                     of the intervals index. It returns an array (integrands,
+                     intervals, points).
+        lower     -- an array of the lower bounds of the intervals
+        upper     -- an array of the upper bounds of the intervals
+
+    Keyword arguments:
+        tolerance -- the relative tolerance of the integrals
+        order     -- the initial order of the quadrature
+        max_order -- the maximal order before the intervals are split
+        max_depth -- the maximal amount of splits of an interval
+
+    Return values:
+        integrals -- an array (integrands, intervals) of the integrals
+    """
+    lower = np.asarray(lower, dtype=float).reshape(-1)
+    upper = np.asarray(upper, dtype=float).reshape(-1)
+    index = np.arange(len(lower))
+
+    integrals = integrate_intervals(integrand, lower, upper, index, order, max_order)
+    scale = np.max(np.abs(integrals[1]), axis=1, keepdims=True) if len(index) else 0
+    return refine_intervals(integrand, lower, upper, index, integrals, scale, tolerance,
+                            order, max_order, max_depth)
+
+
+def integrate_intervals(integrand, lower, upper, index, order, max_order):
+    """Integrates the intervals with two orders, the second being twice the first.
+
+    Return values:
+        integrals -- an array (2, integrands, intervals) of the integrals of
+                     both orders
+    """
+    integrals = [integrate_order(integrand, lower, upper, index, order),
+                 integrate_order(integrand, lower, upper, index, min(2 * order, max_order))]
+    return np.array(integrals)
+
+
+def integrate_order(integrand, lower, upper, index, order):
+    """Integrates the intervals with a single order.
+
+    Return values:
+        integrals -- an array (integrands, intervals) of the integrals
+    """
+    points, weights = get_gauss_legendre(order)
+    half_length = ((upper - lower) / 2)[:, np.newaxis]
+    x = ((lower + upper) / 2)[:, np.newaxis] + half_length * points
+    values = integrand(x, index)
+    integrals = np.sum(values * (half_length * weights), axis=-1)
+    return integrals
+
+
+def refine_intervals(integrand, lower, upper, index, integrals, scale, tolerance,
+                     order, max_order, max_depth):
+    """Raises the order or splits the intervals until the integrals converge.
+
+    Return values:
+        integrals -- an array (integrands, intervals) of the integrals
+    """
+    result = integrals[1]
+    error = np.abs(integrals[1] - integrals[0])
+    converged = np.all(error <= tolerance * np.maximum(np.abs(integrals[1]), scale), axis=0)
+    if np.all(converged) or max_depth == 0:
+        return result
+
+    todo = np.flatnonzero(~converged)
+    lower, upper, index = lower[todo], upper[todo], index[todo]
+
+    if 2 * order < max_order:
+        # Raise the order of the quadrature, the last result is the new lower order.
+        integrals = np.array([result[:, todo],
+                              integrate_order(integrand, lower, upper, index,
+                                              min(4 * order, max_order))])
+        result[:, todo] = refine_intervals(integrand, lower, upper, index, integrals, scale,
+                                           tolerance, 2 * order, max_order, max_depth)
+    else:
+        # Split the intervals in halves and compare the two highest orders.
+        middle = (lower + upper) / 2
+        lower_split = np.concatenate((lower, middle))
+        upper_split = np.concatenate((middle, upper))
+        index_split = np.concatenate((index, index))
+        split_order = max(max_order // 2, 1)
+        integrals = integrate_intervals(integrand, lower_split, upper_split, index_split,
+                                        split_order, max_order)
+        values = refine_intervals(integrand, lower_split, upper_split, index_split,
+                                  integrals, scale, tolerance, split_order, max_order,
+                                  max_depth - 1)
+        result[:, todo] = values[:, :len(todo)] + values[:, len(todo):]
+    return result
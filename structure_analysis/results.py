@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the containers of the beamwise results of an analysis.
+
+The displacements or the internal forces of all loadgroups are stored in one
+contiguous array (loadgroups, 3, stations), the stations of all beams are
+connected in the order of the beams. The offsets give the index of the first
+station of each beam, the values of a beam are therefore a view of the array
+and no copies are created.
+
+The results can still be used in the format of the former dictionaries: the
+results of a loadgroup return for each key a list with the values of each beam.
+The dictionaries with lists of floats are available by to_dictionaries.
+"""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+
+class BeamResults(Sequence):
+    """The beamwise results of all loadgroups, a sequence of LoadgroupResults.
+
+    Arguments:
+        values  -- an array (loadgroups, 3, stations) of the results of all
+                   beams at their stations
+        offsets -- an array (beams+1) of the indices of the first station of
+                   each beam, the last entry is the amount of stations
+        keys    -- the names of the three quantities
+    """
+
+    def __init__(self, values, offsets, keys):
+        self.values = values
+        self.offsets = np.asarray(offsets, dtype=int)
+        self.keys = list(keys)
+        return
+
+    def __len__(self):
+        return self.values.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('The loadgroup ' + str(index) + ' does not exist.')
+        return LoadgroupResults(self, index)
+
+    def array(self, key):
+        """Returns an array (loadgroups, stations) of a quantity of all beams."""
+        return self.values[:, self.keys.index(key), :]
+
+    def beam(self, key, beam_nr):
+        """Returns an array (loadgroups, stations) of a quantity of a single beam."""
+        start, end = self.offsets[beam_nr], self.offsets[beam_nr + 1]
+        return self.values[:, self.keys.index(key), start:end]
+
+    def to_dictionaries(self):
+        """Returns the list of the dictionaries of lists of each loadgroup."""
+        return [loadgroup_results.to_dictionary() for loadgroup_results in self]
+
+
+class LoadgroupResults(Mapping):
+    """The beamwise results of a single loadgroup, a mapping of the keys to the beams values.
+
+    Arguments:
+        results   -- the results of all loadgroups (see BeamResults)
+        loadgroup -- the number of the loadgroup
+    """
+
+    def __init__(self, results, loadgroup):
+        self.results = results
+        self.loadgroup = loadgroup
+        self.offsets = results.offsets
+        return
+
+    def __getitem__(self, key):
+        if key not in self.results.keys:
+            raise KeyError(key)
+        values = self.array(key)
+        return [values[start:end] for start, end in zip(self.offsets[:-1], self.offsets[1:])]
+
+    def __iter__(self):
+        return iter(self.results.keys)
+
+    def __len__(self):
+        return len(self.results.keys)
+
+    def array(self, key):
+        """Returns an array of a quantity at the stations of all beams."""
+        return self.results.values[self.loadgroup, self.results.keys.index(key), :]
+
+    def arrays(self):
+        """Returns a dictionary of the arrays of all quantities (see array)."""
+        return {key: self.array(key) for key in self}
+
+    def to_dictionary(self):
+        """Returns the dictionary containing for each key a list of the beams lists."""
+        values = self.results.values[self.loadgroup].tolist()
+        bounds = list(zip(self.offsets[:-1].tolist(), self.offsets[1:].tolist()))
+        dictionary = {key: [values[k][start:end] for start, end in bounds]
+                      for k, key in enumerate(self.results.keys)}
+        return dictionary
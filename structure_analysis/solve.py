@@ -11,13 +11,18 @@ including its main function solve.
 from copy import deepcopy
 
 import numpy as np
-import scipy.sparse.linalg as spsl
+import scipy.sparse as sps
 
+from .factorization import factorization_cache, solve_force_matrix
 
-def solve(stiffness_and_force_matrices, loads, boundary_conditions):
+
+def solve(stiffness_and_force_matrices, loads, boundary_conditions, factorization=None):
     """Solves the system and creates the displacement matrix and the support reactions list.
     
-    It solves the modified system in a first step. Then it calculates the 
+    It solves the modified system in a first step. The factorization of the
+    modified stiffness matrix is taken from the factorization cache, such that
+    repeated analyses of the same system only carry out the back-substitution.
+    The force matrices may be sparse. Then it calculates the 
     support reactions with the supports stiffness matrix. Afterwards it inserts
     the restricted degrees and their initial displacements into the displacement
     matrix.
@@ -36,6 +41,10 @@ def solve(stiffness_and_force_matrices, loads, boundary_conditions):
                                         model
         boundary_conditions          -- the boundary conditions of the system
         
+    Keyword arguments:
+        factorization -- the factorization of the modified stiffness matrix,
+                         if not given it is taken from the factorization cache
+        
     Return values:
         displacements     -- a list of dictionaries containing for each loadgroup
                              the displacements of all beams nodes
@@ -48,12 +57,13 @@ def solve(stiffness_and_force_matrices, loads, boundary_conditions):
     stiffness_matrix_supports = stiffness_and_force_matrices[1]
     force_matrix_modified = stiffness_and_force_matrices[2]
     force_matrix_supports = stiffness_and_force_matrices[3]
-    r = stiffness_and_force_matrices[4]
     rt = stiffness_and_force_matrices[5]
+    free_indices = stiffness_and_force_matrices[6]
 
-    # Solve the system.
-    # spsolve provides fast results but the accuracy can become a problem in large models
-    displacements_modified = spsl.spsolve(stiffness_matrix_modified, force_matrix_modified)
+    # Solve the system with the (cached) LU factorization of the stiffness matrix.
+    if factorization is None:
+        factorization = factorization_cache.get_factorization(stiffness_matrix_modified)
+    displacements_modified = solve_force_matrix(factorization, force_matrix_modified)
 
     # Raise an Exception if any of the values of the displacement matrix are nan.
     if (displacements_modified == np.nan).any():
@@ -67,16 +77,20 @@ def solve(stiffness_and_force_matrices, loads, boundary_conditions):
 
     # Calculate the support reactions including the assembled and omited support forces.
     support_reactions_matrix = stiffness_matrix_supports @ displacements_modified
+    if sps.issparse(force_matrix_supports):
+        force_matrix_supports = force_matrix_supports.toarray()
     support_reactions_matrix -= force_matrix_supports
 
     # Include the restricted degrees and the initial displacements.
+    size = free_indices.shape[0] + support_reactions_matrix.shape[0]
     displacements = insert_initial_displacements(displacements_modified, loads,
-                                                 restricted_degrees)
+                                                 free_indices, size)
 
     # get the spring reactions
     springs_reactions = get_spring_reactions(springs, displacements)
 
-    displacements = rt @ displacements
+    if rt is not None:
+        displacements = rt @ displacements
 
     # Create the support reactions list.
     support_reactions = get_support_reactions(support_reactions_matrix,
@@ -85,35 +99,24 @@ def solve(stiffness_and_force_matrices, loads, boundary_conditions):
     return displacements, support_reactions, springs_reactions
 
 
-def insert_initial_displacements(displacements_modified, loads, restricted_degrees):
+def insert_initial_displacements(displacements_modified, loads, free_indices, size):
     """Inserts the restricted degrees and initial displacements into the modified displacements.
     
     Arguments:
         displacements_modified -- the displacement matrix excluding the 
                                   restricted degrees
         loads                  -- a list containing the loadgroups of the model
-        restricted_degrees     -- the restricted degrees of the system
+        free_indices           -- a numpy vector of the unrestricted nodal 
+                                  degrees of freedom
+        size                   -- the amount of all nodal degrees of freedom
         
     Return values:
         displacements -- a list of dictionaries containing for each loadgroup 
                          the displacements of all beams nodes
     """
-
-    # Determine the sorted restricted nodes.
-    restricted_nodes = []
-    for restricted_degree in restricted_degrees:
-        for i in range(3):
-            if restricted_degree[i + 1] == 1:
-                restricted_nodes.append(restricted_degree[0] * 3 + i)
-    restricted_nodes.sort()
-
-    # Determine where rows are to be inserted .
-    rowstoinsert = deepcopy(restricted_nodes)
-    for i in range(len(restricted_nodes)):
-        rowstoinsert[i] -= i
-
-    # Insert zero on these rows.
-    displacements = np.insert(displacements_modified, rowstoinsert, 0, axis=0)
+    # Scatter the displacements on the unrestricted rows, the others are zero.
+    displacements = np.zeros((size, displacements_modified.shape[1]))
+    displacements[free_indices] = displacements_modified
 
     # Add the initial displacements.
     for loadgroup_nr, loadgroup in enumerate(loads, 0):
@@ -0,0 +1,688 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the functions to calculate the state (displacements and
+internal forces) of the beams at arbitrary stations, independently of the
+discretization of the system.
+
+The internal forces are calculated by equilibrium from the start of each beam:
+The internal forces at the beams start are taken from the first element and
+the influence of all member loads between the beams start and the station is
+added exactly.
+
+The displacements of a station are composed of the homogeneous solution of its
+element, interpolated from the nodal displacements by the shape functions, and
+the particular solution of the member loads on the element, which is the exact
+displacement of the element clamped at both ends. Hinged element ends are taken
+into account by the rotation of the element end, which follows from the
+condition that the moment at the hinge is zero. At a hinged end of a beam the
+rotation of the beam is therefore returned, whereas the discretized system
+returns the rotation of the node.
+
+For linearly distributed loads all integrals are polynomials which are
+integrated exactly by a three-point Gauss-Legendre quadrature. Functional loads
+are integrated using scipy.integrate.quad or the Gauss-Legendre quadrature with
+error control (see quadrature).
+
+The displacements are exact for infinite shear stiffness only.
+"""
+
+import numpy as np
+import scipy.integrate as integrate
+
+from .assembly.rotation_matrix import get_rotation_matrix
+from .assembly.shape_functions import *
+from .quadrature import gauss_legendre, vectorize_function
+from .results import BeamResults
+
+# The three-point Gauss-Legendre quadrature on the interval (-1, 1)
+GAUSS_POINTS, GAUSS_WEIGHTS = np.polynomial.legendre.leggauss(3)
+
+
+def calculate_state_stations(loads, stations, beams, discretization_information,
+                             internal_displacements_matrices, internal_forces_matrices,
+                             quadrature='Adaptive'):
+    """Calculates the displacements and the internal forces at the stations of each beam.
+
+    Arguments:
+        loads                           -- a list containing the loadgroups of
+                                           the model
+        stations                        -- a list containing for each beam an
+                                           array of the distances from the
+                                           beams start, at which the state is
+                                           to be calculated
+        beams                           -- a dictionary containing all the
+                                           model's information on the beams
+        discretization_information      -- the dictionary containing the
+                                           information of the discretized system
+        internal_displacements_matrices -- the array (6, elements, loadgroups)
+                                           storing the elementwise
+                                           displacements (left and right) of
+                                           each loadgroup
+        internal_forces_matrices        -- the array (6, elements, loadgroups)
+                                           storing the elementwise internal
+                                           forces (left and right) of each
+                                           loadgroup
+
+    Keyword arguments:
+        quadrature -- the quadrature of the functional loads, either 'Adaptive'
+                      or 'Gauss-Legendre' (see quadrature)
+
+    Return values:
+        displacements   -- the beamwise displacements of the stations of all
+                           loadgroups (see results)
+        internal_forces -- the beamwise internal forces of the stations of all
+                           loadgroups (see results)
+    """
+    grid = get_stations_grid(stations, beams, discretization_information)
+
+    #Get the local nodal displacements of the stations elements.
+    cos = grid['Cos'][:, np.newaxis]
+    sin = grid['Sin'][:, np.newaxis]
+    nodal = internal_displacements_matrices[:, grid['Elements'], :]
+    nodal_local = np.array([ cos*nodal[0] + sin*nodal[1],
+                            -sin*nodal[0] + cos*nodal[1],
+                             nodal[2],
+                             cos*nodal[3] + sin*nodal[4],
+                            -sin*nodal[3] + cos*nodal[4],
+                             nodal[5]])
+
+    #The internal forces at the start of the beams.
+    first_elements = grid['First Elements'][grid['Beams']]
+    forces = internal_forces_matrices[0:3, first_elements, :].copy()
+    forces[2] += forces[1] * grid['Distances'][:, np.newaxis]
+
+    #Add the influence of the member loads.
+    amount_of_loadgroups = internal_forces_matrices.shape[2]
+    particular = np.zeros((3, len(grid['Beams']), amount_of_loadgroups))
+    curvatures = np.zeros((2, len(grid['Beams']), amount_of_loadgroups))
+
+    point_loads, distributed_loads, functional_loads = get_member_loads(loads, grid)
+    add_point_loads(grid, point_loads, forces, particular, curvatures)
+    add_distributed_loads(grid, distributed_loads, forces, particular, curvatures)
+    add_functional_loads(grid, functional_loads, forces, particular, curvatures,
+                         quadrature=quadrature)
+
+    #Get the rotations of the element ends with hinges.
+    include_hinges(grid, nodal_local, curvatures)
+
+    #Calculate the local displacements and rotate them into global coordinates.
+    x = grid['Positions'][:, np.newaxis]
+    l = grid['Lengths'][:, np.newaxis]
+    dx  = nodal_local[0]*n1(x, l) + nodal_local[3]*n2(x, l) + particular[0]
+    dy  = (nodal_local[1]*n3(x, l) + nodal_local[2]*n4(x, l)
+           + nodal_local[4]*n5(x, l) + nodal_local[5]*n6(x, l) + particular[1])
+    drz = (nodal_local[1]*n31(x, l) + nodal_local[2]*n41(x, l)
+           + nodal_local[4]*n51(x, l) + nodal_local[5]*n61(x, l) + particular[2])
+    displacements = np.array([cos*dx - sin*dy, sin*dx + cos*dy, drz])
+
+    keys_id = ['Displacement X', 'Displacement Y', 'Rotation Z']
+    keys_if = ['Normal Force', 'Shear Force', 'Moment']
+    displacements_results   = BeamResults(np.ascontiguousarray(displacements.transpose((2, 0, 1))),
+                                          grid['Offsets'], keys_id)
+    internal_forces_results = BeamResults(np.ascontiguousarray(forces.transpose((2, 0, 1))),
+                                          grid['Offsets'], keys_if)
+
+    return displacements_results, internal_forces_results
+
+
+def get_stations_grid(stations, beams, discretization_information):
+    """Locates all stations on the elements of their beams.
+
+    Arguments:
+        stations                   -- a list containing for each beam an array
+                                      of the distances from the beams start
+        beams                      -- a dictionary containing all the model's
+                                      information on the beams
+        discretization_information -- the dictionary containing the information
+                                      of the discretized system
+
+    Return values:
+        grid -- a dictionary of arrays with one entry per station: its beam,
+                element, distance from the beams start, position on the
+                element, element length and start, the orientation and the
+                stiffnesses. Further the offsets of each beams stations, the
+                first element and the orientation (cosine and sine) of each
+                beam.
+    """
+    beams_information = discretization_information['Beams Information']
+    elements_lists    = discretization_information['Elements']
+
+    if len(stations) != len(beams_information):
+        raise Exception('The stations have to be specified for each beam.')
+
+    stations = [np.asarray(stations_beam, dtype=float).reshape(-1) for stations_beam in stations]
+    amounts  = np.array([len(stations_beam) for stations_beam in stations], dtype=int)
+    offsets  = np.concatenate(([0], np.cumsum(amounts)))
+
+    information = np.array([beam_information for beam_information in beams_information],
+                           dtype=float).reshape((-1, 4))
+    orientations = np.array([get_rotation_matrix(theta)[0:2, 0] for theta in information[:, 1]],
+                            dtype=float).reshape((-1, 2))
+    stiffnesses = np.array([[float(stiffness[0]), float(stiffness[1])]
+                            for stiffness in beams['Stiffness']]).reshape((-1, 2))
+    first_elements = np.array([elements_list[0] for elements_list in elements_lists], dtype=int)
+
+    beams_nrs = np.repeat(np.arange(len(stations)), amounts)
+    distances = np.concatenate(stations) if stations else np.zeros(0)
+    if np.any(distances < 0) or np.any(distances > information[beams_nrs, 0] * 1.0001):
+        raise Exception('A station is invalid because it is not located on its beam.')
+
+    #Find the element of each station, stations on a node belong to the left element.
+    lengths   = information[beams_nrs, 3]
+    j_element = np.ceil(distances / lengths).astype(int) - 1
+    j_element = np.clip(j_element, 0, information[beams_nrs, 2].astype(int) - 1)
+    starts    = j_element * lengths
+    positions = np.clip(distances - starts, 0, lengths)
+
+    grid = {'Beams'          : beams_nrs,
+            'Elements'       : first_elements[beams_nrs] + j_element,
+            'Distances'      : distances,
+            'Positions'      : positions,
+            'Lengths'        : lengths,
+            'Starts'         : starts,
+            'Cos'            : orientations[beams_nrs, 0],
+            'Sin'            : orientations[beams_nrs, 1],
+            'EA'             : stiffnesses[beams_nrs, 0],
+            'EI'             : stiffnesses[beams_nrs, 1],
+            'Offsets'        : offsets,
+            'First Elements' : first_elements,
+            'Orientations'   : orientations,
+            'Releases'       : discretization_information['Releases']['Elements']}
+
+    return grid
+
+
+def get_member_loads(loads, grid):
+    """Gathers the member loads of all loadgroups into arrays in local coordinates.
+
+    Arguments:
+        loads -- a list containing the loadgroups of the model
+        grid  -- the dictionary describing the stations (see get_stations_grid)
+
+    Return values:
+        point_loads       -- an array with a row per point load: loadgroup,
+                             beam, position and the local forces
+        distributed_loads -- an array with a row per distributed load:
+                             loadgroup, beam, start, end and the local values
+                             at the start and the end
+        functional_loads  -- a list containing for each functional load its
+                             loadgroup and the load
+    """
+    point_loads       = []
+    distributed_loads = []
+    functional_loads  = []
+
+    orientations = grid['Orientations']
+    for loadgroup_nr, loadgroup in enumerate(loads, 0):
+
+        if 'Point' in loadgroup and loadgroup['Point']:
+            for point_load in loadgroup['Point']:
+                cos, sin = orientations[point_load[0]]
+                fx, fy, mz = point_load[2:5]
+                point_loads.append([loadgroup_nr, point_load[0], point_load[1],
+                                    cos*fx + sin*fy, -sin*fx + cos*fy, mz])
+
+        if 'Distributed' in loadgroup and loadgroup['Distributed']:
+            for distributed_load in loadgroup['Distributed']:
+                cos, sin = orientations[distributed_load[0]]
+                qx1, qy1, mz1, qx2, qy2, mz2 = distributed_load[3:9]
+                distributed_loads.append([loadgroup_nr, distributed_load[0],
+                                          distributed_load[1], distributed_load[2],
+                                          cos*qx1 + sin*qy1, -sin*qx1 + cos*qy1, mz1,
+                                          cos*qx2 + sin*qy2, -sin*qx2 + cos*qy2, mz2])
+
+        if 'Functions' in loadgroup and loadgroup['Functions']:
+            for load_function in loadgroup['Functions']:
+                functional_loads.append([loadgroup_nr, load_function])
+
+    point_loads       = np.array(point_loads, dtype=float).reshape((-1, 6))
+    distributed_loads = np.array(distributed_loads, dtype=float).reshape((-1, 10))
+
+    return point_loads, distributed_loads, functional_loads
+
+
+def get_load_station_pairs(load_beams, offsets):
+    """Combines each load with all stations of its beam.
+
+    Arguments:
+        load_beams -- an array of the beam number of each load
+        offsets    -- the offsets of the stations of each beam
+
+    Return values:
+        load_index    -- the index of the load of each pair
+        station_index -- the index of the station of each pair
+    """
+    load_beams = load_beams.astype(int)
+    counts     = offsets[load_beams + 1] - offsets[load_beams]
+    load_index = np.repeat(np.arange(len(load_beams)), counts)
+    shifts     = np.repeat(np.cumsum(counts) - counts, counts)
+    station_index = np.repeat(offsets[load_beams], counts) + np.arange(counts.sum()) - shifts
+
+    return load_index, station_index
+
+
+def add_point_loads(grid, point_loads, forces, particular, curvatures):
+    """Adds the influence of the point loads on the internal forces and displacements.
+
+    As for the points of interest, a point load located exactly at a station
+    is not included, such that the internal forces left of the load are
+    obtained.
+
+    Arguments:
+        grid        -- the dictionary describing the stations (see
+                       get_stations_grid)
+        point_loads -- the array of the point loads (see get_member_loads)
+        forces      -- the array (3, stations, loadgroups) of the internal
+                       forces, which is updated
+        particular  -- the array (3, stations, loadgroups) of the particular
+                       displacements, which is updated
+        curvatures  -- the array (2, stations, loadgroups) of the particular
+                       curvatures at the element ends, which is updated
+    """
+    load_index, station = get_load_station_pairs(point_loads[:, 1], grid['Offsets'])
+    if not len(station):
+        return
+    loadgroup = point_loads[load_index, 0].astype(int)
+    position  = point_loads[load_index, 2]
+    fx, fy, mz = point_loads[load_index, 3:6].transpose()
+
+    #Equilibrium from the beams start.
+    s = grid['Distances'][station]
+    weight = (position < s).astype(float)
+    np.add.at(forces[0], (station, loadgroup), -weight * fx)
+    np.add.at(forces[1], (station, loadgroup),  weight * fy)
+    np.add.at(forces[2], (station, loadgroup),  weight * (fy * (s - position) - mz))
+
+    #The displacements of the clamped element.
+    start  = grid['Starts'][station]
+    length = grid['Lengths'][station]
+    on_element = (position >= start) & (position <= start + length)
+    a = np.clip(position - start, 0, length)
+    functions = get_clamped_functions(grid['Positions'][station], a, length)
+    ea = grid['EA'][station]
+    ei = grid['EI'][station]
+    fx = fx * on_element
+    fy = fy * on_element
+    mz = mz * on_element
+    np.add.at(particular[0], (station, loadgroup), fx * functions['Axial'] / ea)
+    np.add.at(particular[1], (station, loadgroup),
+              (fy * functions['Deflection'] + mz * functions['Deflection Moment']) / ei)
+    np.add.at(particular[2], (station, loadgroup),
+              (fy * functions['Rotation'] + mz * functions['Rotation Moment']) / ei)
+    np.add.at(curvatures[0], (station, loadgroup),
+              (fy * functions['Curvature Start'] + mz * functions['Curvature Start Moment']) / ei)
+    np.add.at(curvatures[1], (station, loadgroup),
+              (fy * functions['Curvature End'] + mz * functions['Curvature End Moment']) / ei)
+
+    return
+
+
+def add_distributed_loads(grid, distributed_loads, forces, particular, curvatures):
+    """Adds the influence of the distributed loads on the internal forces and displacements.
+
+    Arguments:
+        grid              -- the dictionary describing the stations (see
+                             get_stations_grid)
+        distributed_loads -- the array of the distributed loads (see
+                             get_member_loads)
+        forces            -- the array (3, stations, loadgroups) of the
+                             internal forces, which is updated
+        particular        -- the array (3, stations, loadgroups) of the
+                             particular displacements, which is updated
+        curvatures        -- the array (2, stations, loadgroups) of the
+                             particular curvatures at the element ends, which
+                             is updated
+    """
+    load_index, station = get_load_station_pairs(distributed_loads[:, 1], grid['Offsets'])
+    if not len(station):
+        return
+    loads     = distributed_loads[load_index]
+    loadgroup = loads[:, 0].astype(int)
+    x_start   = loads[:, 2:3]
+    x_end     = loads[:, 3:4]
+
+    def load_values(x):
+        ratio = (x - x_start) / np.where(x_end > x_start, x_end - x_start, 1)
+        return [loads[:, 4+i:5+i] + (loads[:, 7+i:8+i] - loads[:, 4+i:5+i]) * ratio
+                for i in range(3)]
+
+    #Equilibrium from the beams start.
+    s = grid['Distances'][station][:, np.newaxis]
+    x, w = gauss_points(x_start, np.clip(s, x_start, x_end))
+    qx, qy, mz = load_values(x)
+    np.add.at(forces[0], (station, loadgroup), -np.sum(w * qx, axis=1))
+    np.add.at(forces[1], (station, loadgroup),  np.sum(w * qy, axis=1))
+    np.add.at(forces[2], (station, loadgroup),  np.sum(w * (qy * (s - x) - mz), axis=1))
+
+    #The displacements of the clamped element, integrated on both sides of the station.
+    start  = grid['Starts'][station][:, np.newaxis]
+    length = grid['Lengths'][station][:, np.newaxis]
+    lower  = np.clip(x_start, start, start + length)
+    upper  = np.clip(x_end, start, start + length)
+    middle = np.clip(s, lower, upper)
+    x_left, w_left   = gauss_points(lower, middle)
+    x_right, w_right = gauss_points(middle, upper)
+    x = np.hstack((x_left, x_right))
+    w = np.hstack((w_left, w_right))
+    qx, qy, mz = load_values(x)
+
+    functions = get_clamped_functions(grid['Positions'][station][:, np.newaxis], x - start, length)
+    ea = grid['EA'][station]
+    ei = grid['EI'][station]
+    np.add.at(particular[0], (station, loadgroup),
+              np.sum(w * qx * functions['Axial'], axis=1) / ea)
+    np.add.at(particular[1], (station, loadgroup),
+              np.sum(w * (qy * functions['Deflection'] + mz * functions['Deflection Moment']),
+                     axis=1) / ei)
+    np.add.at(particular[2], (station, loadgroup),
+              np.sum(w * (qy * functions['Rotation'] + mz * functions['Rotation Moment']),
+                     axis=1) / ei)
+    np.add.at(curvatures[0], (station, loadgroup),
+              np.sum(w * (qy * functions['Curvature Start']
+                          + mz * functions['Curvature Start Moment']), axis=1) / ei)
+    np.add.at(curvatures[1], (station, loadgroup),
+              np.sum(w * (qy * functions['Curvature End']
+                          + mz * functions['Curvature End Moment']), axis=1) / ei)
+
+    return
+
+
+def add_functional_loads(grid, functional_loads, forces, particular, curvatures,
+                         quadrature='Adaptive'):
+    """Adds the influence of the functional loads on the internal forces and displacements.
+
+    The load functions are integrated station by station using
+    scipy.integrate.quad or, with the 'Gauss-Legendre' quadrature, for all
+    stations of a beam at once (see add_functional_load_gauss).
+
+    Arguments:
+        grid             -- the dictionary describing the stations (see
+                            get_stations_grid)
+        functional_loads -- the list of the functional loads (see
+                            get_member_loads)
+        forces           -- the array (3, stations, loadgroups) of the internal
+                            forces, which is updated
+        particular       -- the array (3, stations, loadgroups) of the
+                            particular displacements, which is updated
+        curvatures       -- the array (2, stations, loadgroups) of the
+                            particular curvatures at the element ends, which
+                            is updated
+
+    Keyword arguments:
+        quadrature -- the quadrature of the load functions, either 'Adaptive'
+                      or 'Gauss-Legendre' (see quadrature)
+    """
+    def quad(function, lower, upper):
+        if upper <= lower:
+            return 0
+        return integrate.quad(function, lower, upper)[0]
+
+    for loadgroup, load_function in functional_loads:
+        beam_nr = load_function[0]
+        x_start = load_function[1]
+        x_end   = load_function[2]
+
+        if quadrature == 'Gauss-Legendre':
+            add_functional_load_gauss(grid, loadgroup, load_function, forces,
+                                      particular, curvatures)
+            continue
+
+        cos, sin = grid['Orientations'][beam_nr]
+        qx, qy, mz = get_local_functions(load_function, cos, sin)
+
+        for station in range(grid['Offsets'][beam_nr], grid['Offsets'][beam_nr + 1]):
+
+            #Equilibrium from the beams start.
+            s = grid['Distances'][station]
+            upper = min(s, x_end)
+            forces[0, station, loadgroup] -= quad(qx, x_start, upper)
+            forces[1, station, loadgroup] += quad(qy, x_start, upper)
+            forces[2, station, loadgroup] += quad(lambda x: qy(x) * (s - x) - mz(x),
+                                                  x_start, upper)
+
+            #The displacements of the clamped element.
+            start    = grid['Starts'][station]
+            length   = grid['Lengths'][station]
+            position = grid['Positions'][station]
+            lower    = min(max(x_start, start), start + length)
+            upper    = min(max(x_end, start), start + length)
+            middle   = min(max(s, lower), upper)
+
+            def integrand(x, key, key_moment, load):
+                functions = get_clamped_functions(position, x - start, length)
+                value = load(x) * functions[key]
+                if key_moment:
+                    value += mz(x) * functions[key_moment]
+                return value
+
+            values = []
+            for key, key_moment, load in [('Axial', None, qx),
+                                          ('Deflection', 'Deflection Moment', qy),
+                                          ('Rotation', 'Rotation Moment', qy),
+                                          ('Curvature Start', 'Curvature Start Moment', qy),
+                                          ('Curvature End', 'Curvature End Moment', qy)]:
+                args = (key, key_moment, load)
+                values.append(quad(lambda x: integrand(x, *args), lower, middle)
+                              + quad(lambda x: integrand(x, *args), middle, upper))
+
+            particular[0, station, loadgroup] += values[0] / grid['EA'][station]
+            particular[1, station, loadgroup] += values[1] / grid['EI'][station]
+            particular[2, station, loadgroup] += values[2] / grid['EI'][station]
+            curvatures[0, station, loadgroup] += values[3] / grid['EI'][station]
+            curvatures[1, station, loadgroup] += values[4] / grid['EI'][station]
+
+    return
+
+
+def add_functional_load_gauss(grid, loadgroup, load_function, forces, particular,
+                              curvatures):
+    """Adds the influence of a functional load on all stations of its beam at once.
+
+    The integrals are calculated with the Gauss-Legendre quadrature, the load
+    functions are evaluated on arrays. (see quadrature)
+
+    Arguments:
+        grid          -- the dictionary describing the stations (see
+                         get_stations_grid)
+        loadgroup     -- the number of the loadgroup of the load
+        load_function -- a single functional load
+        forces        -- the array (3, stations, loadgroups) of the internal
+                         forces, which is updated
+        particular    -- the array (3, stations, loadgroups) of the particular
+                         displacements, which is updated
+        curvatures    -- the array (2, stations, loadgroups) of the particular
+                         curvatures at the element ends, which is updated
+    """
+    beam_nr = load_function[0]
+    x_start = load_function[1]
+    x_end   = load_function[2]
+    stations = np.arange(grid['Offsets'][beam_nr], grid['Offsets'][beam_nr + 1])
+    if not len(stations):
+        return
+
+    cos, sin = grid['Orientations'][beam_nr]
+    vectorized_load = list(load_function[0:3]) + [vectorize_function(function)
+                                                  for function in load_function[3:6]]
+    qx, qy, mz = get_local_functions(vectorized_load, cos, sin)
+
+    #Equilibrium from the beams start.
+    s = grid['Distances'][stations]
+    upper = np.maximum(np.minimum(s, x_end), x_start)
+
+    def integrand_forces(x, index):
+        qy_x = qy(x)
+        return np.array([qx(x), qy_x, qy_x * (s[index, np.newaxis] - x) - mz(x)])
+
+    values = gauss_legendre(integrand_forces, np.full(len(stations), x_start), upper)
+    forces[0, stations, loadgroup] -= values[0]
+    forces[1, stations, loadgroup] += values[1]
+    forces[2, stations, loadgroup] += values[2]
+
+    #The displacements of the clamped element, integrated on both sides of the station.
+    start    = grid['Starts'][stations]
+    length   = grid['Lengths'][stations]
+    position = grid['Positions'][stations]
+    lower    = np.clip(x_start, start, start + length)
+    upper    = np.clip(x_end, start, start + length)
+    middle   = np.clip(s, lower, upper)
+
+    def integrand_displacements(x, index):
+        functions = get_clamped_functions(position[index, np.newaxis],
+                                          x - start[index, np.newaxis],
+                                          length[index, np.newaxis])
+        qx_x, qy_x, mz_x = qx(x), qy(x), mz(x)
+        return np.array([qx_x * functions['Axial'],
+                         qy_x * functions['Deflection'] + mz_x * functions['Deflection Moment'],
+                         qy_x * functions['Rotation'] + mz_x * functions['Rotation Moment'],
+                         qy_x * functions['Curvature Start']
+                         + mz_x * functions['Curvature Start Moment'],
+                         qy_x * functions['Curvature End']
+                         + mz_x * functions['Curvature End Moment']])
+
+    amount = len(stations)
+    index  = np.concatenate((np.arange(amount), np.arange(amount)))
+    values = gauss_legendre(lambda x, i: integrand_displacements(x, index[i]),
+                            np.concatenate((lower, middle)), np.concatenate((middle, upper)))
+    values = values[:, :amount] + values[:, amount:]
+
+    particular[0, stations, loadgroup] += values[0] / grid['EA'][stations]
+    particular[1, stations, loadgroup] += values[1] / grid['EI'][stations]
+    particular[2, stations, loadgroup] += values[2] / grid['EI'][stations]
+    curvatures[0, stations, loadgroup] += values[3] / grid['EI'][stations]
+    curvatures[1, stations, loadgroup] += values[4] / grid['EI'][stations]
+
+    return
+
+
+def get_local_functions(load_function, cos, sin):
+    """Gives the local components of a functional load as functions.
+
+    Arguments:
+        load_function -- a single functional load
+        cos           -- the cosine of the beams orientation
+        sin           -- the sine of the beams orientation
+
+    Return values:
+        qx -- the function of the local normal load
+        qy -- the function of the local transverse load
+        mz -- the function of the distributed moment
+    """
+    def component(i):
+        function = load_function[3+i]
+        if function == 0 or function is None:
+            return lambda x: 0
+        return function
+
+    fx, fy, mz = component(0), component(1), component(2)
+
+    def qx(x):
+        return cos*fx(x) + sin*fy(x)
+
+    def qy(x):
+        return -sin*fx(x) + cos*fy(x)
+
+    return qx, qy, mz
+
+
+def gauss_points(lower, upper):
+    """Gives the Gauss-Legendre points and weights of the intervals (lower, upper).
+
+    Arguments:
+        lower -- an array (intervals, 1) of the lower bounds
+        upper -- an array (intervals, 1) of the upper bounds
+
+    Return values:
+        points  -- an array (intervals, 3) of the integration points
+        weights -- an array (intervals, 3) of the integration weights
+    """
+    half_length = (upper - lower) / 2
+    points  = (lower + upper) / 2 + half_length * GAUSS_POINTS
+    weights = half_length * GAUSS_WEIGHTS
+
+    return points, weights
+
+
+def get_clamped_functions(x, a, length):
+    """Gives the displacements of an element clamped at both ends due to unit loads.
+
+    The functions are given for unit stiffnesses and a unit force (or moment)
+    at the position a. They are the influence functions of the particular
+    solution of the element.
+
+    Arguments:
+        x      -- the position on the element, where the displacements are
+                  evaluated
+        a      -- the position of the unit load on the element
+        length -- the length of the element
+
+    Return values:
+        functions -- a dictionary with the axial displacement of a normal
+                     force, the deflection and rotation of a transverse force
+                     or a moment (ending with 'Moment') and the curvatures at
+                     the start and the end of the element
+    """
+    l = length
+
+    #The functions left of the load are mirrored to the right of the load.
+    left = x <= a
+    s    = np.where(left, x, l - x)
+    c    = np.where(left, a, l - a)
+    b    = l - c
+    sign = np.where(left, 1, -1)
+
+    functions = {
+        'Axial'                  : np.where(left, (l - a) * x, a * (l - x)) / l,
+        'Deflection'             : b**2 * s**2 * (3*c*l - (2*c + l)*s) / (6*l**3),
+        'Rotation'               : sign * b**2 * s * (2*c*l - (2*c + l)*s) / (2*l**3),
+        'Deflection Moment'      : sign * s**2 * (b**2 * (3*l - 2*s)
+                                                  - 2*b * (3*c*l - (2*c + l)*s)) / (6*l**3),
+        'Rotation Moment'        : s * (b**2 * (2*l - 2*s)
+                                        - 2*b * (2*c*l - (2*c + l)*s)) / (2*l**3),
+        'Curvature Start'        : (l - a)**2 * a / l**2,
+        'Curvature Start Moment' : ((l - a)**2 - 2*a*(l - a)) / l**2,
+        'Curvature End'          : a**2 * (l - a) / l**2,
+        'Curvature End Moment'   : (2*a*(l - a) - a**2) / l**2}
+
+    return functions
+
+
+def include_hinges(grid, nodal_local, curvatures):
+    """Replaces the nodal rotations of hinged element ends by the rotations of the element.
+
+    The rotation of a hinged element end follows from the condition, that the
+    curvature (the moment) of the element at the hinge is zero.
+
+    Arguments:
+        grid        -- the dictionary describing the stations (see
+                       get_stations_grid)
+        nodal_local -- the array (6, stations, loadgroups) of the local nodal
+                       displacements of the stations elements, which is updated
+        curvatures  -- the array (2, stations, loadgroups) of the particular
+                       curvatures at the element ends
+    """
+    releases = grid['Releases']
+    if not releases:
+        return
+    release = np.array([releases.get(element, [0, 0]) for element in grid['Elements']],
+                       dtype=int).reshape((-1, 2))
+
+    l  = grid['Lengths'][:, np.newaxis]
+    dv = nodal_local[4] - nodal_local[1]
+    curvature_start = curvatures[0]
+    curvature_end   = curvatures[1]
+
+    both  = (release[:, 0] == 1) & (release[:, 1] == 1)
+    start = (release[:, 0] == 1) & ~both
+    end   = (release[:, 1] == 1) & ~both
+
+    r_start = -curvature_start[both] - 6*dv[both]/l[both]**2
+    r_end   = -curvature_end[both] + 6*dv[both]/l[both]**2
+    nodal_local[2, both] = -(2*r_start + r_end) * l[both] / 6
+    nodal_local[5, both] =  (2*r_end + r_start) * l[both] / 6
+
+    nodal_local[2, start] = (6*dv[start]/l[start] - 2*nodal_local[5, start]
+                             + curvature_start[start]*l[start]) / 4
+    nodal_local[5, end]   = (6*dv[end]/l[end] - 2*nodal_local[2, end]
+                             - curvature_end[end]*l[end]) / 4
+
+    return
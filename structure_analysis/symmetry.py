@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the decomposition of mirror symmetric structures.
+
+A structure is mirror symmetric about a vertical plane x = x_m if each node has
+a mirrored node (x -> 2 x_m - x) and the stiffness matrix is invariant under
+the mirror operation S, which maps the displacements (u_x, u_y, phi) of a node
+onto (-u_x, u_y, -phi) of its mirrored node. The displacements are then split
+into a symmetric and an antisymmetric part
+
+    u = Q_s u_s + Q_a u_a        K_s = Q_s^T K Q_s        K_a = Q_a^T K Q_a
+
+where the orthonormal bases Q_s and Q_a combine each pair of mirrored degrees
+of freedom. At the nodes on the mirror plane (e.g. the crown of an arch) the
+symmetric part has no horizontal displacement and rotation, the antisymmetric
+part no vertical displacement. The coupling Q_s^T K Q_a vanishes, such that
+both half-size systems are factorized and solved separately: the loads are
+split into Q_s^T f and Q_a^T f and the displacements are recombined.
+
+The boundary conditions of a bridge are usually not symmetric (e.g. a fixed
+and a sliding bearing). The few free degrees of freedom e whose mirrored degree
+is restricted are therefore eliminated exactly by their Schur complement
+
+    (K_ee - K_es X) u_e = f_e - K_es y        with X = K_ss^-1 K_se, y = K_ss^-1 f_s
+
+where K_ss is solved by the symmetric decomposition.
+"""
+
+import numpy as np
+import scipy.linalg as sl
+import scipy.sparse as sps
+from scipy.spatial import cKDTree
+
+from .factorization import factorization_cache
+
+# The signs of the mirrored displacements u_x, u_y and phi
+MIRROR_SIGNS = np.array([-1, 1, -1])
+
+
+class MirrorFactorization:
+    """The factorization of a mirror symmetric stiffness matrix by two half-size systems.
+
+    It has the same method solve as the factorizations of the factorization
+    module, such that it can replace them.
+
+    Arguments:
+        stiffness_matrix -- the modified (regular) stiffness matrix
+        mirror_degrees   -- an array of the mirrored degree of each degree of
+                            freedom of the modified stiffness matrix, -1 if
+                            the mirrored degree is restricted
+        mirror_signs     -- an array of the signs of the mirrored displacements
+
+    Keyword arguments:
+        solver -- the method of factorizing the two half-size systems (see
+                  factorization)
+    """
+
+    def __init__(self, stiffness_matrix, mirror_degrees, mirror_signs, solver='Sparse'):
+        stiffness_matrix = sps.csr_matrix(stiffness_matrix)
+        size = stiffness_matrix.shape[0]
+        degrees = np.arange(size)
+
+        # Each pair of mirrored degrees (or degree on the mirror plane) once.
+        first = (mirror_degrees >= 0) & (degrees <= mirror_degrees)
+        degree, mirrored, sign = degrees[first], mirror_degrees[first], mirror_signs[first]
+        self.q_symmetric = get_mirror_basis(degree, mirrored, sign, 1, size)
+        self.q_antisymmetric = get_mirror_basis(degree, mirrored, sign, -1, size)
+
+        # Factorize the symmetric and the antisymmetric half-size systems.
+        stiffness_symmetric = self.q_symmetric.T @ stiffness_matrix @ self.q_symmetric
+        stiffness_antisymmetric = self.q_antisymmetric.T @ stiffness_matrix @ self.q_antisymmetric
+        self.factorization_symmetric = factorization_cache.get_factorization(
+            sps.csc_matrix(stiffness_symmetric), solver=solver)
+        self.factorization_antisymmetric = factorization_cache.get_factorization(
+            sps.csc_matrix(stiffness_antisymmetric), solver=solver)
+
+        # The Schur complement of the degrees whose mirrored degree is restricted.
+        self.extra_degrees = np.flatnonzero(mirror_degrees < 0)
+        self.schur_complement = None
+        if len(self.extra_degrees):
+            self.coupling = stiffness_matrix[self.extra_degrees]
+            coupling_columns = stiffness_matrix[:, self.extra_degrees].toarray()
+            self.x_matrix = self.solve_symmetric(coupling_columns)
+            schur_complement = (coupling_columns[self.extra_degrees]
+                                - self.coupling @ self.x_matrix)
+            self.schur_complement = sl.lu_factor(schur_complement)
+        return
+
+    def solve_symmetric(self, force_matrix):
+        """Solves the degrees with a free mirrored degree by the two half-size systems.
+
+        The rows of the other degrees are ignored, their displacements are zero.
+        """
+        displacements = self.q_symmetric @ self.factorization_symmetric.solve(
+            self.q_symmetric.T @ force_matrix)
+        displacements += self.q_antisymmetric @ self.factorization_antisymmetric.solve(
+            self.q_antisymmetric.T @ force_matrix)
+        return displacements
+
+    def solve(self, force_matrix):
+        """Returns the displacements of a force vector or matrix."""
+        force_matrix = np.asarray(force_matrix, dtype=float)
+        displacements = self.solve_symmetric(force_matrix)
+        if self.schur_complement is None:
+            return displacements
+
+        displacements_extra = sl.lu_solve(self.schur_complement,
+                                          force_matrix[self.extra_degrees]
+                                          - self.coupling @ displacements)
+        displacements -= self.x_matrix @ displacements_extra
+        displacements[self.extra_degrees] = displacements_extra
+        return displacements
+
+
+def get_mirror_basis(degree, mirrored, sign, part, size):
+    """Creates the orthonormal basis of the symmetric or the antisymmetric displacements.
+
+    Arguments:
+        degree   -- an array of the first degree of each pair
+        mirrored -- an array of the mirrored degree of each pair (equal to the
+                    first degree on the mirror plane)
+        sign     -- an array of the signs of the mirrored displacements
+        part     -- 1 for the symmetric, -1 for the antisymmetric basis
+        size     -- the amount of degrees of freedom
+
+    Return values:
+        basis -- a sparse matrix (size, degrees of the part) of the basis
+    """
+    # On the mirror plane only the degrees with the sign of the part remain.
+    on_plane = degree == mirrored
+    pairs = ~on_plane
+    single = on_plane & (sign == part)
+
+    n_pairs = np.count_nonzero(pairs)
+    n_single = np.count_nonzero(single)
+    columns_pairs = np.arange(n_pairs)
+    columns_single = n_pairs + np.arange(n_single)
+
+    rows = np.concatenate((degree[pairs], mirrored[pairs], degree[single]))
+    cols = np.concatenate((columns_pairs, columns_pairs, columns_single))
+    data = np.concatenate((np.full(n_pairs, np.sqrt(0.5)),
+                           part * sign[pairs] * np.sqrt(0.5),
+                           np.ones(n_single)))
+    basis = sps.csr_matrix((data, (rows, cols)), shape=(size, n_pairs + n_single))
+    return basis
+
+
+def get_nodes_coordinates(nodes_location, beams_nodes, nodes_lists):
+    """Calculates the coordinates of all nodes of the discretized system.
+
+    Arguments:
+        nodes_location -- the list of the original nodes position
+        beams_nodes    -- the list of the beams starting and ending nodes
+        nodes_lists    -- a list containing for each beam an ordered list of
+                          the node numbers along the beam
+
+    Return values:
+        coordinates -- an array (nodes, 2) of the coordinates of the nodes
+    """
+    nodes_location = np.asarray(nodes_location, dtype=float)
+    number_of_nodes = max(max(nodes_list) for nodes_list in nodes_lists) + 1
+    coordinates = np.zeros((number_of_nodes, 2))
+    coordinates[:len(nodes_location)] = nodes_location
+    for beam_nodes, nodes_list in zip(beams_nodes, nodes_lists):
+        start, end = nodes_location[beam_nodes[0]], nodes_location[beam_nodes[1]]
+        ratio = np.linspace(0, 1, len(nodes_list))[1:-1, np.newaxis]
+        coordinates[nodes_list[1:-1]] = start + ratio * (end - start)
+    return coordinates
+
+
+def get_mirror_nodes(coordinates, mirror_plane, tolerance=1e-6):
+    """Finds the mirrored node of each node.
+
+    Arguments:
+        coordinates  -- an array (nodes, 2) of the coordinates of the nodes
+        mirror_plane -- the x coordinate of the vertical mirror plane
+
+    Keyword arguments:
+        tolerance -- the relative tolerance of the mirrored coordinates
+
+    Return values:
+        mirror_nodes -- an array of the mirrored node of each node, None if
+                        any node has no mirrored node
+    """
+    extent = np.max(np.abs(coordinates - [mirror_plane, 0])) if len(coordinates) else 0
+    mirrored = coordinates * [-1, 1] + [2 * mirror_plane, 0]
+    distances, mirror_nodes = cKDTree(coordinates).query(mirrored)
+    if np.any(distances > tolerance * max(extent, 1)):
+        return None
+    return mirror_nodes
+
+
+def get_mirror_factorization(stiffness_matrices, coordinates, mirror, solver='Sparse',
+                             tolerance=1e-10):
+    """Creates the factorization by the symmetric and antisymmetric half-size systems.
+
+    Arguments:
+        stiffness_matrices -- the list returned by modify_stiffness_matrix
+        coordinates        -- an array (nodes, 2) of the coordinates of the
+                              nodes of the stiffness matrix
+        mirror             -- the x coordinate of the vertical mirror plane or
+                              'Auto' for the middle of the structure
+
+    Keyword arguments:
+        solver    -- the method of factorizing the half-size systems
+        tolerance -- the relative tolerance of the symmetry of the stiffness
+                     matrix
+
+    Return values:
+        factorization -- the mirror factorization (see MirrorFactorization).
+                         If mirror is 'Auto' and the structure is not
+                         symmetric, None is returned.
+    """
+    stiffness_matrix = sps.csr_matrix(stiffness_matrices[0])
+    free_indices = stiffness_matrices[2]
+    rotated = stiffness_matrices[4] is not None
+
+    if mirror == 'Auto':
+        mirror_plane = (np.min(coordinates[:, 0]) + np.max(coordinates[:, 0])) / 2
+    else:
+        mirror_plane = float(mirror)
+
+    # Map each free degree onto the free position of its mirrored degree.
+    mirror_nodes = get_mirror_nodes(coordinates, mirror_plane)
+    symmetric = mirror_nodes is not None and not rotated
+    if symmetric:
+        positions = -np.ones(3 * len(coordinates), dtype=int)
+        positions[free_indices] = np.arange(len(free_indices))
+        mirror_indices = (3 * mirror_nodes[:, np.newaxis] + np.arange(3)).ravel()
+        mirror_degrees = positions[mirror_indices[free_indices]]
+        mirror_signs = np.tile(MIRROR_SIGNS, len(coordinates))[free_indices]
+
+        # The stiffness of the degrees with a free mirrored degree must be symmetric.
+        paired = np.flatnonzero(mirror_degrees >= 0)
+        mirror_operator = sps.csr_matrix((mirror_signs[paired],
+                                          (mirror_degrees[paired], paired)),
+                                         shape=stiffness_matrix.shape)
+        stiffness_paired = stiffness_matrix[paired][:, paired]
+        stiffness_mirrored = (mirror_operator @ stiffness_matrix @ mirror_operator.T)[paired][:, paired]
+        deviation = abs(stiffness_mirrored - stiffness_paired).max() if paired.size else 0
+        symmetric = deviation <= tolerance * abs(stiffness_matrix).max()
+
+    if not symmetric:
+        if mirror == 'Auto':
+            return None
+        raise Exception('The structure is not symmetric about the mirror plane x = '
+                        + str(mirror_plane) + '.')
+
+    factorization = MirrorFactorization(stiffness_matrix, mirror_degrees, mirror_signs,
+                                        solver=solver)
+    return factorization
@@ -0,0 +1,108 @@
+import copy
+
+import numpy as np
+import pytest
+
+from structure_analysis import analysis_cache, structure_analysis
+from structure_analysis.analysis_cache import AnalysisCache
+
+
+def get_model():
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3]]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 0, -2, 0, 0, -5, 0]]}]
+    boundary_conditions = {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]],
+                           'Springs': [[2, 100, 0, 0]]}
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads, 'Boundary Conditions': boundary_conditions}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # Enables the cache of structure_analysis for a test and disables it afterwards
+    maxsize, directory = analysis_cache.maxsize, analysis_cache.directory
+    analysis_cache.clear()
+    analysis_cache.maxsize = 8
+    analysis_cache.directory = str(tmp_path)
+    yield analysis_cache
+    analysis_cache.clear()
+    analysis_cache.maxsize, analysis_cache.directory = maxsize, directory
+
+
+def get_settings(**kwargs):
+    settings = {'discType': 'Lengthwise', 'discElements': 100, 'discLength': 1, 'solver': 'Sparse',
+                'condensation': False, 'stations': None, 'quadrature': 'Adaptive', 'mirror': None}
+    settings.update(kwargs)
+    return settings
+
+
+def assert_results_equal(results, reference):
+    d, i_f, rd, sp = results
+    d_ref, i_f_ref, rd_ref, sp_ref = reference
+    np.testing.assert_array_equal(d.values, d_ref.values)
+    np.testing.assert_array_equal(i_f.values, i_f_ref.values)
+    np.testing.assert_array_equal(d.offsets, d_ref.offsets)
+    assert d.keys == d_ref.keys and i_f.keys == i_f_ref.keys
+    assert rd == rd_ref
+    assert sp == sp_ref
+    return
+
+
+def test_disabled_by_default():
+    assert not AnalysisCache(maxsize=0).enabled
+    assert not analysis_cache.enabled
+
+
+def test_memory_round_trip(cache):
+    model = get_model()
+    stations = [np.linspace(0, 10, 3), np.array([0, 7.37, 15]), np.linspace(0, 10, 3)]
+    for kwargs in [{}, {'stations': stations}]:
+        cache.clear()
+        cache.directory = None
+        reference = structure_analysis(model, **kwargs)
+        assert cache.info()['Misses'] == 1
+        results = structure_analysis(model, **kwargs)
+        assert cache.info()['Hits'] == 1
+        assert_results_equal(results, reference)
+
+        # Changing the returned results does not change the cache
+        results[1].values[:] = 0
+        assert_results_equal(structure_analysis(model, **kwargs), reference)
+
+
+def test_disk_round_trip(cache):
+    model = get_model()
+    reference = structure_analysis(model)
+    cache.clear()
+    results = structure_analysis(model)
+    assert cache.info()['Disk Hits'] == 1
+    assert_results_equal(results, reference)
+
+    # A cache of another process with the same directory
+    other_cache = AnalysisCache(maxsize=0, directory=cache.directory)
+    key = cache.get_key(model, (), get_settings())
+    assert_results_equal(other_cache.get_results(key), reference)
+
+
+def test_keys():
+    cache = AnalysisCache()
+    model = get_model()
+    key = cache.get_key(model, (), get_settings())
+
+    # Arrays and nested lists of the same values give the same key
+    model_arrays = copy.deepcopy(model)
+    model_arrays['Nodes']['Location'] = np.array(model['Nodes']['Location'], dtype=float)
+    assert cache.get_key(model_arrays, (), get_settings()) == key
+
+    # Changed values, changed settings and keys of other types give other keys
+    model_changed = copy.deepcopy(model)
+    model_changed['Beams']['Stiffness'][1][1] *= 2
+    assert cache.get_key(model_changed, (), get_settings()) != key
+    assert cache.get_key(model, (), get_settings(discLength=0.5)) != key
+    assert cache.get_key({1: [1, 2]}, (), {}) != cache.get_key({'1': [1, 2]}, (), {})
+
+    # Models with functions are not cached
+    model_functional = copy.deepcopy(model)
+    model_functional['Loads'].append({'Functions': [[1, 0, 15, 0, lambda x: -1, 0]]})
+    assert cache.get_key(model_functional, (), get_settings()) is None
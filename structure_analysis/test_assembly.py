@@ -0,0 +1,224 @@
+import numpy as np
+import pytest
+
+from structure_analysis import prepare_model
+from structure_analysis.assembly import apply_initial_displacements, get_force_matrices, get_stiffness_matrix
+from structure_analysis.assembly.loads_distributed import (assemble_distributed_loads, calculate_nodal_forces,
+                                                           get_distributed_loads_array)
+from structure_analysis.assembly.loads_functions import assemble_functional_loads
+from structure_analysis.assembly.loads_point import assemble_point_loads, get_point_loads_array
+from structure_analysis.assembly.local_stiffness_matrix import get_local_stiffness_matrix, include_releases
+from structure_analysis.assembly.rotation_matrix import get_rotation_matrix
+from structure_analysis.assembly.shape_functions import n1, n2, n3, n31, n4, n41, n5, n51, n6, n61
+from structure_analysis.verification import verify_loads
+
+DISCRETIZATIONS = [{}, {'discLength': 0.7}, {'discType': 'Elementwise', 'discElements': 1},
+                   {'discType': 'Elementwise', 'discElements': 3}]
+
+
+def get_model():
+    # A braced frame with hinges on both ends of a bracing, a spring and initial displacements
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0], [7.5, 14]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3], [1, 4], [4, 2]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3],
+                           [5.7e5, 3.886e3], [5.7e5, 3.886e3]],
+             'Releases': [[3, 1, 0], [4, 1, 1]]}
+    loads = [{'Point': [[1, 7.37, 2, -10, 3], [1, 5, 0, -4, 0], [0, 0, 1, 0, 0], [2, 10, 0, 0, 2],
+                        [4, 3.2, 0, -1, 1]]},
+             {'Distributed': [[1, 0, 0, 0, -2, 0, 0, -2, 0], [1, 2.43, 11.21, 1, -2, 0.5, 0, -5, 0],
+                              [2, 3.1, 3.4, 3, 0, 0, 3, 0, 1], [3, 0, 0, 1, -1, 0, 1, -1, 0],
+                              [4, 1.1, 7.9, 0, -1, 0, 0, -3, 0]]},
+             {'Nodal': [[4, 3, -1, 2], [1, 0, -2, 0]], 'Initial Displacements': [[0, 0, 0.01, 0.001]]},
+             {'Point': [[3, 8.5, 0, -2, 0]], 'Distributed': [[0, 4, 6, 1, 0, 0, 1, 0, 0]],
+              'Functions': [[1, 1.3, 13.9, 0, lambda x: -np.sin(x / 3) ** 2 - 1, lambda x: 0.1 * x]],
+              'Initial Displacements': [[3, 0.002, 0, 0]]}]
+    boundary_conditions = {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]],
+                           'Springs': [[2, 100, 0, 0]]}
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads, 'Boundary Conditions': boundary_conditions}
+
+
+def get_assembly(discretization):
+    # The compiled model and its verified loads
+    model = get_model()
+    compiled_model = prepare_model(model, **discretization)
+    loads = verify_loads(model['Loads'], compiled_model.model, compiled_model.nodes_adapt_dict)
+    return compiled_model, loads
+
+
+def get_assembled_forces(loads, disc_information):
+    # The assembled forces of each loadgroup as a list of [element, start node,
+    # end node, orientation, local forces]
+    arguments = (disc_information['Nodes'], disc_information['Elements'], disc_information['Beams Information'])
+    assembled_forces = np.concatenate((assemble_point_loads(*arguments, get_point_loads_array(loads)),
+                                       assemble_distributed_loads(*arguments, get_distributed_loads_array(loads))))
+    assembled_forces_lists = []
+    for loadgroup_nr, loadgroup in enumerate(loads):
+        assembled_forces_lists.append([[entry['Element'], entry['Nodes'][0], entry['Nodes'][1], entry['Theta'],
+                                        entry['Forces'].reshape((6, 1))]
+                                       for entry in assembled_forces[assembled_forces['Loadgroup'] == loadgroup_nr]])
+        if 'Functions' in loadgroup and loadgroup['Functions']:
+            assembled_forces_lists[-1] += assemble_functional_loads(*arguments, loadgroup['Functions'])
+    return assembled_forces_lists
+
+
+# The element by element assembly which the array operations replaced
+
+def reference_stiffness_matrix(beams_stiffness, nodes_lists, releases_beams, beams_information):
+    number_of_nodes = max(max(nodes_list) for nodes_list in nodes_lists) + 1
+    stiffness_matrix = np.zeros((3*number_of_nodes, 3*number_of_nodes))
+    for i, nodes_list in enumerate(nodes_lists):
+        length, theta, elements_amount = beams_information[i][3], beams_information[i][1], beams_information[i][2]
+        r = get_rotation_matrix(theta)
+        k_global = r @ get_local_stiffness_matrix(length, beams_stiffness[i]) @ r.transpose()
+        for j in range(elements_amount):
+            left_release = releases_beams.get(i, [0, 0])[0] if j == 0 else 0
+            right_release = releases_beams.get(i, [0, 0])[1] if j == elements_amount - 1 else 0
+            degrees = [3*nodes_list[j] + k for k in range(3)] + [3*nodes_list[j+1] + k for k in range(3)]
+            stiffness_matrix[np.ix_(degrees, degrees)] += include_releases(k_global, left_release, right_release)
+    return stiffness_matrix
+
+
+def reference_point_loads(point_loads, disc_information):
+    nodes_lists, elements_lists = disc_information['Nodes'], disc_information['Elements']
+    assembled_forces = []
+    for beam_nr, position, *load in point_loads:
+        theta, elements_amount, l = disc_information['Beams Information'][beam_nr][1:4]
+        x = position % l
+        j = int(position // l)
+        if j == elements_amount:
+            j -= 1
+            x = l
+        fx, fy, mz = get_rotation_matrix(theta)[0:3, 0:3].transpose() @ np.array(load)
+        forces = np.array([[n1(x, l)*fx], [n3(x, l)*fy + n31(x, l)*mz], [n4(x, l)*fy + n41(x, l)*mz],
+                           [n2(x, l)*fx], [n5(x, l)*fy + n51(x, l)*mz], [n6(x, l)*fy + n61(x, l)*mz]])
+        element_nr, node_start, node_end = elements_lists[beam_nr][j], nodes_lists[beam_nr][j], nodes_lists[beam_nr][j+1]
+        if x != 0 or j == 0:
+            assembled_forces.append([element_nr, node_start, node_end, theta, forces])
+        else:
+            # A load on a node is split between the two elements
+            zeros = np.zeros((3, 1))
+            assembled_forces.append([element_nr, node_start, -1, theta, np.vstack((forces[0:3]/2, zeros))])
+            assembled_forces.append([elements_lists[beam_nr][j-1], -1, node_start, theta,
+                                     np.vstack((zeros, forces[0:3]/2))])
+    return assembled_forces
+
+
+def reference_distributed_loads(distributed_loads, disc_information):
+    nodes_lists, elements_lists = disc_information['Nodes'], disc_information['Elements']
+    assembled_forces = []
+    for distributed_load in distributed_loads:
+        beam_nr, x_start, x_end = distributed_load[0:3]
+        theta, elements_amount, l = disc_information['Beams Information'][beam_nr][1:4]
+        load_local = get_rotation_matrix(theta).transpose() @ distributed_load[3:9]
+        load_inclination = (load_local[3:6] - load_local[0:3]) / (x_end - x_start) * l
+        load_start = load_local[0:3] - load_inclination / l * x_start
+        j_start = int(x_start // l)
+        j_end = min(elements_amount - 1, int(np.ceil(x_end / l) - 1))
+        for j in range(j_start, j_end + 1):
+            x_left = x_start - j_start * l if j == j_start else 0
+            x_right = min(l, x_end - j_end * l) if j == j_end else l
+            forces = calculate_nodal_forces(load_start, load_inclination, j, l, x_left, x_right)
+            assembled_forces.append([elements_lists[beam_nr][j], nodes_lists[beam_nr][j],
+                                     nodes_lists[beam_nr][j+1], theta, forces])
+    return assembled_forces
+
+
+def reference_include_hinges(forces, length, release_start, release_end):
+    forces_hinged = forces.copy()
+    if release_start == 1 and release_end == 1:
+        forces_hinged[1] = forces[1] - 1/length*(forces[2] + forces[5])
+        forces_hinged[2] = 0
+        forces_hinged[4] = forces[4] + 1/length*(forces[2] + forces[5])
+        forces_hinged[5] = 0
+    elif release_start == 1:
+        forces_hinged[1] = forces[1] - 3/(2*length)*forces[2]
+        forces_hinged[2] = 0
+        forces_hinged[4] = forces[4] + 3/(2*length)*forces[2]
+        forces_hinged[5] = forces[5] - 1/2*forces[2]
+    elif release_end == 1:
+        forces_hinged[1] = forces[1] - 3/(2*length)*forces[5]
+        forces_hinged[2] = forces[2] - 1/2*forces[5]
+        forces_hinged[4] = forces[4] + 3/(2*length)*forces[5]
+        forces_hinged[5] = 0
+    return forces_hinged
+
+
+def reference_force_matrices(loads, assembled_forces_lists, stiffness_matrix, disc_information):
+    # The dense force matrix and internal forces (6*elements, loadgroups) of the
+    # assembled forces of each loadgroup
+    elements_lists = disc_information['Elements']
+    releases_elements = disc_information['Releases']['Elements']
+    number_of_elements = elements_lists[-1][-1] + 1
+    element_lengths = {element_nr: disc_information['Beams Information'][beam_nr][3]
+                       for beam_nr, elements_list in enumerate(elements_lists) for element_nr in elements_list}
+    force_matrix = np.zeros((stiffness_matrix.shape[0], len(loads)))
+    internal_forces = np.zeros((6, number_of_elements, len(loads)))
+    displacement_matrix = np.zeros_like(force_matrix)
+    for loadgroup_nr, loadgroup in enumerate(loads):
+        for nodal_load in loadgroup.get('Nodal', []):
+            force_matrix[3*nodal_load[0]:3*nodal_load[0]+3, loadgroup_nr] += nodal_load[1:4]
+        for initial_displacement in loadgroup.get('Initial Displacements', []):
+            node_nr = initial_displacement[0]
+            displacement_matrix[3*node_nr:3*node_nr+3, loadgroup_nr] += initial_displacement[1:4]
+        for element_nr, node_start, node_end, theta, forces in assembled_forces_lists[loadgroup_nr]:
+            if element_nr in releases_elements:
+                forces = reference_include_hinges(forces, element_lengths[element_nr],
+                                                  *releases_elements[element_nr][0:2])
+            global_forces = get_rotation_matrix(theta) @ forces
+            # The node -1 of point loads on a node is a placeholder without forces
+            for k, node_nr in enumerate([node_start, node_end]):
+                if node_nr >= 0:
+                    force_matrix[3*node_nr:3*node_nr+3, loadgroup_nr] += global_forces[3*k:3*k+3, 0]
+            internal_forces[:, element_nr, loadgroup_nr] += np.array([-1, 1, -1, 1, -1, 1]) * forces[:, 0]
+    force_matrix -= stiffness_matrix @ displacement_matrix
+    return force_matrix, internal_forces.reshape((6*number_of_elements, len(loads)))
+
+
+def assert_force_matrices_equal(force_matrices, reference):
+    for matrix, matrix_reference in zip(force_matrices, reference):
+        scale = np.abs(matrix_reference).max()
+        np.testing.assert_allclose(matrix.toarray(), matrix_reference, rtol=0, atol=1e-12 * scale)
+    return
+
+
+@pytest.mark.parametrize('discretization', DISCRETIZATIONS)
+def test_stiffness_matrix(discretization):
+    compiled_model = prepare_model(get_model(), **discretization)
+    disc_information = compiled_model.discretization_information
+    arguments = (compiled_model.model['Beams']['Stiffness'], disc_information['Nodes'],
+                 disc_information['Releases']['Beams'], disc_information['Beams Information'])
+    stiffness_matrix = get_stiffness_matrix(*arguments)
+    reference = reference_stiffness_matrix(*arguments)
+    np.testing.assert_allclose(stiffness_matrix.toarray(), reference, rtol=0, atol=1e-12 * np.abs(reference).max())
+
+
+@pytest.mark.parametrize('discretization', DISCRETIZATIONS)
+def test_force_matrices(discretization):
+    compiled_model, loads = get_assembly(discretization)
+    disc_information = compiled_model.discretization_information
+    force_matrix, internal_forces = get_force_matrices(loads, disc_information['Nodes'],
+                                                       disc_information['Elements'],
+                                                       disc_information['Releases']['Elements'],
+                                                       disc_information['Beams Information'])
+    force_matrix = apply_initial_displacements(loads, compiled_model.stiffness_matrix, force_matrix)
+    reference = reference_force_matrices(loads, get_assembled_forces(loads, disc_information),
+                                         compiled_model.stiffness_matrix.toarray(), disc_information)
+    assert_force_matrices_equal((force_matrix, internal_forces), reference)
+
+
+@pytest.mark.parametrize('discretization', DISCRETIZATIONS)
+def test_assembled_internal_forces(discretization):
+    # The point and distributed loads assembled load by load and element by element
+    compiled_model, loads = get_assembly(discretization)
+    disc_information = compiled_model.discretization_information
+    loads = [{key: loadgroup[key] for key in ['Point', 'Distributed', 'Nodal'] if key in loadgroup}
+             for loadgroup in loads]
+    force_matrices = get_force_matrices(loads, disc_information['Nodes'], disc_information['Elements'],
+                                        disc_information['Releases']['Elements'],
+                                        disc_information['Beams Information'])
+    assembled_forces_lists = [reference_point_loads(loadgroup.get('Point', []), disc_information)
+                              + reference_distributed_loads(loadgroup.get('Distributed', []), disc_information)
+                              for loadgroup in loads]
+    reference = reference_force_matrices(loads, assembled_forces_lists, compiled_model.stiffness_matrix.toarray(),
+                                         disc_information)
+    assert_force_matrices_equal(force_matrices, reference)
@@ -0,0 +1,46 @@
+import numpy as np
+
+from structure_analysis import structure_analysis
+
+
+def get_model():
+    # The frame of test.py with a hinge, a spring, a rotated support and
+    # an initial displacement
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0], [7.5, 14]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3], [1, 4], [4, 2]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3],
+                           [5.7e5, 3.886e3], [5.7e5, 3.886e3]],
+             'Releases': [[3, 1, 0]]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 0, -2, 0, 0, -5, 0], [3, 0, 0, 1, -1, 0, 1, -1, 0]]},
+             {'Nodal': [[4, 3, -1, 2]], 'Initial Displacements': [[0, 0, 0.01, 0.001]]}]
+    boundary_conditions = {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]],
+                           'Rotated Degrees': [[3, np.pi / 6]],
+                           'Springs': [[2, 100, 0, 0]]}
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads, 'Boundary Conditions': boundary_conditions}
+
+
+def assert_results_equal(results, reference):
+    scale = np.abs(reference.values).max()
+    np.testing.assert_allclose(results.values, reference.values, rtol=0, atol=1e-9 * scale)
+    return
+
+
+def test_condensation_equals_full_system():
+    model = get_model()
+    d, i_f, rd, sp = structure_analysis(model, condensation=True)
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model)
+    assert_results_equal(d, d_ref)
+    assert_results_equal(i_f, i_f_ref)
+    np.testing.assert_allclose(np.array(rd, dtype=float), np.array(rd_ref, dtype=float), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(np.array(sp, dtype=float), np.array(sp_ref, dtype=float), rtol=1e-9, atol=1e-9)
+
+
+def test_condensation_stations():
+    model = get_model()
+    stations = [np.linspace(0, 10, 7), np.array([0, 2.43, 7.37, 15]), np.linspace(0, 10, 3),
+                np.linspace(0, 8.5, 5), np.linspace(0, 8.5, 5)]
+    d, i_f, rd, sp = structure_analysis(model, condensation=True, stations=stations)
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model, stations=stations)
+    assert_results_equal(d, d_ref)
+    assert_results_equal(i_f, i_f_ref)
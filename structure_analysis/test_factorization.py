@@ -0,0 +1,66 @@
+import numpy as np
+import scipy.sparse as sps
+
+from structure_analysis import prepare_model, structure_analysis
+from structure_analysis.factorization import (BandedFactorization, FactorizationCache,
+                                              get_banded_factorization)
+
+
+def get_model(spring=100):
+    # A braced frame with a hinge, a spring and a rotated support
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0], [7.5, 14]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3], [1, 4], [4, 2]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3],
+                           [5.7e5, 3.886e3], [5.7e5, 3.886e3]],
+             'Releases': [[3, 1, 0]]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 0, -2, 0, 0, -5, 0], [3, 0, 0, 1, -1, 0, 1, -1, 0]]},
+             {'Nodal': [[4, 3, -1, 2]], 'Initial Displacements': [[0, 0, 0.01, 0.001]]}]
+    boundary_conditions = {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]],
+                           'Rotated Degrees': [[3, np.pi / 6]],
+                           'Springs': [[2, spring, 0, 0]]}
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads, 'Boundary Conditions': boundary_conditions}
+
+
+def assert_banded_equals_sparse(model, **kwargs):
+    d, i_f, rd, sp = structure_analysis(model, solver='Banded', **kwargs)
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model, solver='Sparse', **kwargs)
+    for results, reference in [(d, d_ref), (i_f, i_f_ref)]:
+        scale = np.abs(reference.values).max()
+        np.testing.assert_allclose(results.values, reference.values, rtol=0, atol=1e-9 * scale)
+    np.testing.assert_allclose(np.array(rd, dtype=float), np.array(rd_ref, dtype=float), rtol=1e-8, atol=1e-6)
+    np.testing.assert_allclose(np.array(sp, dtype=float), np.array(sp_ref, dtype=float), rtol=1e-8, atol=1e-9)
+    return
+
+
+def test_banded_equals_sparse():
+    model = get_model()
+    assert isinstance(prepare_model(model, solver='Banded').factorization, BandedFactorization)
+    assert_banded_equals_sparse(model)
+    assert_banded_equals_sparse(model, condensation=True)
+    assert_banded_equals_sparse(model, discType='Elementwise', discElements=1)
+
+
+def test_banded_fallback_not_positive_definite():
+    # A negative spring exceeding the sway stiffness of the frame, the
+    # stiffness matrix is regular but not positive definite
+    model = get_model(spring=-1e3)
+    assert not isinstance(prepare_model(model, solver='Banded').factorization, BandedFactorization)
+    assert_banded_equals_sparse(model)
+
+
+def test_banded_fallback_bandwidth():
+    stiffness_matrix = prepare_model(get_model()).stiffness_matrices[0].tocsc()
+    assert get_banded_factorization(stiffness_matrix, max_bandwidth=2) is None
+    factorization = get_banded_factorization(stiffness_matrix)
+    forces = np.random.default_rng(0).normal(size=(stiffness_matrix.shape[0], 3))
+    np.testing.assert_allclose(stiffness_matrix @ factorization.solve(forces), forces, rtol=0, atol=1e-8)
+
+
+def test_cache_fallback():
+    # The cache factorizes the matrices with the sparse LU factorization instead
+    stiffness_matrix = sps.csc_matrix(np.array([[2., 1, 0], [1, -3, 1], [0, 1, 2]]))
+    factorization = FactorizationCache().get_factorization(stiffness_matrix, solver='Banded')
+    assert not isinstance(factorization, BandedFactorization)
+    forces = np.array([1., 2, 3])
+    np.testing.assert_allclose(stiffness_matrix @ factorization.solve(forces), forces)
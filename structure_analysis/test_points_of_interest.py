@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from structure_analysis import structure_analysis
+
+KEYS_ID = ['Displacement X', 'Displacement Y', 'Rotation Z']
+KEYS_IF = ['Normal Force', 'Shear Force', 'Moment']
+
+
+def get_model():
+    # A portal frame with point, uniform, linear and functional loads
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3]]}
+    loads = [{'Point': [[1, 7.37, 2, -10, 3], [0, 3.14, 4, 0, 1]]},
+             {'Distributed': [[1, 0, 0, 0, -2, 0, 0, -2, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 1, -2, 0.5, 0, -5, 0], [2, 0, 10, 3, 0, 0, 0, 0, 0]]},
+             {'Functions': [[1, 1.3, 13.9, 0, lambda x: -np.sin(x / 3) ** 2 - 1, lambda x: 0.1 * x],
+                             [0, 0, 10, lambda x: 0.5 * np.cos(x), 0, 0]]}]
+    restricted_degrees = [[0, 1, 1, 1], [3, 1, 1, 0]]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': restricted_degrees}}
+
+
+# Points on the ends of the elements of the default discretization and between them
+POINTS_ENDS = [[0, 0], [0, 3], [0, 10], [1, 0], [1, 5], [1, 12], [2, 4], [2, 10]]
+POINTS_MIDDLE = [[0, 3.5], [0, 7.25], [1, 2.45], [1, 7.35], [1, 7.4], [1, 11.2], [1, 14.55], [2, 0.65]]
+
+
+def get_mesh_values(results, points, length=0.05):
+    # The values of the nodes of the fine discretization at the points
+    values = []
+    for loadgroup in results:
+        values.append([[loadgroup[key][beam_nr][int(round(distance / length))]
+                        for beam_nr, distance in points] for key in loadgroup])
+    return np.array(values)
+
+
+def get_poi_values(results, keys):
+    return np.array([[loadgroup[key] for key in keys] for loadgroup in results])
+
+
+@pytest.fixture(scope='module')
+def mesh():
+    d, i_f, rd, sp = structure_analysis(get_model(), discLength=0.05)
+    return d, i_f
+
+
+@pytest.mark.parametrize('quadrature', ['Adaptive', 'Gauss-Legendre'])
+def test_internal_forces(mesh, quadrature):
+    # The internal forces are exact by equilibrium on the elements
+    points = POINTS_ENDS + POINTS_MIDDLE
+    d, i_f, rd, sp = structure_analysis(get_model(), points, quadrature=quadrature)
+    reference = get_mesh_values(mesh[1], points)
+    scale = np.abs(reference).max()
+    np.testing.assert_allclose(get_poi_values(i_f, KEYS_IF), reference, rtol=0, atol=1e-8 * scale)
+
+
+def test_displacements_element_ends(mesh):
+    d, i_f, rd, sp = structure_analysis(get_model(), POINTS_ENDS)
+    reference = get_mesh_values(mesh[0], POINTS_ENDS)
+    scale = np.abs(reference).max()
+    np.testing.assert_allclose(get_poi_values(d, KEYS_ID), reference, rtol=0, atol=1e-8 * scale)
+
+
+def test_displacements_between_element_ends(mesh):
+    # The displacements between the element ends are interpolated by the shape
+    # functions, the member loads on the element are not taken into account
+    d, i_f, rd, sp = structure_analysis(get_model(), POINTS_MIDDLE)
+    reference = get_mesh_values(mesh[0], POINTS_MIDDLE)
+    scale = np.abs(reference).max()
+    np.testing.assert_allclose(get_poi_values(d, KEYS_ID), reference, rtol=0, atol=1e-3 * scale)
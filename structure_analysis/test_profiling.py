@@ -0,0 +1,84 @@
+import os
+import threading
+
+from structure_analysis import prepare_model, structure_analysis
+from structure_analysis.profiling import profile_stages, stage_profiler
+
+STAGES = ['Verification', 'Discretization', 'Stiffness Assembly', 'Boundary Conditions', 'Factorization',
+          'Load Verification', 'Load Assembly', 'Solution', 'Back Calculation', 'Results']
+
+
+def get_model():
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3]]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]}, {'Distributed': [[1, 0, 0, 0, -2, 0, 0, -2, 0]]}]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]]}}
+
+
+def test_stages():
+    with profile_stages() as profiler:
+        structure_analysis(get_model())
+    summary = profiler.summary()
+    assert set(summary) == set(STAGES)
+    # The boundary conditions are applied to the stiffness matrix and to the loads
+    assert summary['Boundary Conditions']['Calls'] == 2
+    assert all(summary[name]['Calls'] == 1 for name in STAGES if name != 'Boundary Conditions')
+    assert summary['Stiffness Assembly']['Degrees'] > 0
+    assert summary['Load Assembly']['Loadgroups'] == 2
+    assert [line.split()[0] for line in profiler.report().splitlines()[1:]] == \
+           [name.split()[0] for name in sorted(summary, key=lambda name: -summary[name]['Total'])]
+
+
+def test_count_calls():
+    with profile_stages() as profiler:
+        structure_analysis(get_model())
+        compiled_model = prepare_model(get_model())
+        compiled_model.solve(get_model()['Loads'])
+        compiled_model.solve(get_model()['Loads'])
+    assert profiler.count_calls('Analysis') == 1
+    assert profiler.count_calls('Compilation') == 2
+    assert profiler.count_calls('Solve') == 3
+    assert profiler.count_calls('Cache Hit') == 0
+    # The calls are attributed to the code calling the package, which skips this file
+    package_files = os.listdir(os.path.dirname(os.path.abspath(__file__)))
+    assert not any(call_site.split(':')[0] in package_files for name, call_site in profiler.calls)
+
+
+def test_disabled():
+    # Without profiling nothing is recorded, the records of the last profiling are kept
+    with profile_stages():
+        structure_analysis(get_model())
+    summary = stage_profiler.summary()
+    structure_analysis(get_model())
+    assert not stage_profiler.enabled
+    assert stage_profiler.summary() == summary
+    assert stage_profiler.count_calls('Analysis') == 1
+
+
+def test_nested_profiling():
+    # The profiling is switched off by the outermost context only
+    with profile_stages():
+        with profile_stages(clear=False):
+            structure_analysis(get_model())
+        assert stage_profiler.enabled
+        structure_analysis(get_model())
+    assert not stage_profiler.enabled
+    assert stage_profiler.count_calls('Analysis') == 2
+    assert stage_profiler.summary()['Solution']['Calls'] == 2
+
+
+def test_threads():
+    def analyse():
+        for _ in range(5):
+            structure_analysis(get_model())
+
+    with profile_stages() as profiler:
+        threads = [threading.Thread(target=analyse) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert profiler.count_calls('Analysis') == 20
+    assert profiler.summary()['Results']['Calls'] == 20
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+import scipy.integrate as integrate
+
+from structure_analysis import quadrature, structure_analysis
+from structure_analysis.quadrature import gauss_legendre, vectorize_function
+
+
+def record_integrand(function, calls):
+    # An integrand of gauss_legendre which records the shape (intervals, points) of each call
+    def integrand(x, index):
+        calls.append(x.shape)
+        return np.array([function(x)])
+    return integrand
+
+
+def test_smooth_function():
+    lower = np.array([0, 1.5, 2, 7])
+    upper = np.array([1.5, 2, 7, 7])
+    calls = []
+    integrals = gauss_legendre(record_integrand(lambda x: np.exp(np.sin(x)), calls), lower, upper)
+    reference = [integrate.quad(lambda x: np.exp(np.sin(x)), a, b, epsabs=1e-13)[0] for a, b in zip(lower, upper)]
+    np.testing.assert_allclose(integrals[0], reference, rtol=1e-10, atol=1e-14)
+    # The order is raised without splitting the intervals
+    assert max(points for intervals, points in calls) > 8
+    assert max(intervals for intervals, points in calls) <= len(lower)
+
+
+def test_kink():
+    # The order of the interval containing the kink is raised to the maximum, then it is split
+    lower = np.array([0, 3, 6])
+    upper = np.array([3, 6, 9])
+    calls = []
+    integrals = gauss_legendre(record_integrand(lambda x: np.abs(x - 4.3), calls), lower, upper)
+    reference = [integrate.quad(lambda x: abs(x - 4.3), a, b, points=[4.3])[0] for a, b in zip(lower, upper)]
+    np.testing.assert_allclose(integrals[0], reference, rtol=1e-10)
+    assert calls[-1][0] > 1
+    assert max(points for intervals, points in calls) == 32
+
+
+def test_vectorize_function():
+    # Load functions written for scalars are evaluated element by element
+    def load(x):
+        return 1 if x < 2 else 2 * x
+    x = np.array([[0, 1.5, 2], [3, 4, 5]])
+    np.testing.assert_array_equal(vectorize_function(load)(x), [[1, 1, 4], [6, 8, 10]])
+    np.testing.assert_array_equal(vectorize_function(0)(x), np.zeros_like(x))
+    np.testing.assert_array_equal(vectorize_function(lambda x: 3)(x), 3 * np.ones_like(x))
+
+
+def get_model(functions):
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3]]}
+    loads = [{'Functions': [function]} for function in functions]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]]}}
+
+
+SMOOTH = [[1, 0, 15, 0, lambda x: -np.sin(x / 3) ** 2 - 1, 0],
+          [1, 1.3, 13.9, lambda x: 0.2 * np.cos(x), lambda x: -0.1 * x ** 2, lambda x: 0.1 * x],
+          [0, 2.2, 10, lambda x: np.exp(-x / 4), 0, 0]]
+
+# A kink inside an element and a load written for scalars with a kink on a node
+NON_SMOOTH = [[1, 0, 15, 0, lambda x: -np.abs(x - 6.3), 0],
+              [1, 0, 15, 0, lambda x: -1 if x < 4 else -1 - (x - 4), 0]]
+
+
+@pytest.mark.parametrize('functions', [SMOOTH, NON_SMOOTH], ids=['Smooth', 'Non-smooth'])
+def test_gauss_legendre_equals_adaptive(functions):
+    model = get_model(functions)
+    points = [[1, 0.5], [1, 6.3], [1, 7.75], [0, 2.5]]
+    stations = [np.linspace(0, 10, 11), np.linspace(0, 15, 31), np.linspace(0, 10, 3)]
+    for args, kwargs in [((), {}), ((points,), {}), ((), {'stations': stations})]:
+        d, i_f, rd, sp = structure_analysis(model, *args, quadrature='Gauss-Legendre', **kwargs)
+        d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model, *args, quadrature='Adaptive', **kwargs)
+        for results, reference in [(d, d_ref), (i_f, i_f_ref)]:
+            if not args:
+                results, reference = results.values, reference.values
+            else:
+                results = np.array([list(loadgroup.values()) for loadgroup in results])
+                reference = np.array([list(loadgroup.values()) for loadgroup in reference])
+            scale = np.abs(reference).max()
+            np.testing.assert_allclose(results, reference, rtol=0, atol=1e-8 * scale)
+        np.testing.assert_allclose(np.array(rd, dtype=float), np.array(rd_ref, dtype=float), rtol=1e-8, atol=1e-5)
+
+
+
+def test_kink_load_is_split(monkeypatch):
+    # A load with a kink needs further integrations of the split intervals
+    calls = []
+    integrate_intervals = quadrature.integrate_intervals
+
+    def count_intervals(*args, **kwargs):
+        calls.append(len(args[1]))
+        return integrate_intervals(*args, **kwargs)
+
+    monkeypatch.setattr(quadrature, 'integrate_intervals', count_intervals)
+    structure_analysis(get_model(SMOOTH[:1]), quadrature='Gauss-Legendre')
+    calls_smooth = len(calls)
+    calls.clear()
+    structure_analysis(get_model(NON_SMOOTH[:1]), quadrature='Gauss-Legendre')
+    assert len(calls) > calls_smooth
@@ -0,0 +1,85 @@
+import numpy as np
+
+from structure_analysis import structure_analysis
+
+
+def get_model(releases=()):
+    # A portal frame with a point load and a distributed load which start
+    # between the nodes of the fine discretization
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3]],
+             'Releases': [list(release) for release in releases]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 0, -2, 0, 0, -5, 0]]},
+             {'Point': [[0, 3.14, 4, 0, 1]], 'Nodal': [[2, 3, 0, 0]]}]
+    restricted_degrees = [[0, 1, 1, 1], [3, 1, 1, 0]]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': restricted_degrees}}
+
+
+def get_mesh_stations(model, results):
+    # The positions of the nodes of the fine discretization along each beam
+    location = np.array(model['Nodes']['Location'], dtype=float)
+    stations = []
+    for i, (start, end) in enumerate(model['Beams']['Nodes']):
+        length = np.linalg.norm(location[end] - location[start])
+        amount = results.offsets[i + 1] - results.offsets[i]
+        stations.append(np.linspace(0, length, amount))
+    return stations
+
+
+def get_hinged_ends(model, results):
+    # The indices of the released beam ends in the results
+    hinged_ends = []
+    for beam_nr, start, end in model['Beams']['Releases']:
+        if start:
+            hinged_ends.append((results.offsets[beam_nr], 1))
+        if end:
+            hinged_ends.append((results.offsets[beam_nr + 1] - 1, -1))
+    return hinged_ends
+
+
+def assert_stations_equal_mesh(model):
+    d_mesh, if_mesh, rd_mesh, sp_mesh = structure_analysis(model, discType='Lengthwise', discLength=0.05)
+    stations = get_mesh_stations(model, if_mesh)
+    d_stations, if_stations, rd_stations, sp_stations = structure_analysis(model, discType='Elementwise',
+                                                                           discElements=1, stations=stations)
+    scale = np.abs(if_mesh.values).max()
+    np.testing.assert_allclose(if_stations.values, if_mesh.values, rtol=0, atol=1e-6 * scale)
+
+    # At a hinged end the mesh returns the rotation of the node, the stations
+    # the rotation of the beam, which is extrapolated from the mesh
+    d_expected = d_mesh.values.copy()
+    for i, direction in get_hinged_ends(model, d_mesh):
+        rotations = d_mesh.values[:, 2, i + direction:i + 4 * direction:direction]
+        d_expected[:, 2, i] = 3 * rotations[:, 0] - 3 * rotations[:, 1] + rotations[:, 2]
+    scale = np.abs(d_mesh.values).max()
+    np.testing.assert_allclose(d_stations.values, d_expected, rtol=0, atol=1e-5 * scale)
+    np.testing.assert_allclose(np.array(rd_stations, dtype=float), np.array(rd_mesh, dtype=float),
+                               rtol=1e-9, atol=1e-9)
+    return
+
+
+def test_stations_equal_mesh():
+    assert_stations_equal_mesh(get_model())
+
+
+def test_stations_equal_mesh_hinged_ends():
+    assert_stations_equal_mesh(get_model(releases=[[1, 1, 0]]))
+    assert_stations_equal_mesh(get_model(releases=[[0, 0, 1], [1, 0, 1]]))
+
+
+def test_stations_at_load_positions():
+    # Stations at the positions of the loads, which are not nodes of either
+    # discretization
+    model = get_model()
+    stations = [np.array([0, 10]), np.array([0, 2.43, 7.37, 11.21, 15]), np.array([0, 10])]
+    d_coarse, if_coarse, rd_coarse, sp_coarse = structure_analysis(model, discType='Elementwise',
+                                                                   discElements=1, stations=stations)
+    d_fine, if_fine, rd_fine, sp_fine = structure_analysis(model, discType='Elementwise',
+                                                           discElements=100, stations=stations)
+    scale = np.abs(if_fine.values).max()
+    np.testing.assert_allclose(if_coarse.values, if_fine.values, rtol=0, atol=1e-9 * scale)
+    scale = np.abs(d_fine.values).max()
+    np.testing.assert_allclose(d_coarse.values, d_fine.values, rtol=0, atol=1e-9 * scale)
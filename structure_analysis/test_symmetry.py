@@ -0,0 +1,52 @@
+import numpy as np
+
+from structure_analysis import prepare_model, structure_analysis
+from structure_analysis.symmetry import MirrorFactorization
+
+
+def get_model(restricted_degrees):
+    # A tied arch symmetric about x = 20 with a hanger at the crown
+    x = np.linspace(0, 40, 9)
+    arch = [[float(x_i), float(10 - (x_i - 20) ** 2 / 40)] for x_i in x]
+    nodes = {'Location': arch + [[20, 0]]}
+    beams_nodes = [[i, i + 1] for i in range(8)] + [[0, 9], [9, 8], [4, 9]]
+    beams_stiffness = [[2e7, 5e5]] * 8 + [[1e7, 2e5]] * 2 + [[1e6, 1e2]]
+    beams = {'Nodes': beams_nodes, 'Stiffness': beams_stiffness, 'Releases': [[10, 1, 1]]}
+    loads = [{'Distributed': [[8, 3.3, 17.2, 0, -10, 0, 0, -20, 0]]},
+             {'Point': [[2, 1.7, 5, -100, 0]], 'Nodal': [[4, 10, 0, 50]]},
+             {'Distributed': [[i, 0, 0, 0, -5, 0, 0, -5, 0] for i in range(8)]}]
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads,
+            'Boundary Conditions': {'Restricted Degrees': restricted_degrees}}
+
+
+def assert_mirror_equals_direct(model, mirror, symmetric=True, **kwargs):
+    compiled_model = prepare_model(model, mirror=mirror, **kwargs)
+    assert isinstance(compiled_model.factorization, MirrorFactorization) == symmetric
+    d, i_f, rd, sp = structure_analysis(model, mirror=mirror, **kwargs)
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model, **kwargs)
+    for results, reference in [(d, d_ref), (i_f, i_f_ref)]:
+        scale = np.abs(reference.values).max()
+        np.testing.assert_allclose(results.values, reference.values, rtol=0, atol=1e-9 * scale)
+    np.testing.assert_allclose(np.array(rd, dtype=float), np.array(rd_ref, dtype=float), rtol=1e-8, atol=1e-6)
+    return
+
+
+def test_mirror_symmetric_supports():
+    model = get_model([[0, 1, 1, 0], [8, 1, 1, 0]])
+    assert_mirror_equals_direct(model, 'Auto')
+    assert_mirror_equals_direct(model, 20)
+
+
+def test_mirror_asymmetric_supports():
+    # A fixed and a sliding bearing
+    model = get_model([[0, 1, 1, 0], [8, 0, 1, 0]])
+    assert_mirror_equals_direct(model, 'Auto')
+    assert_mirror_equals_direct(model, 'Auto', condensation=True)
+    assert_mirror_equals_direct(model, 'Auto', discType='Elementwise', discElements=1)
+
+
+def test_mirror_asymmetric_structure():
+    # The structure is not symmetric, 'Auto' solves it directly
+    model = get_model([[0, 1, 1, 0], [8, 0, 1, 0]])
+    model['Beams']['Stiffness'][1] = [3e7, 5e5]
+    assert_mirror_equals_direct(model, 'Auto', symmetric=False)
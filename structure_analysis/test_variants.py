@@ -0,0 +1,65 @@
+import copy
+
+import numpy as np
+
+from structure_analysis import prepare_model, structure_analysis
+
+
+def get_model():
+    # A braced frame, the diagonal (beam 5) can be removed
+    nodes = {'Location': [[0, 0], [0, 10], [15, 10], [15, 0], [7.5, 14]]}
+    beams = {'Nodes': [[0, 1], [1, 2], [2, 3], [1, 4], [4, 2], [0, 2]],
+             'Stiffness': [[5.7e5, 3.886e3], [1.076e6, 1.671e4], [5.7e5, 3.886e3],
+                           [5.7e5, 3.886e3], [5.7e5, 3.886e3], [2e5, 1e2]],
+             'Releases': [[5, 1, 1]]}
+    loads = [{'Point': [[1, 7.37, 0, -10, 0]]},
+             {'Distributed': [[1, 2.43, 11.21, 0, -2, 0, 0, -5, 0]]},
+             {'Nodal': [[4, 3, -1, 2]], 'Initial Displacements': [[0, 0, 0.01, 0]]}]
+    boundary_conditions = {'Restricted Degrees': [[0, 1, 1, 1], [3, 1, 1, 0]],
+                           'Springs': [[2, 100, 0, 0]]}
+    return {'Nodes': nodes, 'Beams': beams, 'Loads': loads, 'Boundary Conditions': boundary_conditions}
+
+
+def assert_results_equal(results, reference):
+    scale = np.abs(reference).max()
+    np.testing.assert_allclose(results, reference, rtol=0, atol=1e-6 * scale)
+    return
+
+
+def test_changed_stiffness():
+    model = get_model()
+    changes = {1: [2e6, 5e4], 5: [4e5, 2e2]}
+    compiled_model = prepare_model(model)
+    d, i_f, rd, sp = compiled_model.solve_variant(model['Loads'], changes)
+
+    model_changed = copy.deepcopy(model)
+    for beam_nr, stiffness in changes.items():
+        model_changed['Beams']['Stiffness'][beam_nr] = stiffness
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model_changed)
+    assert_results_equal(d.values, d_ref.values)
+    assert_results_equal(i_f.values, i_f_ref.values)
+    assert_results_equal(np.array(rd, dtype=float), np.array(rd_ref, dtype=float))
+    assert_results_equal(np.array(sp, dtype=float), np.array(sp_ref, dtype=float))
+
+
+def test_removed_beam():
+    # Beams can only be removed if they have no interior nodes
+    model = get_model()
+    compiled_model = prepare_model(model, discType='Elementwise', discElements=1)
+    variant = compiled_model.prepare_variant({5: None})
+    location = np.array(model['Nodes']['Location'], dtype=float)
+    stations = [np.linspace(0, np.linalg.norm(location[end] - location[start]), 5)
+                for start, end in model['Beams']['Nodes']]
+    d, i_f, rd, sp = compiled_model.solve(model['Loads'], stations=stations, variant=variant)
+
+    model_removed = copy.deepcopy(model)
+    model_removed['Beams']['Nodes'].pop(5)
+    model_removed['Beams']['Stiffness'].pop(5)
+    model_removed['Beams']['Releases'] = []
+    d_ref, i_f_ref, rd_ref, sp_ref = structure_analysis(model_removed, discType='Elementwise', discElements=1,
+                                                        stations=stations[:5])
+    n = i_f_ref.offsets[-1]
+    assert_results_equal(d.values[:, :, :n], d_ref.values)
+    assert_results_equal(i_f.values[:, :, :n], i_f_ref.values)
+    assert not i_f.values[:, :, n:].any()
+    assert_results_equal(np.array(rd, dtype=float), np.array(rd_ref, dtype=float))
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+The module contains the stiffness variants of a compiled model.
+
+Design variants often only differ from a base model in the stiffness of a few
+beams (e.g. a changed hanger area or a removed hanger). The stiffness matrix of
+a variant is K + dK, where dK only contains the m degrees of freedom of the
+nodes of the changed beams. Writing dK = P^T D P with the selection P of these
+degrees of freedom and the dense matrix D (m, m), the Woodbury identity gives
+
+    (K + P^T D P)^-1 f = y - Z (I + D W)^-1 D P y
+
+    with y = K^-1 f, Z = K^-1 P^T and W = P Z
+
+The factorization of the compiled model is therefore reused: preparing a
+variant costs m back-substitutions, solving it the same back-substitutions as
+the base model and a dense system of size m. D does not need to be regular,
+such that removed beams are possible as well. The variant is not stable if
+I + D W is singular.
+
+Beams with interior nodes can only be changed if the model is not condensed,
+since the condensed stiffness of their interior nodes would change as well.
+They can not be removed, as their interior nodes would remain unsupported.
+"""
+
+import numpy as np
+import scipy.linalg as sl
+import scipy.sparse as sps
+
+from .assembly import get_stiffness_matrix
+from .factorization import solve_force_matrix
+
+
+class StiffnessVariant:
+    """A variant of a compiled model with changed stiffnesses of some beams.
+
+    Arguments:
+        compiled_model     -- the compiled base model (see compiled_model)
+        stiffness_changes  -- a dictionary of the numbers of the changed beams
+                              and their new normal, bending (and shear)
+                              stiffnesses. A stiffness None removes the beam.
+    """
+
+    def __init__(self, compiled_model, stiffness_changes):
+        self.compiled_model = compiled_model
+        beams = compiled_model.model['Beams']
+        disc_information = compiled_model.discretization_information
+        nodes_lists = disc_information['Nodes']
+
+        for beam_nr, stiffness in stiffness_changes.items():
+            if not 0 <= beam_nr < len(beams['Stiffness']):
+                raise Exception('The beam ' + str(beam_nr) + ' of the variant does not exist.')
+            if stiffness is not None and len(stiffness) < 2:
+                raise Exception('The stiffness of the beam ' + str(beam_nr) + ' is invalid.')
+            if stiffness is None and len(nodes_lists[beam_nr]) > 2:
+                raise Exception('The beam ' + str(beam_nr) + ' has interior nodes, it can '
+                                'not be removed.')
+            if compiled_model.condensation is not None and len(nodes_lists[beam_nr]) > 2:
+                raise Exception('The beam ' + str(beam_nr) + ' has interior nodes, it can '
+                                'not be changed in a condensed model.')
+
+        # The beams of the variant, removed beams keep their stiffness for the
+        # back calculation, their internal forces are set to zero afterwards.
+        self.beams = dict(beams)
+        self.beams['Stiffness'] = list(beams['Stiffness'])
+        self.removed_elements = []
+        for beam_nr, stiffness in stiffness_changes.items():
+            if stiffness is None:
+                self.removed_elements += disc_information['Elements'][beam_nr]
+            else:
+                self.beams['Stiffness'][beam_nr] = stiffness
+
+        # The stiffness difference of the variant.
+        size = compiled_model.stiffness_matrix.shape[0]
+        difference = get_stiffness_difference(stiffness_changes, beams['Stiffness'],
+                                              disc_information, size)
+        self.stiffness_matrix = compiled_model.stiffness_matrix + difference
+
+        # Split the difference according to the boundary conditions.
+        stiffness_matrices = compiled_model.stiffness_matrices
+        free_indices, restricted_indices, r, rt = stiffness_matrices[2:6]
+        if r is not None:
+            difference = r @ difference @ rt
+        difference = sps.csr_matrix(difference)
+        difference_modified = difference[free_indices][:, free_indices]
+        difference_supports = difference[restricted_indices][:, free_indices]
+
+        self.stiffness_matrices = list(stiffness_matrices)
+        self.stiffness_matrices[0] = stiffness_matrices[0] + difference_modified
+        self.stiffness_matrices[1] = stiffness_matrices[1] + difference_supports
+
+        self.factorization = WoodburyFactorization(compiled_model.factorization,
+                                                   difference_modified)
+        return
+
+    def remove_internal_forces(self, internal_forces):
+        """Sets the internal forces of the removed beams to zero.
+
+        Arguments:
+            internal_forces -- an array (6, elements, loadgroups) of the
+                               internal forces, which is updated
+        """
+        internal_forces[:, self.removed_elements, :] = 0
+        return
+
+
+class WoodburyFactorization:
+    """The factorization of a stiffness matrix with a low-rank difference.
+
+    It has the same method solve as the factorizations of the factorization
+    module, such that it can replace them.
+
+    Arguments:
+        factorization -- the factorization of the base stiffness matrix
+        difference    -- the sparse difference of the stiffness matrices
+    """
+
+    def __init__(self, factorization, difference):
+        difference = sps.csr_matrix(difference)
+        difference.eliminate_zeros()
+        degrees = np.union1d(*difference.nonzero()).astype(int)
+        size = difference.shape[0]
+
+        self.factorization = factorization
+        self.degrees = degrees
+        self.difference = difference[degrees][:, degrees].toarray()
+
+        # Z = K^-1 P^T, W = P Z and the capacitance matrix I + D W.
+        selection = sps.csr_matrix((np.ones(len(degrees)), (degrees, np.arange(len(degrees)))),
+                                   shape=(size, len(degrees)))
+        self.z_matrix = solve_force_matrix(factorization, selection)
+        capacitance = np.eye(len(degrees)) + self.difference @ self.z_matrix[degrees]
+
+        if len(degrees) and np.linalg.cond(capacitance) > 1e12:
+            raise Exception('The stiffness matrix of the variant is singular, the '
+                            'variant is not stable.')
+        self.capacitance = sl.lu_factor(capacitance) if len(degrees) else None
+        return
+
+    def solve(self, force_matrix):
+        """Returns the displacements of a force vector or matrix."""
+        displacements = self.factorization.solve(force_matrix)
+        if self.capacitance is None:
+            return displacements
+        correction = self.difference @ displacements[self.degrees]
+        correction = sl.lu_solve(self.capacitance, correction)
+        return displacements - self.z_matrix @ correction
+
+
+def get_stiffness_difference(stiffness_changes, beams_stiffness, discretization_information,
+                             size):
+    """Assembles the difference of the stiffness matrices of the changed beams.
+
+    Arguments:
+        stiffness_changes          -- a dictionary of the numbers of the changed
+                                      beams and their new stiffnesses (None
+                                      removes the beam)
+        beams_stiffness            -- a list of each beams original stiffnesses
+        discretization_information -- the dictionary containing the information
+                                      of the discretized system
+        size                       -- the size of the stiffness matrix
+
+    Return values:
+        difference -- the sparse stiffness matrix (size, size) of the new
+                      minus the original stiffnesses of the changed beams
+    """
+    beam_numbers = sorted(stiffness_changes)
+    nodes_lists = [discretization_information['Nodes'][i] for i in beam_numbers]
+    beams_information = [discretization_information['Beams Information'][i]
+                         for i in beam_numbers]
+    releases_beams = discretization_information['Releases']['Beams']
+    releases = {k: releases_beams[i] for k, i in enumerate(beam_numbers) if i in releases_beams}
+
+    difference = sps.csr_matrix((size, size))
+    if not beam_numbers:
+        return difference
+
+    # The stiffness matrix of the original and of the changed beams.
+    original = get_stiffness_matrix([beams_stiffness[i] for i in beam_numbers],
+                                    nodes_lists, releases, beams_information).tocoo()
+    difference -= sps.csr_matrix((original.data, (original.row, original.col)),
+                                 shape=(size, size))
+
+    changed = [k for k, i in enumerate(beam_numbers) if stiffness_changes[i] is not None]
+    if changed:
+        changed_matrix = get_stiffness_matrix([stiffness_changes[beam_numbers[k]] for k in changed],
+                                              [nodes_lists[k] for k in changed],
+                                              {n: releases[k] for n, k in enumerate(changed)
+                                               if k in releases},
+                                              [beams_information[k] for k in changed]).tocoo()
+        difference += sps.csr_matrix((changed_matrix.data, (changed_matrix.row,
+                                                            changed_matrix.col)),
+                                     shape=(size, size))
+    return difference
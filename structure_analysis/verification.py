@@ -46,12 +46,31 @@ def verify_input(model_original):
 
         Multiple initial displacements of the same node in the same load group are merged.
     """
-    model = deepcopy(model_original)
+    model, nodes_adapt_dict = verify_structure(model_original)
+    model['Loads'] = verify_loads(model_original['Loads'], model, nodes_adapt_dict)
+    return model
+
+
+def verify_structure(model_original):
+    """Checks and modifies the geometry and the boundary conditions of the model.
+
+    It carries out all verifications of verify_input which do not concern the
+    loads. The loads of the model are not copied, they are verified separately
+    by verify_loads.
+
+    Arguments:
+        model_original -- the structural model as a dictionary
+
+    Return values:
+        model            -- the verified copy of the model without its loads
+        nodes_adapt_dict -- a dictionary of the new node numbers, empty if no
+                            unused nodes were deleted
+    """
+    model = deepcopy({key: model_original[key] for key in model_original if key != 'Loads'})
     # Get the models information. Create an empty releases list if it was not specified.
     nodes = model['Nodes']['Location']
     beams_nodes = model['Beams']['Nodes']
     beams_stiffness = model['Beams']['Stiffness']
-    loads = model['Loads']
     if 'Releases' not in model['Beams']:
         model['Beams']['Releases'] = []
     if 'Rotated Degrees' not in model['Boundary Conditions']:
@@ -71,22 +90,6 @@ def verify_input(model_original):
         beam_nodes[1] = int(beam_nodes[1])
     for beam_releases in beams_releases:
         beam_releases[0] = int(beam_releases[0])
-    for load_group in loads:
-        if 'Nodal' in load_group and load_group['Nodal']:
-            for nodal_load in load_group['Nodal']:
-                nodal_load[0] = int(nodal_load[0])
-        if 'Point' in load_group and load_group['Point']:
-            for point_load in load_group['Point']:
-                point_load[0] = int(point_load[0])
-        if 'Distributed' in load_group and load_group['Distributed']:
-            for distributed_load in load_group['Distributed']:
-                distributed_load[0] = int(distributed_load[0])
-        if 'Functions' in load_group and load_group['Functions']:
-            for load_function in load_group['Functions']:
-                load_function[0] = int(load_function[0])
-        if 'Initial Displacements' in load_group and load_group['Initial Displacements']:
-            for initial_displacement in load_group['Initial Displacements']:
-                initial_displacement[0] = int(initial_displacement[0])
     for restricted_degree in restricted_degrees:
         restricted_degree[0] = int(restricted_degree[0])
         restricted_degree[1] = int(restricted_degree[1])
@@ -118,9 +121,9 @@ def verify_input(model_original):
             unused_nodes.append(i)
 
     # delete or modify any other input which is related to it
+    nodes_adapt_dict = {}
     if unused_nodes:
         counter = 0
-        nodes_adapt_dict = {}
         for i in range(len(nodes)):
             if i in unused_nodes:
                 counter += 1
@@ -133,6 +136,116 @@ def verify_input(model_original):
         for beam_nodes in beams_nodes:
             beam_nodes[0] = nodes_adapt_dict[beam_nodes[0]]
             beam_nodes[1] = nodes_adapt_dict[beam_nodes[1]]
+        for rotated_degree in rotated_degrees:
+            rotated_degree[0] = nodes_adapt_dict[rotated_degree[0]]
+        for restricted_degree in restricted_degrees:
+            restricted_degree[0] = nodes_adapt_dict[restricted_degree[0]]
+        for spring in springs:
+            spring[0] = nodes_adapt_dict[spring[0]]
+
+    # Check whether some nodes are connected to nothing but releases.
+    released_nodes = []
+    for i in range(len(nodes)):
+        # Count how many times the node is used in a beam:
+        times_used = sum([nodes[0] == i or nodes[1] == i for nodes in beams_nodes])
+
+        times_released = sum([((beams_nodes[release[0]][0] == i and release[1] == 1) or
+                               (beams_nodes[release[0]][1] == i and release[2] == 1))
+                              for release in beams_releases])
+        if times_used == times_released:
+            released_nodes.append(i)
+    if released_nodes:
+        for released_node in released_nodes:
+            for release in beams_releases:
+                if beams_nodes[release[0]][0] == released_node and release[1] == 1:
+                    release[1] = 0
+                    break
+                if beams_nodes[release[0]][1] == released_node and release[2] == 1:
+                    release[2] = 0
+                    break
+        warnings.warn('Each node needs at least one beam with a clamped release.'
+                      'The following nodes releases were altered: ' + str(released_nodes), Warning)
+
+    # Check whether some nodes were restricted more than once.
+    multiple_restrictions = []
+    multiple_restricted_nodes = []
+    for i in range(len(restricted_degrees)):
+        for j in range(i):
+            if restricted_degrees[i][0] == restricted_degrees[j][0]:
+                restricted_degrees[j][1] = max(restricted_degrees[j][1],
+                                               restricted_degrees[i][1])
+                restricted_degrees[j][2] = max(restricted_degrees[j][2],
+                                               restricted_degrees[i][2])
+                restricted_degrees[j][3] = max(restricted_degrees[j][3],
+                                               restricted_degrees[i][3])
+                multiple_restricted_nodes.append((j, i))
+                multiple_restrictions.append(i)
+                break
+    if multiple_restrictions:
+        multiple_restrictions.sort(reverse=True)
+        for i in multiple_restrictions:
+            restricted_degrees.pop(i)
+        # warnings.warn('The following restricted degrees were merged, because their nodes'
+        #               'are the same: ' + str(multiple_restricted_nodes), Warning)
+
+    # # Check whether the system is kinematically stable. Define discElements as 1
+    # # and check whether the stiffness matrix is regular.
+    # discretization_information = discretize(model['Nodes'], model['Beams'], discType='Elementwise', discElements=1)
+    # nodes_lists = discretization_information['Nodes']
+    # releases_beams = discretization_information['Releases']['Beams']
+    # beams_information = discretization_information['Beams Information']
+    #
+    # stiffness_mat = get_stiffness_matrix(beams_stiffness, nodes_lists, releases_beams, beams_information)
+    # force_mat = np.ones((len(nodes) * 3, 1))
+    # modified_matrices = apply_boundary_conditions(model['Boundary Conditions'], stiffness_mat, force_mat)
+    # if modified_matrices[0].shape[0] != 0:
+    #     rank = np.linalg.matrix_rank(modified_matrices[0].toarray())
+    #     n_dofs = modified_matrices[0].shape[0]
+    #     if rank != n_dofs:
+    #         print("The rank is not full! Number of dofs:" + str(n_dofs))
+    #         # raise Exception('The system is kinematically unstable.')
+
+    return model, nodes_adapt_dict
+
+
+def verify_loads(loads_original, model, nodes_adapt_dict):
+    """Checks and modifies the loads of a model verified by verify_structure.
+
+    It carries out all verifications of verify_input which concern the loads.
+
+    Arguments:
+        loads_original   -- a list containing the loadgroups of the model
+        model            -- the verified model (see verify_structure)
+        nodes_adapt_dict -- a dictionary of the new node numbers, empty if no
+                            unused nodes were deleted
+
+    Return values:
+        loads -- the verified copy of the loads
+    """
+    loads = deepcopy(loads_original)
+    nodes = model['Nodes']['Location']
+    beams_nodes = model['Beams']['Nodes']
+
+    # Convert to integer values in case floats were given
+    for load_group in loads:
+        if 'Nodal' in load_group and load_group['Nodal']:
+            for nodal_load in load_group['Nodal']:
+                nodal_load[0] = int(nodal_load[0])
+        if 'Point' in load_group and load_group['Point']:
+            for point_load in load_group['Point']:
+                point_load[0] = int(point_load[0])
+        if 'Distributed' in load_group and load_group['Distributed']:
+            for distributed_load in load_group['Distributed']:
+                distributed_load[0] = int(distributed_load[0])
+        if 'Functions' in load_group and load_group['Functions']:
+            for load_function in load_group['Functions']:
+                load_function[0] = int(load_function[0])
+        if 'Initial Displacements' in load_group and load_group['Initial Displacements']:
+            for initial_displacement in load_group['Initial Displacements']:
+                initial_displacement[0] = int(initial_displacement[0])
+
+    # Adapt the node numbers if unused nodes were deleted.
+    if nodes_adapt_dict:
         for load_group in loads:
             if 'Nodal' in load_group and load_group['Nodal']:
                 for nodal_load in load_group['Nodal']:
@@ -140,12 +253,6 @@ def verify_input(model_original):
             if 'Initial Displacements' in load_group and load_group['Initial Displacements']:
                 for initial_displacement in load_group['Initial Displacements']:
                     initial_displacement[0] = nodes_adapt_dict[initial_displacement[0]]
-        for rotated_degree in rotated_degrees:
-            rotated_degree[0] = nodes_adapt_dict[rotated_degree[0]]
-        for restricted_degree in restricted_degrees:
-            restricted_degree[0] = nodes_adapt_dict[restricted_degree[0]]
-        for spring in springs:
-            spring[0] = nodes_adapt_dict[spring[0]]
 
     # Modify the loads.
     beam_information = get_beams_length_angle(nodes, beams_nodes)
@@ -209,51 +316,6 @@ def verify_input(model_original):
                         load_function[2] > beam_information[load_function[0]][0] * 1.0001):
                     raise Exception('A functional load exceeds its beam.')
 
-    # Check whether some nodes are connected to nothing but releases.
-    released_nodes = []
-    for i in range(len(nodes)):
-        # Count how many times the node is used in a beam:
-        times_used = sum([nodes[0] == i or nodes[1] == i for nodes in beams_nodes])
-
-        times_released = sum([((beams_nodes[release[0]][0] == i and release[1] == 1) or
-                               (beams_nodes[release[0]][1] == i and release[2] == 1))
-                              for release in beams_releases])
-        if times_used == times_released:
-            released_nodes.append(i)
-    if released_nodes:
-        for released_node in released_nodes:
-            for release in beams_releases:
-                if beams_nodes[release[0]][0] == released_node and release[1] == 1:
-                    release[1] = 0
-                    break
-                if beams_nodes[release[0]][1] == released_node and release[2] == 1:
-                    release[2] = 0
-                    break
-        warnings.warn('Each node needs at least one beam with a clamped release.'
-                      'The following nodes releases were altered: ' + str(released_nodes), Warning)
-
-    # Check whether some nodes were restricted more than once.
-    multiple_restrictions = []
-    multiple_restricted_nodes = []
-    for i in range(len(restricted_degrees)):
-        for j in range(i):
-            if restricted_degrees[i][0] == restricted_degrees[j][0]:
-                restricted_degrees[j][1] = max(restricted_degrees[j][1],
-                                               restricted_degrees[i][1])
-                restricted_degrees[j][2] = max(restricted_degrees[j][2],
-                                               restricted_degrees[i][2])
-                restricted_degrees[j][3] = max(restricted_degrees[j][3],
-                                               restricted_degrees[i][3])
-                multiple_restricted_nodes.append((j, i))
-                multiple_restrictions.append(i)
-                break
-    if multiple_restrictions:
-        multiple_restrictions.sort(reverse=True)
-        for i in multiple_restrictions:
-            restricted_degrees.pop(i)
-        # warnings.warn('The following restricted degrees were merged, because their nodes'
-        #               'are the same: ' + str(multiple_restricted_nodes), Warning)
-
     # Check whether one node has more than one initial displacement in the same loadgroup.
     for load_group in loads:
         multiple_displacements = []
@@ -272,24 +334,7 @@ def verify_input(model_original):
             for i in multiple_displacements:
                 load_group['Initial Displacements'].pop(i)
 
-    # # Check whether the system is kinematically stable. Define discElements as 1
-    # # and check whether the stiffness matrix is regular.
-    # discretization_information = discretize(model['Nodes'], model['Beams'], discType='Elementwise', discElements=1)
-    # nodes_lists = discretization_information['Nodes']
-    # releases_beams = discretization_information['Releases']['Beams']
-    # beams_information = discretization_information['Beams Information']
-    #
-    # stiffness_mat = get_stiffness_matrix(beams_stiffness, nodes_lists, releases_beams, beams_information)
-    # force_mat = np.ones((len(nodes) * 3, 1))
-    # modified_matrices = apply_boundary_conditions(model['Boundary Conditions'], stiffness_mat, force_mat)
-    # if modified_matrices[0].shape[0] != 0:
-    #     rank = np.linalg.matrix_rank(modified_matrices[0].toarray())
-    #     n_dofs = modified_matrices[0].shape[0]
-    #     if rank != n_dofs:
-    #         print("The rank is not full! Number of dofs:" + str(n_dofs))
-    #         # raise Exception('The system is kinematically unstable.')
-
-    return model
+    return loads
 
 
 def get_beams_length_angle(nodes, beams_nodes):
@@ -51,13 +51,16 @@ class CrossSection:
         return
 
     def assign_extrema(self, effects, name, key):
+        self.update_extrema(np.max(effects), np.min(effects), name, key)
+        return
+
+    def update_extrema(self, effect_max, effect_min, name, key):
         if name not in self.effects:
             self.effects[name] = {}
-            self.effects[name] = {}
         if key not in self.effects[name]:
             self.effects[name][key] = [-inf, inf, 0, 0]
-        e_max = max(self.effects[name][key][0], np.max(effects))
-        e_min = min(self.effects[name][key][1], np.min(effects))
+        e_max = max(self.effects[name][key][0], effect_max)
+        e_min = min(self.effects[name][key][1], effect_min)
         e_amax = max(e_max, -e_min)
         self.effects[name][key][0] = e_max
         self.effects[name][key][1] = e_min
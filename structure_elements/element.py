@@ -1,9 +1,37 @@
+from functools import lru_cache
+
 import numpy as np
 
+from .load_cases import LoadCaseTable
+
 
 class Element:
+    # Amount of requested effects (get_effects and get_range) and of evaluated expressions
+    # which were not memoized, counted for all elements (see bridges.build_profiler)
+    effects_requests = 0
+    effects_evaluations = 0
+
     def __init__(self):
         self.effects = {}
+        # Memoized results of effect expressions and the expressions depending on each name
+        self.effects_memo = {}
+        self.effects_dependencies = {}
+        # Stacked 1-D effects for linear combinations (see load_cases)
+        self.load_cases = LoadCaseTable()
+        return
+
+    def __getstate__(self):
+        # The memoized results and the stacked load cases are rebuilt when needed
+        state = self.__dict__.copy()
+        for name in ('effects_memo', 'effects_dependencies', 'load_cases'):
+            state.pop(name, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.effects_memo = {}
+        self.effects_dependencies = {}
+        self.load_cases = LoadCaseTable()
         return
 
     def set_effects(self, effects, name, key=None):
@@ -16,22 +44,26 @@ class Element:
             if type(effects) is list:
                 self.effects[name][key] = np.array(connect_inner_lists(effects))
             else:
-                self.effects[name][key] = effects
+                self.effects[name][key] = writable(effects)
+            self.invalidate_effects(name)
+        return
+
+    def invalidate_effects(self, name):
+        # Effects changed without set_effects need to be invalidated as well
+        for memo_key in self.effects_dependencies.pop(name, ()):
+            self.effects_memo.pop(memo_key, None)
+        self.load_cases.remove(name)
         return
 
     def get_effects(self, name, key=''):
+        Element.effects_requests += 1
         name = name.replace(' - ', ' + -1 ')
-        if name in self.effects:
-            effects = self.effects[name]
-        elif ' + ' in name:
-            names = name.split(' + ')
-            effects = add_effects(*(self.get_effects(name) for name in names))
-        elif ' ' in name:
-            names = name.split(' ', 1)
-            factor = float(names[0])
-            effects = multiply_effect(self.get_effects(names[1]), factor)
-        else:
+        effects, names = self.evaluate_effects(parse_effects(name))
+        if effects is None:
             return
+        # The stored and memoized arrays are returned as read-only views, changes
+        # of the effects have to use set_effects
+        effects = read_only(effects)
 
         if key:
             if key in effects:
@@ -41,23 +73,118 @@ class Element:
         else:
             return effects
 
-    def get_range(self, range_name, name=''):
-        if ', ' in range_name:
-            names = range_name.split(', ')
-            range_new = add_ranges(*(self.get_range(name) for name in names))
-        elif '/' in range_name:
-            names = range_name.split('/')
-            range_new = merge_ranges(*(self.get_range(name) for name in names))
+    def evaluate_effects(self, expression):
+        # The effects of a parsed expression and the names of the effects it depends on
+        kind, name = expression[0], expression[1]
+        if name in self.effects:
+            return self.effects[name], (name,)
+        if kind == 'Name':
+            return None, ()
+        if name in self.effects_memo:
+            return self.effects_memo[name]
+
+        coefficients = self.get_coefficients(expression) if kind == 'Sum' else None
+        if coefficients:
+            # Linear combinations of 1-D effects are one product per key
+            keys = list(self.effects[next(iter(coefficients))])
+            effects = self.load_cases.combine(self.effects, coefficients, keys)
+            names = tuple(coefficients)
+        elif kind == 'Sum':
+            terms = [self.evaluate_effects(term) for term in expression[2]]
+            effects = add_effects(*(term[0] for term in terms))
+            names = tuple(set().union(*(term[1] for term in terms)))
         else:
-            effects = self.get_effects(range_name)
-            if effects['Normal Force'].ndim == 2:
-                range_new = effects
-            else:
-                range_new = range_from_effect(effects)
+            effects, names = self.evaluate_effects(expression[3])
+            effects = multiply_effect(effects, expression[2])
+        return self.memoize_effects(name, effects, names)
+
+    def get_coefficients(self, expression, factor=1.0, coefficients=None):
+        # The coefficients of the stored 1-D effects of a linear expression, None otherwise
+        if coefficients is None:
+            coefficients = {}
+        kind, name = expression[0], expression[1]
+        if name in self.effects:
+            effects = self.effects[name]
+            if not effects or any(np.ndim(value) != 1 for value in effects.values()):
+                return
+            coefficients[name] = coefficients.get(name, 0) + factor
+        elif kind == 'Sum':
+            for term in expression[2]:
+                if self.get_coefficients(term, factor, coefficients) is None:
+                    return
+        elif kind == 'Product':
+            if self.get_coefficients(expression[3], factor * expression[2], coefficients) is None:
+                return
+        else:
+            return
+        return coefficients
+
+    def memoize_effects(self, memo_key, effects, names):
+        Element.effects_evaluations += 1
+        # The memoized arrays are shared, they are therefore read-only
+        for value in effects.values():
+            if isinstance(value, np.ndarray):
+                value.flags.writeable = False
+        self.effects_memo[memo_key] = (effects, names)
+        for name in names:
+            self.effects_dependencies.setdefault(name, set()).add(memo_key)
+        return effects, names
+
+    def get_range(self, range_name, name=''):
+        Element.effects_requests += 1
+        range_new, names = self.evaluate_range(parse_range(range_name))
+        range_new = read_only(range_new)
         if name:
             self.set_effects(range_new, name)
         return range_new
 
+    def evaluate_range(self, expression):
+        # The range of a parsed range expression and the names of the effects it depends on
+        kind, range_name = expression[0], expression[1]
+        memo_key = ('Range', range_name)
+        if memo_key in self.effects_memo:
+            return self.effects_memo[memo_key]
+
+        if kind == 'Effects':
+            effects, names = self.evaluate_effects(expression[2])
+            if effects['Normal Force'].ndim == 2:
+                return effects, names
+            range_new = range_from_effect(effects)
+        else:
+            range_new, names = self.get_envelope(expression)
+        return self.memoize_effects(memo_key, range_new, names)
+
+    def get_envelope(self, expression):
+        # A range expression is a sum of envelopes over alternatives, e.g. '0, 0/F1, 0/F2'
+        # or '0/F1/F2'. The parts with the same amount of alternatives are stacked
+        # (parts, alternatives, stations) and reduced at once.
+        parts = expression[2] if expression[0] == 'Add' else (expression,)
+        groups = {}
+        names = set()
+        keys = None
+        for part in parts:
+            alternatives = []
+            for leaf in (part[2] if part[0] == 'Merge' else (part,)):
+                effects, leaf_names = self.evaluate_effects(leaf[2])
+                alternatives.append(effects)
+                names.update(leaf_names)
+            groups.setdefault(len(alternatives), []).append(alternatives)
+            if keys is None:
+                keys = list(alternatives[0])
+
+        envelope = {}
+        for key in keys:
+            maxima = 0
+            minima = 0
+            for group in groups.values():
+                values = [[effects[key] for effects in alternatives] for alternatives in group]
+                maxima = maxima + np.array([[value if value.ndim == 1 else value[0] for value in row]
+                                            for row in values]).max(axis=1).sum(axis=0)
+                minima = minima + np.array([[value if value.ndim == 1 else value[1] for value in row]
+                                            for row in values]).min(axis=1).sum(axis=0)
+            envelope[key] = np.vstack((maxima, minima))
+        return envelope, tuple(names)
+
     def add_key(self, name, key, value):
         effects = self.get_effects(name)
         key_ref = list(effects.keys())[0]
@@ -66,6 +193,51 @@ class Element:
         return
 
 
+@lru_cache(maxsize=1024)
+def parse_effects(name):
+    # Effect expressions like 'EL + 1.25 DC' are parsed once into a tree of
+    # ('Name', name), ('Sum', name, terms) and ('Product', name, factor, term)
+    if ' + ' in name:
+        return 'Sum', name, tuple(parse_effects(term) for term in name.split(' + '))
+    if ' ' in name:
+        factor, term = name.split(' ', 1)
+        try:
+            return 'Product', name, float(factor), parse_effects(term)
+        except ValueError:
+            # Names containing spaces (e.g. 'Tie Fracture')
+            pass
+    return 'Name', name
+
+
+@lru_cache(maxsize=1024)
+def parse_range(range_name):
+    # Range expressions like 'EL, 1.25 DC/0.9 DC' are parsed once into a tree of
+    # ('Effects', name, effects), ('Add', name, parts) and ('Merge', name, parts)
+    if ', ' in range_name:
+        return 'Add', range_name, tuple(parse_range(part) for part in range_name.split(', '))
+    if '/' in range_name:
+        return 'Merge', range_name, tuple(parse_range(part) for part in range_name.split('/'))
+    return 'Effects', range_name, parse_effects(range_name)
+
+
+def read_only(effects):
+    # A new dictionary of read-only views of the arrays of the effects
+    effects_new = {}
+    for key, value in effects.items():
+        if isinstance(value, np.ndarray):
+            value = value.view()
+            value.flags.writeable = False
+        effects_new[key] = value
+    return effects_new
+
+
+def writable(effects):
+    # Memoized arrays are read-only, stored effects get their own copy
+    if isinstance(effects, np.ndarray) and not effects.flags.writeable:
+        return effects.copy()
+    return effects
+
+
 def connect_inner_lists(effect):
     results = []
     for list_i in effect:
@@ -94,19 +266,3 @@ def range_from_effect(effect):
     for key in effect:
         range_new[key] = np.vstack((effect[key], effect[key]))
     return range_new
-
-
-def merge_ranges(*ranges):
-    range_merged = {}
-    for key in ranges[0]:
-        max_stacked = np.vstack(tuple((range_i[key][0] for range_i in ranges)))
-        min_stacked = np.vstack(tuple((range_i[key][1] for range_i in ranges)))
-        range_merged[key] = np.zeros_like(ranges[0][key])
-        range_merged[key][0] = np.max(max_stacked, axis=0)
-        range_merged[key][1] = np.min(min_stacked, axis=0)
-    return range_merged
-
-
-def add_ranges(*ranges):
-    range_added = add_effects(*ranges)
-    return range_added
@@ -2,7 +2,7 @@ import numpy as np
 from matplotlib import pyplot
 
 from .hanger_set import HangerSet
-from ..element import Element
+from ..element import Element, writable
 
 
 class Hangers(Element):
@@ -100,7 +100,9 @@ class Hangers(Element):
 
     def set_effects(self, effects_i, name, key=None):
         key = 'Normal Force'
+        effects_i = {effect_key: writable(effects_i[effect_key]) for effect_key in effects_i}
         self.effects[name] = effects_i
+        self.invalidate_effects(name)
         for i, hanger in enumerate(self):
             if effects_i[key].ndim == 1:
                 hanger.effects_N[name] = effects_i[key][i]
@@ -167,7 +169,7 @@ class Hangers(Element):
         if 'Cable_Replacement' in name:
             resistances *= 0.8/0.65
         if 'Fatigue' in name:
-            values -= values[1, :]
+            values = values - values[1, :]
             resistances *= 55 / 1675 / 0.65
         if not dc:
             resistances = 1000
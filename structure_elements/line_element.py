@@ -1,8 +1,11 @@
+from collections import OrderedDict
+
 import numpy as np
 from matplotlib.patches import Polygon
 
-from structure_analysis import structure_analysis
+from structure_analysis import prepare_model
 from structure_elements.element import Element, multiply_effect
+from structure_elements.section_groups import SectionGroups
 
 
 class LineElement(Element):
@@ -11,17 +14,86 @@ class LineElement(Element):
         self.nodes = []
         self.cross_sections = []
         # self.regions = []
+        self.compiled_models = OrderedDict()
+        # Station geometry of the nodes and the cross-sections (see get_geometry)
+        self.geometry = {}
         return
 
     def __len__(self):
         return len(self.nodes) - 1
 
+    def __getstate__(self):
+        # The compiled models contain factorizations, which cannot be pickled
+        state = super().__getstate__()
+        state['compiled_models'] = OrderedDict()
+        state['geometry'] = {}
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self.compiled_models = OrderedDict()
+        self.geometry = {}
+        return
+
+    def invalidate_geometry(self):
+        # Changes of the nodes or the cross-sections without insert_node and
+        # define_cross_sections need to be invalidated as well
+        self.geometry = {}
+        return
+
+    def get_geometry(self):
+        # The coordinates, normal vectors, stations and segments of all stations,
+        # the effects are given at about every meter of each segment
+        if 'Coordinates' not in self.geometry:
+            x = np.array([node.x for node in self.nodes], dtype=float)
+            y = np.array([node.y for node in self.nodes], dtype=float)
+            dx = x[:-1] - x[1:]
+            dy = y[:-1] - y[1:]
+            dl = np.sqrt(dx ** 2 + dy ** 2)
+            n = np.ceil(dl).astype(int) + 1
+
+            # Position of each station within its segment as in np.linspace
+            segments = np.repeat(np.arange(len(n)), n)
+            k = np.arange(len(segments)) - np.repeat(np.cumsum(n) - n, n)
+            last = np.cumsum(n) - 1
+            div = np.maximum(n - 1, 1)
+            stations = k * (dl / div)[segments]
+            stations[last] = dl
+            xy_coord = np.empty((len(segments), 2))
+            xy_coord[:, 0] = k * (-dx / div)[segments] + x[:-1][segments]
+            xy_coord[:, 1] = k * (-dy / div)[segments] + y[:-1][segments]
+            xy_coord[last, 0] = x[1:]
+            xy_coord[last, 1] = y[1:]
+            xy_norm = np.vstack(((dy / dl)[segments], (-dx / dl)[segments])).transpose()
+
+            self.geometry['Coordinates'] = read_only(xy_coord)
+            self.geometry['Normal Vectors'] = read_only(xy_norm)
+            self.geometry['Stations'] = [read_only(station) for station in np.split(stations, last[:-1] + 1)]
+            self.geometry['Segments'] = read_only(segments)
+        return self.geometry
+
+    def get_section_indices(self):
+        # The index of the cross-section at each station and the distinct cross-sections
+        if 'Section Indices' not in self.geometry:
+            cross_sections = []
+            indices = {}
+            for cs in self.cross_sections:
+                if cs not in indices:
+                    indices[cs] = len(cross_sections)
+                    cross_sections.append(cs)
+            segment_indices = np.array([indices[cs] for cs in self.cross_sections], dtype=int)
+            self.geometry['Section Indices'] = read_only(segment_indices[self.get_geometry()['Segments']])
+            self.geometry['Cross-Sections'] = cross_sections
+        return self.geometry['Section Indices'], self.geometry['Cross-Sections']
+
+    def get_section_groups(self):
+        # The stations grouped by their cross-section (see section_groups)
+        if 'Section Groups' not in self.geometry:
+            self.geometry['Section Groups'] = SectionGroups(*self.get_section_indices())
+        return self.geometry['Section Groups']
+
     def effect_length(self):
-        n = 0
-        for i in range(len(self.nodes) - 1):
-            dl = self.get_coordinate_step(i)[4]
-            n += int(np.ceil(dl)) + 1
-        return n
+        return len(self.get_geometry()['Segments'])
 
     def insert_node(self, nodes, x, y=None):
         if y is None:
@@ -36,6 +108,7 @@ class LineElement(Element):
                     self.nodes.insert(i + 1, node)
                     if self.cross_sections:
                         self.cross_sections.insert(i, self.cross_sections[i])
+                    self.invalidate_geometry()
                     break
         return node
 
@@ -49,6 +122,7 @@ class LineElement(Element):
         if section_nodes and type(section_nodes) is list:
             section_nodes = [self.insert_node(nodes, x) for x in section_nodes]
         self.cross_sections = []
+        self.invalidate_geometry()
         section_nodes += [self.nodes[-1]]
 
         for cross_section in cross_sections:
@@ -113,15 +187,7 @@ class LineElement(Element):
 
     def assign_range_to_sections(self, name):
         effects = self.get_effects(name)
-        cs_i = self.get_cross_sections()
-        for cs in set(self.cross_sections):
-            mask = cs_i == cs
-            for key in effects:
-                if effects[key].ndim == 1:
-                    cs.assign_extrema(effects[key][mask], name, key)
-                else:
-                    cs.assign_extrema(effects[key][:, mask], name, key)
-            cs.calculate_doc_max(name)
+        self.get_section_groups().assign_extrema(effects, name)
         return
 
     def get_coordinate_step(self, i):
@@ -133,45 +199,23 @@ class LineElement(Element):
         return x, y, dx, dy, dl
 
     def get_coordinates(self):
-        xy_coord = np.empty((0, 2))
-        for i in range(len(self.nodes) - 1):
-            x, y, dx, dy, dl = self.get_coordinate_step(i)
-            x = np.linspace(*x, num=int(np.ceil(dl)) + 1)
-            y = np.linspace(*y, num=int(np.ceil(dl)) + 1)
-            xy_coord = np.vstack((xy_coord, np.vstack((x, y)).transpose()))
-        return xy_coord
+        return self.get_geometry()['Coordinates']
+
+    def get_stations(self):
+        # The effects are given at the same points as the coordinates
+        return list(self.get_geometry()['Stations'])
 
     def get_normal_vector(self):
-        x_norm = []
-        y_norm = []
-        for i in range(len(self.nodes) - 1):
-            x, y, dx, dy, dl = self.get_coordinate_step(i)
-            n = int(np.ceil(dl)) + 1
-            x_norm.extend([dy / dl]*n)
-            y_norm.extend([-dx / dl]*n)
-        xy_norm = np.array([x_norm, y_norm]).transpose()
-        return xy_norm
+        return self.get_geometry()['Normal Vectors']
 
     def get_cross_sections(self):
-        cs_i = []
-        for i in range(len(self.nodes) - 1):
-            dl = self.get_coordinate_step(i)[4]
-            cs_i.extend([self.cross_sections[i]] * (int(np.ceil(dl)) + 1))
-        cs_i = np.array(cs_i)
-        return cs_i
+        indices, cross_sections = self.get_section_indices()
+        cs_i = np.empty(len(cross_sections), dtype=object)
+        cs_i[:] = cross_sections
+        return cs_i[indices]
 
     def calculate_doc(self, name):
-        cs_i = self.get_cross_sections()
-        dc_1 = np.zeros_like(self.effects[name]['Normal Force'])
-        dc_2 = np.zeros_like(self.effects[name]['Normal Force'])
-        if 'Normal Force' in self.effects[name]:
-            resistances_n = np.array([cs.normal_force_resistance for cs in cs_i])
-            dc_1 += self.effects[name]['Normal Force'] / resistances_n
-            dc_2 += self.effects[name]['Normal Force'] / resistances_n
-        if 'Moment' in self.effects[name]:
-            resistances_mz = np.array([cs.moment_z_resistance for cs in cs_i])
-            dc_1 += 8/9 * self.effects[name]['Moment'] / resistances_mz
-            dc_2 -= 8/9 * self.effects[name]['Moment'] / resistances_mz
+        dc_1, dc_2 = self.get_section_groups().get_doc(self.effects[name])
         self.set_effects(dc_1, name, 'D/C_1')
         self.set_effects(dc_2, name, 'D/C_2')
         return
@@ -245,13 +289,29 @@ class LineElement(Element):
         min_value = np.min(values)
         return max_value, min_value
 
-    def assign_permanent_effects(self, nodes, hangers, f_x, m_z, plots=False):
-        # Define the list of all nodes
-        structural_nodes = nodes.structural_nodes()
+    def get_compiled_model(self, nodes, boundary_conditions):
+        # Only compile the model again if the structure has changed, the key consists of
+        # the node coordinates, the beams and the boundary conditions
         beams_nodes, beams_stiffness = self.get_beams()
+        key = (tuple((node.x, node.y) for node in nodes.nodes),
+               tuple((i, j) for i, j in beams_nodes),
+               tuple(tuple(stiffness) for stiffness in beams_stiffness),
+               tuple((name, tuple(tuple(row) for row in rows))
+                     for name, rows in sorted(boundary_conditions.items())))
+        if key in self.compiled_models:
+            self.compiled_models.move_to_end(key)
+            return self.compiled_models[key]
+
         beams = {'Nodes': beams_nodes, 'Stiffness': beams_stiffness}
-        load_group = self.permanent_loads()
+        model = {'Nodes': nodes.structural_nodes(), 'Beams': beams,
+                 'Boundary Conditions': boundary_conditions}
+        self.compiled_models[key] = prepare_model(model, discType='Lengthwise', discLength=1)
+        # Evict the least recently used models
+        while len(self.compiled_models) > 4:
+            self.compiled_models.popitem(last=False)
+        return self.compiled_models[key]
 
+    def self_stress_loads(self, hangers, f_x, m_z):
         load_nodal = [[self.nodes[0].index, f_x, 0, -m_z], [self.nodes[-1].index, -f_x, 0, m_z]]
 
         # Apply hanger forces
@@ -266,6 +326,24 @@ class LineElement(Element):
                 vertical_force = -hanger.prestressing_force * np.sin(hanger.inclination)
                 horizontal_force = -hanger.prestressing_force * np.cos(hanger.inclination)
                 load_nodal.append([node, horizontal_force, vertical_force, 0])
+        load_group = {'Nodal': load_nodal}
+        return load_group
+
+    def permanent_boundary_conditions(self):
+        restricted_degrees = [[self.nodes[0].index, 1, 1, 0, 0], [self.nodes[-1].index, 0, 1, 0, 0]]
+        boundary_conditions = {'Restricted Degrees': restricted_degrees}
+        return boundary_conditions
+
+    def permanent_moments(self, nodes, loads):
+        # Calculate the moments of several load groups with a single analysis
+        compiled_model = self.get_compiled_model(nodes, self.permanent_boundary_conditions())
+        d, i_f, rd, sp = compiled_model.solve(loads)
+        moments = list(i_f.array('Moment'))
+        return moments
+
+    def assign_permanent_effects(self, nodes, hangers, f_x, m_z, plots=False):
+        load_group = self.permanent_loads()
+        load_nodal = self.self_stress_loads(hangers, f_x, m_z)['Nodal']
 
         # Assign the load group
         if 'Nodal' in load_group:
@@ -273,13 +351,17 @@ class LineElement(Element):
         else:
             load_group['Nodal'] = load_nodal
         loads = [load_group]
-        restricted_degrees = [[self.nodes[0].index, 1, 1, 0, 0], [self.nodes[-1].index, 0, 1, 0, 0]]
-        boundary_conditions = {'Restricted Degrees': restricted_degrees}
-        model = {'Nodes': structural_nodes, 'Beams': beams, 'Loads': loads,
-                 'Boundary Conditions': boundary_conditions}
-        d, i_f, rd, sp = structure_analysis(model, discType='Lengthwise', discLength=1)
+        boundary_conditions = self.permanent_boundary_conditions()
+        compiled_model = self.get_compiled_model(nodes, boundary_conditions)
+        d, i_f, rd, sp = compiled_model.solve(loads)
 
-        self.set_effects(i_f[0], 'Permanent')
+        self.set_effects(i_f[0].arrays(), 'Permanent')
         effects = self.get_effects('Permanent')
         self.set_effects(multiply_effect(effects, 0), '0')
         return
+
+
+def read_only(array):
+    # The cached geometry is shared, it is therefore read-only
+    array.flags.writeable = False
+    return array
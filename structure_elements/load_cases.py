@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class LoadCaseTable:
+    # The 1-D effects of the load cases of an element are stacked in one array
+    # (cases, stations) per key, a linear combination of the load cases is then
+    # a single product with the vector of its coefficients
+    def __init__(self):
+        self.arrays = {}
+        self.rows = {}
+        self.sizes = {}
+        return
+
+    def remove(self, name):
+        # The row of a changed load case is added again when it is needed
+        for rows in self.rows.values():
+            rows.pop(name, None)
+        return
+
+    def get_rows(self, effects, names, key):
+        rows = self.rows.setdefault(key, {})
+        missing = [name for name in names if name not in rows]
+        if missing:
+            values = np.array([effects[name][key] for name in missing], dtype=float)
+            if not self.append(key, missing, values):
+                return self.get_rows(effects, names, key)
+        return [rows[name] for name in names]
+
+    def append(self, key, names, values):
+        array = self.arrays.get(key)
+        rows = self.rows[key]
+        size = self.sizes.get(key, 0)
+        if array is None or array.shape[1] != values.shape[1]:
+            # The stations have changed, all rows are added again
+            self.arrays[key] = np.empty((0, values.shape[1]))
+            self.sizes[key] = 0
+            if rows:
+                rows.clear()
+                return False
+            array, size = self.arrays[key], 0
+
+        # Compact the rows in use and double the capacity if the array is full
+        if size + len(values) > len(array):
+            used = list(rows.values())
+            array_new = np.empty((2 * (len(used) + len(values)), values.shape[1]))
+            array_new[:len(used)] = array[used]
+            for i, name in enumerate(rows):
+                rows[name] = i
+            array = array_new
+            size = len(used)
+
+        array[size:size + len(values)] = values
+        for i, name in enumerate(names):
+            rows[name] = size + i
+        self.arrays[key] = array
+        self.sizes[key] = size + len(values)
+        return True
+
+    def combine(self, effects, coefficients, keys):
+        names = list(coefficients)
+        factors = np.array([coefficients[name] for name in names])
+        combination = {}
+        for key in keys:
+            rows = self.get_rows(effects, names, key)
+            combination[key] = factors @ self.arrays[key][rows]
+        return combination
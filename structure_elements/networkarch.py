@@ -1,7 +1,7 @@
 import numpy as np
 
 from structure_analysis import structure_analysis
-from structure_elements.element import connect_inner_lists, multiply_effect, add_effects
+from structure_elements.element import multiply_effect, add_effects
 
 
 class NetworkArch:
@@ -35,14 +35,22 @@ class NetworkArch:
                  'Boundary Conditions': boundary_conditions}
         return model
 
+    def get_stations(self):
+        # The hanger forces are constant, a single station suffices
+        stations = self.tie.get_stations() + self.arch.get_stations()
+        stations += [np.zeros(1) for hanger in self.hangers]
+        return stations
+
     def internal_forces_to_effects(self, internal_forces):
         i_tie = len(self.tie)
         i_arch = i_tie + len(self.arch)
+        offsets = internal_forces.offsets
         effects = {}
         for key in internal_forces:
-            effects[key] = np.array(connect_inner_lists(internal_forces[key][:i_arch]))
+            effects[key] = internal_forces.array(key)[:offsets[i_arch]]
 
-        effects_hangers = np.array([eff[0] for eff in internal_forces['Normal Force'][i_arch:]])
+        # The first station of each hanger
+        effects_hangers = internal_forces.array('Normal Force')[offsets[i_arch:-1]]
         effects['Normal Force'] = np.hstack((effects['Normal Force'], effects_hangers))
         return effects
 
@@ -105,7 +113,8 @@ class NetworkArch:
         for node in self.tie.cross_girders_nodes:
             model['Loads'].append({'Nodal': [[node.index, 0, -1, 0]]})
 
-        d, i_f, rd, sp = structure_analysis(model)
+        d, i_f, rd, sp = structure_analysis(model, discType='Elementwise', discElements=1,
+                                            stations=self.get_stations())
         effects = self.internal_forces_to_effects(i_f[0])
         self.set_effects(effects, 'DC')
 
@@ -144,12 +153,13 @@ class NetworkArch:
         self.set_range('0', 'WS')
         for element in [self.arch, self.tie]:
             element.add_key('WS', 'Moment y', 0)
-            cs_i = element.get_cross_sections()
-            for cs in set(element.cross_sections):
-                mask = cs_i == cs
+            indices, cross_sections = element.get_section_indices()
+            for i, cs in enumerate(cross_sections):
+                mask = indices == i
                 for effect in cs.wind_effects:
                     element.effects['WS'][effect][0, mask] = cs.wind_effects[effect][0]
                     element.effects['WS'][effect][1, mask] = cs.wind_effects[effect][-1]
+            element.invalidate_effects('WS')
 
         forces = []
         for hanger in self.hangers:
@@ -220,7 +230,8 @@ class NetworkArch:
                            [hanger.arch_node.index, horizontal_force, vertical_force, 0]]
             model['Loads'].append({'Nodal': loads_nodal})
 
-        d, i_f, rd, sp = structure_analysis(model)
+        d, i_f, rd, sp = structure_analysis(model, discType='Elementwise', discElements=1,
+                                            stations=self.get_stations())
         for i, hanger in enumerate(self.hangers.hanger_sets[set_plot]):
             effects_i = self.internal_forces_to_effects(i_f[i])
             hanger_force = effects_i['Normal Force'][n+i]
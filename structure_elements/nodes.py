@@ -1,8 +1,17 @@
+from math import floor
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
 class Nodes:
     def __init__(self, accuracy=0.01):
         self.nodes = []
         self.amount = 0
         self.accuracy = accuracy
+        # Nodes hashed by their cell of a grid with the accuracy as cell size, the
+        # coordinates of the nodes are therefore only changed by move_node
+        self.grid = {}
 
     def __repr__(self):
         return repr(self.nodes)
@@ -20,15 +29,71 @@ class Nodes:
             raise StopIteration
 
     def add_node(self, x, y):
-        if self.amount != 0:
-            distance, i = self.closest_point(x, y)
-            if distance < self.accuracy:
-                return self.nodes[i]
+        node = self.find_node(x, y)
+        if node is not None:
+            return node
+        return self.create_node(x, y)
+
+    def add_nodes(self, x, y):
+        # The points without any node or other point nearby are found by a single
+        # search of all points, only the others are compared one after another
+        x, y = list(x), list(y)
+        isolated = [True] * len(x)
+        if self.accuracy > 0 and x:
+            locations = [[node.x, node.y] for node in self.nodes] + [list(point) for point in zip(x, y)]
+            tree = cKDTree(np.array(locations, dtype=float))
+            points = np.array(locations[len(self.nodes):], dtype=float)
+            # Twice the accuracy guards against rounding of the distances
+            isolated = tree.query_ball_point(points, 2 * self.accuracy, return_length=True) == 1
+
+        nodes = []
+        for x_i, y_i, isolated_i in zip(x, y, isolated):
+            if isolated_i:
+                nodes.append(self.create_node(x_i, y_i))
+            else:
+                nodes.append(self.add_node(x_i, y_i))
+        return nodes
+
+    def create_node(self, x, y):
         node = Node(self.amount, x, y)
         self.nodes.append(node)
+        if self.accuracy > 0:
+            self.grid.setdefault(self.get_cell(x, y), []).append(node)
         self.amount += 1
         return node
 
+    def move_node(self, node, x, y):
+        # The node is hashed again at its new location
+        self.remove_from_grid(node)
+        node.x = x
+        node.y = y
+        if self.accuracy > 0:
+            self.grid.setdefault(self.get_cell(x, y), []).append(node)
+        return
+
+    def remove_from_grid(self, node):
+        if self.accuracy > 0:
+            cell = self.grid.get(self.get_cell(node.x, node.y), [])
+            cell[:] = [node_i for node_i in cell if node_i is not node]
+        return
+
+    def get_cell(self, x, y):
+        return floor(x / self.accuracy), floor(y / self.accuracy)
+
+    def find_node(self, x, y):
+        # The closest node within the accuracy, it is in one of the neighbouring cells
+        if self.accuracy <= 0:
+            return None
+        i_x, i_y = self.get_cell(x, y)
+        closest = None
+        for j_x in (i_x - 1, i_x, i_x + 1):
+            for j_y in (i_y - 1, i_y, i_y + 1):
+                for node in self.grid.get((j_x, j_y), ()):
+                    distance = ((node.x - x) ** 2 + (node.y - y) ** 2) ** 0.5
+                    if distance < self.accuracy and (closest is None or (distance, node.index) < closest[:2]):
+                        closest = distance, node.index, node
+        return closest[2] if closest else None
+
     def closest_point(self, x, y):
         distances = [((node.x - x) ** 2 + (node.y - y) ** 2) ** 0.5 for node in self.nodes]
         distance, i = min((val, idx) for (idx, val) in enumerate(distances))
@@ -41,10 +106,16 @@ class Nodes:
         return
 
     def pop_nodes(self, nodes):
+        # The nodes are removed at once and indexed again afterwards
+        remaining = {id(node): node for node in self.nodes}
+        for node in nodes:
+            if remaining.pop(id(node), None) is None:
+                raise ValueError('The node ' + repr(node) + ' is not in the nodes.')
         for node in nodes:
+            self.remove_from_grid(node)
             node.index = None
-            self.nodes.remove(node)
-            self.amount -= 1
+        self.nodes[:] = [node for node in self.nodes if id(node) in remaining]
+        self.amount = len(self.nodes)
         self.order_nodes()
         return
 
@@ -0,0 +1,60 @@
+import numpy as np
+
+
+class SectionGroups:
+    # The stations of a line element grouped by their cross-section. The extrema of
+    # all effects are reduced for every cross-section at once (np.maximum.reduceat)
+    # and the degrees of compliance use the resistances at each station.
+    def __init__(self, indices, cross_sections):
+        self.order = np.argsort(indices, kind='stable')
+        indices_sorted = indices[self.order]
+        new_group = np.concatenate(([True], indices_sorted[1:] != indices_sorted[:-1]))
+        self.starts = np.flatnonzero(new_group)
+        self.cross_sections = [cross_sections[i] for i in indices_sorted[self.starts]]
+
+        # Group of each station
+        self.groups = np.empty(len(indices), dtype=int)
+        self.groups[self.order] = np.cumsum(new_group) - 1
+        return
+
+    def get_resistances(self, attribute):
+        # The resistances at each station are read from the cross-sections on every
+        # call, changed resistances take effect without rebuilding the groups
+        return np.array([getattr(cs, attribute) for cs in self.cross_sections], dtype=float)[self.groups]
+
+    def get_extrema(self, effects):
+        # The maxima and minima of all keys for each group, the rows of all keys are
+        # stacked (rows, stations) and reduced in one pass
+        keys = list(effects)
+        values = [np.atleast_2d(effects[key]) for key in keys]
+        rows = np.cumsum([0] + [len(value) for value in values])
+        values = np.vstack(values)[:, self.order]
+        maxima = np.maximum.reduceat(values, self.starts, axis=1)
+        minima = np.minimum.reduceat(values, self.starts, axis=1)
+
+        extrema = {}
+        for i, key in enumerate(keys):
+            extrema[key] = (maxima[rows[i]:rows[i+1]].max(axis=0), minima[rows[i]:rows[i+1]].min(axis=0))
+        return extrema
+
+    def assign_extrema(self, effects, name):
+        extrema = self.get_extrema(effects)
+        for i, cs in enumerate(self.cross_sections):
+            for key in extrema:
+                cs.update_extrema(extrema[key][0][i], extrema[key][1][i], name, key)
+            cs.calculate_doc_max(name)
+        return
+
+    def get_doc(self, effects):
+        # Demand/capacity ratios of the extreme fibres (D/C_1 and D/C_2)
+        dc_1 = np.zeros_like(effects['Normal Force'])
+        dc_2 = np.zeros_like(effects['Normal Force'])
+        if 'Normal Force' in effects:
+            dc_n = effects['Normal Force'] / self.get_resistances('normal_force_resistance')
+            dc_1 += dc_n
+            dc_2 += dc_n
+        if 'Moment' in effects:
+            dc_m = 8/9 * effects['Moment'] / self.get_resistances('moment_z_resistance')
+            dc_1 += dc_m
+            dc_2 -= dc_m
+        return dc_1, dc_2
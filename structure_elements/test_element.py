@@ -0,0 +1,109 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from structure_elements.element import Element
+
+
+def get_element():
+    # An element with stored 1-D effects and a stored range
+    rng = np.random.default_rng(0)
+    keys = ['Normal Force', 'Moment']
+    element = Element()
+    for name in ['0', 'DC', 'DW', 'EL', 'F1', 'F2', 'F3', 'WS']:
+        factor = 0 if name == '0' else 1
+        element.set_effects({key: factor * rng.normal(size=20) for key in keys}, name)
+    element.set_effects({key: np.sort(rng.normal(size=(2, 20)), axis=0)[::-1] for key in keys}, 'LL')
+    return element
+
+
+# The recursive evaluation of effect and range expressions which the element replaced
+
+def reference_effects(effects, name):
+    name = name.replace(' - ', ' + -1 ')
+    if name in effects:
+        return effects[name]
+    if ' + ' in name:
+        terms = [reference_effects(effects, term) for term in name.split(' + ')]
+        return {key: sum(term[key] for term in terms) for key in terms[0]}
+    factor, name = name.split(' ', 1)
+    return {key: float(factor) * value for key, value in reference_effects(effects, name).items()}
+
+
+def reference_range(effects, range_name):
+    if ', ' in range_name:
+        ranges = [reference_range(effects, name) for name in range_name.split(', ')]
+        return {key: sum(range_i[key] for range_i in ranges) for key in ranges[0]}
+    if '/' in range_name:
+        ranges = [reference_range(effects, name) for name in range_name.split('/')]
+        return {key: np.vstack((np.max([range_i[key][0] for range_i in ranges], axis=0),
+                                np.min([range_i[key][1] for range_i in ranges], axis=0)))
+                for key in ranges[0]}
+    effects = reference_effects(effects, range_name)
+    if effects['Normal Force'].ndim == 2:
+        return effects
+    return {key: np.vstack((value, value)) for key, value in effects.items()}
+
+
+def assert_effects_equal(effects, reference):
+    assert list(effects) == list(reference)
+    for key in reference:
+        np.testing.assert_allclose(effects[key], reference[key], rtol=1e-12, atol=1e-12)
+    return
+
+
+EXPRESSIONS = ['DC', '1.25 DC', 'EL + 1.25 DC + 1.5 DW', 'DC - DW', '2.0 F1 + -1 F2 + 0.5 F1',
+               '0 + F1 + F2 + F3', '1.4 LL', 'EL + 1.3 LL', '0.5 EL + 1.3 LL + DW']
+
+RANGES = ['0, 0/F1, 0/F2, 0/F3', '0/F1/F2/F3', 'EL, 1.25 DC/0.9 DC, 1.5 DW/0.65 DW, 0/1.75 LL',
+          'LL', 'DC + DW', 'LL, 1.4 WS', 'F1/F2, F3/0, LL/EL']
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_effects_equal_reference(expression):
+    element = get_element()
+    assert_effects_equal(element.get_effects(expression), reference_effects(element.effects, expression))
+    # Memoized effects
+    assert_effects_equal(element.get_effects(expression), reference_effects(element.effects, expression))
+
+
+@pytest.mark.parametrize('range_name', RANGES)
+def test_range_equals_reference(range_name):
+    element = get_element()
+    assert_effects_equal(element.get_range(range_name), reference_range(element.effects, range_name))
+    assert_effects_equal(element.get_range(range_name), reference_range(element.effects, range_name))
+
+
+def test_changed_effects():
+    # Changing stored effects invalidates the memoized expressions depending on them
+    element = get_element()
+    element.get_effects('EL + 1.25 DC + 1.5 DW')
+    element.get_range('EL, 1.25 DC/0.9 DC, 0/1.75 LL', name='Strength')
+    element.set_effects({key: 2 * value for key, value in element.effects['DC'].items()}, 'DC')
+    assert_effects_equal(element.get_effects('EL + 1.25 DC + 1.5 DW'),
+                         reference_effects(element.effects, 'EL + 1.25 DC + 1.5 DW'))
+    assert_effects_equal(element.get_range('EL, 1.25 DC/0.9 DC, 0/1.75 LL'),
+                         reference_range(element.effects, 'EL, 1.25 DC/0.9 DC, 0/1.75 LL'))
+    # Stored ranges keep their effects
+    assert_effects_equal(element.get_range('Strength, 1.4 WS'), reference_range(element.effects, 'Strength, 1.4 WS'))
+
+
+def test_returned_effects_are_read_only():
+    element = get_element()
+    for effects in [element.get_effects('DC'), element.get_effects('EL + 1.25 DC'), element.get_range('0/F1')]:
+        with pytest.raises(ValueError):
+            effects['Moment'] *= 2
+    assert_effects_equal(element.get_effects('EL + 1.25 DC'), reference_effects(element.effects, 'EL + 1.25 DC'))
+
+
+def test_pickled_element():
+    # The memoized effects and the load case table are not pickled
+    element = get_element()
+    element.get_effects('EL + 1.25 DC + 1.5 DW')
+    element.get_range('0/F1/F2/F3')
+    element_copy = pickle.loads(pickle.dumps(element))
+    assert not element_copy.effects_memo and not element_copy.effects_dependencies
+    assert_effects_equal(element_copy.get_effects('EL + 1.25 DC + 1.5 DW'),
+                         reference_effects(element.effects, 'EL + 1.25 DC + 1.5 DW'))
+    assert_effects_equal(element_copy.get_range('0/F1/F2/F3'), reference_range(element.effects, '0/F1/F2/F3'))
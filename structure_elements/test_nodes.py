@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from structure_elements.nodes import Nodes
+
+
+def reference_add_node(nodes, x, y):
+    # The linear search of the closest node which the grid replaced
+    if nodes.amount != 0:
+        distance, i = nodes.closest_point(x, y)
+        if distance < nodes.accuracy:
+            return nodes.nodes[i]
+    return nodes.create_node(x, y)
+
+
+def get_points():
+    # Points on a grid, some of them repeated within the accuracy
+    rng = np.random.default_rng(0)
+    x = np.round(rng.uniform(0, 10, 300), 2)
+    y = np.round(rng.uniform(0, 1, 300), 2)
+    x[100:150] = x[:50] + rng.uniform(-0.012, 0.012, 50)
+    y[100:150] = y[:50]
+    return x, y
+
+
+def test_add_nodes_equals_linear_search():
+    x, y = get_points()
+    nodes = Nodes()
+    nodes.add_nodes(x[:120], y[:120])
+    added = nodes.add_nodes(x[120:], y[120:])
+    reference = Nodes()
+    reference_added = [reference_add_node(reference, x_i, y_i) for x_i, y_i in zip(x, y)][120:]
+    assert [node.index for node in added] == [node.index for node in reference_added]
+    assert nodes.structural_nodes() == reference.structural_nodes()
+    assert [nodes.add_node(x_i, y_i).index for x_i, y_i in zip(x, y)] == \
+           [reference_add_node(reference, x_i, y_i).index for x_i, y_i in zip(x, y)]
+
+
+def test_move_node():
+    nodes = Nodes()
+    node = nodes.add_node(1, 1)
+    nodes.move_node(node, 1, 31)
+    assert nodes.find_node(1, 1) is None
+    assert nodes.add_node(1, 31.005) is node
+    assert nodes.amount == 1
+
+
+def test_pop_nodes():
+    nodes = Nodes()
+    added = nodes.add_nodes([3, 1, 2, 0], [0, 0, 0, 0])
+    nodes.pop_nodes(added[1:3])
+    assert [node.x for node in nodes] == [0, 3]
+    assert [node.index for node in nodes.nodes] == [0, 1]
+    assert nodes.find_node(1, 0) is None
+    with pytest.raises(ValueError):
+        nodes.pop_nodes([added[1]])
+    with pytest.raises(ValueError):
+        nodes.pop_nodes([added[0], added[0]])
+    assert nodes.amount == 2
@@ -0,0 +1,84 @@
+import numpy as np
+
+from structure_elements.cross_section import CrossSection
+from structure_elements.section_groups import SectionGroups
+
+
+def get_cross_sections():
+    return [CrossSection(name, 1, [1, 1], resistance, {}) for name, resistance in
+            [('A', [1000, 200, 100]), ('B', [1500, 350, 100]), ('C', [800, 120, 100])]]
+
+
+def get_effects(n, rng):
+    # A range of normal forces and moments and its degrees of compliance
+    effects = {key: np.sort(rng.normal(size=(2, n)), axis=0)[::-1] for key in ['Normal Force', 'Moment']}
+    effects['D/C_1'] = rng.uniform(0, 1, size=(2, n))
+    effects['D/C_2'] = rng.uniform(0, 1, size=(2, n))
+    return effects
+
+
+# The loops over the cross-sections which the section groups replaced
+
+def reference_assign_extrema(indices, cross_sections, effects, name):
+    for i, cs in enumerate(cross_sections):
+        mask = indices == i
+        for key in effects:
+            if effects[key].ndim == 1:
+                cs.assign_extrema(effects[key][mask], name, key)
+            else:
+                cs.assign_extrema(effects[key][:, mask], name, key)
+        cs.calculate_doc_max(name)
+    return
+
+
+def reference_doc(indices, cross_sections, effects):
+    dc_1 = np.zeros_like(effects['Normal Force'])
+    dc_2 = np.zeros_like(effects['Normal Force'])
+    resistances_n = np.array([cs.normal_force_resistance for cs in cross_sections])[indices]
+    dc_1 += effects['Normal Force'] / resistances_n
+    dc_2 += effects['Normal Force'] / resistances_n
+    resistances_mz = np.array([cs.moment_z_resistance for cs in cross_sections])[indices]
+    dc_1 += 8/9 * effects['Moment'] / resistances_mz
+    dc_2 -= 8/9 * effects['Moment'] / resistances_mz
+    return dc_1, dc_2
+
+
+def test_assign_extrema_equals_reference():
+    rng = np.random.default_rng(0)
+    indices = np.array([0, 0, 1, 1, 1, 2, 0, 0, 2, 2, 1, 0])
+    cross_sections = get_cross_sections()
+    reference_cross_sections = get_cross_sections()
+    groups = SectionGroups(indices, cross_sections)
+    # Extrema are accumulated over several ranges
+    for name in ['Strength-I', 'Strength-I', 'Service-I']:
+        effects = get_effects(len(indices), rng)
+        effects['Normal Force'] = effects['Normal Force'][0]
+        groups.assign_extrema(effects, name)
+        reference_assign_extrema(indices, reference_cross_sections, effects, name)
+    for cs, cs_ref in zip(cross_sections, reference_cross_sections):
+        assert cs.effects == cs_ref.effects
+        assert cs.degree_of_compliance == cs_ref.degree_of_compliance
+
+
+def test_doc_equals_reference():
+    rng = np.random.default_rng(1)
+    indices = np.array([2, 2, 0, 0, 1, 1, 1, 0, 2])
+    cross_sections = get_cross_sections()
+    groups = SectionGroups(indices, cross_sections)
+    for effects in [get_effects(len(indices), rng), {key: value[0] for key, value in get_effects(len(indices), rng).items()}]:
+        for dc, dc_ref in zip(groups.get_doc(effects), reference_doc(indices, cross_sections, effects)):
+            np.testing.assert_allclose(dc, dc_ref, rtol=1e-14)
+
+
+def test_changed_resistances():
+    # The degrees of compliance use the current resistances of the cross-sections
+    rng = np.random.default_rng(2)
+    indices = np.array([0, 1, 1, 2, 0])
+    cross_sections = get_cross_sections()
+    groups = SectionGroups(indices, cross_sections)
+    effects = get_effects(len(indices), rng)
+    groups.get_doc(effects)
+    cross_sections[1].normal_force_resistance *= 2
+    cross_sections[2].moment_z_resistance /= 3
+    for dc, dc_ref in zip(groups.get_doc(effects), reference_doc(indices, cross_sections, effects)):
+        np.testing.assert_allclose(dc, dc_ref, rtol=1e-14)
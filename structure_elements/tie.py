@@ -1,6 +1,5 @@
 import numpy as np
 
-from structure_analysis import structure_analysis
 from structure_elements.line_element import LineElement
 
 
@@ -9,7 +8,7 @@ class Tie(LineElement):
         super().__init__()
         self.span = span
         self.cross_girders_amount = n
-        self.cross_girders_nodes = [nodes.add_node(span*(i+1)/(n+1), 0) for i in range(n)]
+        self.cross_girders_nodes = nodes.add_nodes([span*(i+1)/(n+1) for i in range(n)], [0]*n)
         self.nodes = [nodes.add_node(0, 0)] + self.cross_girders_nodes + [nodes.add_node(span, 0)]
         self.weight_deck = g_deck
         self.weight_utilities = g_utilities
@@ -25,6 +24,7 @@ class Tie(LineElement):
                         self.nodes.insert(i+1, hanger.tie_node)
                         if self.cross_sections:
                             self.cross_sections.insert(i, self.cross_sections[i])
+                        self.invalidate_geometry()
                         break
             else:
                 i = self.nodes.index(hanger.tie_node)
@@ -57,40 +57,40 @@ class Tie(LineElement):
         return weight
 
     def zero_displacement(self, nodes, hangers, dof_rz=True, plot=False):
-        structural_nodes = nodes.structural_nodes()
-        beams_nodes, beams_stiffness = self.get_beams()
-        beams = {'Nodes': beams_nodes, 'Stiffness': beams_stiffness}
         load_group = self.permanent_loads()
 
         restricted_degrees = [[self.nodes[0].index, 1, 1, int(dof_rz), 0]]
         restricted_degrees += [[self.nodes[-1].index, 1, 1, int(dof_rz), 0]]
-        x_coord, nodes = hangers.get_connection_points()
-        for node in nodes:
+        x_coord, connection_nodes = hangers.get_connection_points()
+        for node in connection_nodes:
             restricted_degrees += [[node.index, 0, 1, 0, 0]]
 
         boundary_conditions = {'Restricted Degrees': restricted_degrees}
-        model = {'Nodes': structural_nodes, 'Beams': beams, 'Loads': [load_group],
-                 'Boundary Conditions': boundary_conditions}
+        compiled_model = self.get_compiled_model(nodes, boundary_conditions)
 
-        d_tie, if_tie, rd_tie, sp_tie = structure_analysis(model)
+        d_tie, if_tie, rd_tie, sp_tie = compiled_model.solve([load_group])
         mz_0 = if_tie[0]['Moment'][0][0] if dof_rz else 0
 
         # Assign the reaction forces to the hangers
         forces = [rd[2] for rd in rd_tie[0][2:]]
-        hangers.set_prestressing_force_from_nodes(nodes, forces)
+        hangers.set_prestressing_force_from_nodes(connection_nodes, forces)
         return mz_0
 
     def calculate_fracture_stress(self, effect_name):
-        cs_i = self.get_cross_sections()
+        indices, cross_sections = self.get_section_indices()
         effects = self.get_effects(effect_name)
-        for cs in set(cs_i):
-            mask = cs == cs_i
+        stresses = {}
+        for i, cs in enumerate(cross_sections):
+            mask = indices == i
             for tie_fracture in cs.tie_fractures:
                 name = tie_fracture.name
-                if name+'_top' not in effects:
-                    effects[name+'_top'] = np.zeros_like(effects['Normal Force'])
-                    effects[name+'_bot'] = np.zeros_like(effects['Normal Force'])
+                for key in (name+'_top', name+'_bot'):
+                    if key not in stresses:
+                        stresses[key] = np.array(effects[key]) if key in effects \
+                            else np.zeros_like(effects['Normal Force'])
                 o_top, o_bot = tie_fracture.calculate_stress(effects, mask)
-                effects[name+'_top'][mask] = o_top
-                effects[name+'_bot'][mask] = o_bot
+                stresses[name+'_top'][mask] = o_top
+                stresses[name+'_bot'][mask] = o_bot
+        for key in stresses:
+            self.set_effects(stresses[key], effect_name, key=key)
         return